@@ -1,8 +1,10 @@
 from django import template
 
+from core.authorization import get_principal
+
 register = template.Library()
 
 
 @register.filter(name="has_group")
 def has_group(user, group_name):
-    return group_name in [group.name for group in user.groups.all()]
+    return get_principal(user).has_group(group_name)
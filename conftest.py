@@ -9,6 +9,7 @@ from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
 from django.contrib.postgres.fields import ArrayField
+from django.core.cache import caches
 from django.urls import resolve
 from django.urls.base import reverse
 from django.utils import timezone
@@ -322,3 +323,15 @@ def mus_contact():
 def force_utc(settings):
     settings.TIME_ZONE = "UTC"
     timezone.activate("UTC")
+
+
+@pytest.fixture
+def locmem_caches(settings):
+    """Remplace les caches factices des tests par des caches en mémoire, vidés à chaque test."""
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-default"},
+        "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "test-local"},
+    }
+    yield
+    for alias in settings.CACHES:
+        caches[alias].clear()
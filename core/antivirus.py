@@ -1,36 +1,91 @@
+from datetime import timedelta
+from io import BytesIO
 import logging
+import math
 import os
-from urllib.parse import urlparse
+import threading
+import uuid
 
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 import requests
 
+from core.models import Document
+
 logger = logging.getLogger(__name__)
 
+SCAN_TIMEOUT = 30
+SCAN_LEASE_MARGIN = timedelta(minutes=5)
+CHUNK_SIZE = 64 * 1024
+MAX_SCAN_BACKOFF = timedelta(hours=6)
+
+_local = threading.local()
+
+
+def get_session() -> requests.Session:
+    """Session HTTP (keep-alive) propre à chaque thread, réutilisée pour toutes les analyses du thread."""
+    if not hasattr(_local, "session"):
+        _local.session = requests.Session()
+    return _local.session
+
+
+class MultipartFileBody:
+    """Corps `multipart/form-data` contenant un seul fichier, lu par blocs pendant l'envoi.
+
+    Sa taille étant connue, requests l'envoie avec un Content-Length sans le charger en mémoire."""
+
+    def __init__(self, field_name, filename, file, size):
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+        filename = filename.replace('"', "%22")
+        head = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{filename}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode()
+        tail = f"\r\n--{boundary}--\r\n".encode()
+        self._parts = [BytesIO(head), file, BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        while chunk := self.read(CHUNK_SIZE):
+            yield chunk
+
+    def read(self, size=-1):
+        chunks = []
+        while self._parts and size != 0:
+            chunk = self._parts[0].read(size)
+            if not chunk:
+                self._parts.pop(0)
+                continue
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b"".join(chunks)
+
 
 def scan_document(document) -> bool | None:
     if not (settings.ANTIVIRUS_URL and settings.ANTIVIRUS_TOKEN):
         raise Exception("Cannot scan document, no antivirus is configured")
 
-    parsed_url = urlparse(document.file.url)
-    file_path = os.path.join(str(document.pk))
-    if parsed_url.scheme in ["http", "https"]:
-        response = requests.get(document.file.url, stream=True)
-        file_path = os.path.join(str(document.pk))
-        with open(file_path, "wb+") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                _ = f.write(chunk)
-    else:
-        with open(document.file.path, "rb") as src, open(file_path, "wb+") as destination:
-            destination.write(src.read())
-
     headers = {
         "accept": "application/json",
         "X-Auth-Token": settings.ANTIVIRUS_TOKEN,
     }
-    files = {"file": open(file_path, "rb")}
     try:
-        response = requests.post(settings.ANTIVIRUS_URL + "/sync_submit", headers=headers, files=files, timeout=30)
+        with document.file.storage.open(document.file.name, "rb") as file:
+            body = MultipartFileBody("file", os.path.basename(document.file.name), file, file.size)
+            response = get_session().post(
+                settings.ANTIVIRUS_URL + "/sync_submit",
+                headers={**headers, "Content-Type": body.content_type},
+                data=body,
+                timeout=SCAN_TIMEOUT,
+            )
     except Exception as e:
         logger.info(f"Cannot contact antivirus, got {e}")
         return None
@@ -39,5 +94,48 @@ def scan_document(document) -> bool | None:
         logger.info(f"Could not send document to antivirus got code {response.status_code}")
         return None
 
-    os.remove(file_path)
     return response.json()["is_malware"]
+
+
+def get_scan_backoff(scan_attempts) -> timedelta:
+    return min(timedelta(minutes=2**scan_attempts), MAX_SCAN_BACKOFF)
+
+
+def get_scan_lease(nb_documents, workers=1) -> timedelta:
+    """Durée de réservation d'un lot analysé par `workers` threads, dans le pire cas où chaque analyse va jusqu'au
+    délai d'expiration."""
+    return timedelta(seconds=SCAN_TIMEOUT * math.ceil(nb_documents / workers)) + SCAN_LEASE_MARGIN
+
+
+def claim_documents_to_scan(queryset, limit, workers=1) -> list[Document]:
+    """Réserve au plus `limit` documents du queryset pour les analyser avec `workers` threads.
+
+    Les lignes déjà verrouillées par un autre processus sont ignorées (`SKIP LOCKED`) et les documents réservés
+    ne peuvent plus être réservés pendant le temps nécessaire à l'analyse du lot (`get_scan_lease`), ce qui permet à
+    plusieurs commandes ou workers Celery de travailler en parallèle sans analyser deux fois le même fichier."""
+    now = timezone.now()
+    with transaction.atomic():
+        documents = list(
+            queryset.filter(Q(next_scan_at__isnull=True) | Q(next_scan_at__lte=now))
+            .select_for_update(skip_locked=True)
+            .order_by("pk")[:limit]
+        )
+        Document._base_manager.filter(pk__in=[document.pk for document in documents]).update(
+            next_scan_at=now + get_scan_lease(len(documents), workers)
+        )
+    return documents
+
+
+def save_scan_result(document, is_infected):
+    if is_infected is None:
+        document.scan_attempts += 1
+        document.next_scan_at = timezone.now() + get_scan_backoff(document.scan_attempts)
+        Document._base_manager.filter(pk=document.pk).update(
+            scan_attempts=document.scan_attempts, next_scan_at=document.next_scan_at
+        )
+        logger.info(f"Scan of document {document.pk} failed, will retry after {document.next_scan_at}")
+        return
+
+    document.is_infected = is_infected
+    document.next_scan_at = None
+    document.save(update_fields=["is_infected", "next_scan_at"])
@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class CoreConfig(AppConfig):
@@ -7,3 +8,8 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals  # noqa
+
+        if settings.SQL_STATS_ENABLED:
+            from core.query_stats import connect_task_signals
+
+            connect_task_signals()
@@ -1,8 +1,78 @@
+from functools import cached_property
+
+from django.conf import settings
+from django.utils.functional import LazyObject, empty
+
 from core.constants import Domains
 
 
+class Principal:
+    """Agent, structure, contacts et groupes d'un utilisateur, chargés une seule fois.
+
+    À obtenir avec `get_principal(user)` : l'objet est mémorisé sur l'instance de l'utilisateur, il est donc partagé
+    pendant toute la requête par les middlewares, les vues, les modèles et les gabarits."""
+
+    def __init__(self, user):
+        self.user = user
+        self._contacts = {}
+
+    @cached_property
+    def group_names(self) -> frozenset[str]:
+        return frozenset(group.name for group in self.user.groups.all())
+
+    def has_group(self, group_name) -> bool:
+        return group_name in self.group_names
+
+    @property
+    def is_referent_national(self) -> bool:
+        return self.has_group(settings.REFERENT_NATIONAL_GROUP)
+
+    @property
+    def agent(self):
+        return self.user.agent
+
+    @property
+    def structure(self):
+        return self.user.agent.structure
+
+    @property
+    def agent_contact(self):
+        return self._get_contact(self.agent)
+
+    @property
+    def structure_contact(self):
+        # La structure de l'agent peut changer : le contact est mémorisé par structure
+        return self._get_contact(self.structure)
+
+    def _get_contact(self, owner):
+        key = (owner._meta.model_name, owner.pk)
+        if key not in self._contacts:
+            # `all()` profite des contacts éventuellement préchargés (`prefetch_related`)
+            contact = next(iter(owner.contact_set.all()), None)
+            if contact is None:
+                raise owner.contact_set.model.DoesNotExist(f"Aucun contact pour {owner._meta.model_name} {owner.pk}")
+            self._contacts[key] = contact
+        return self._contacts[key]
+
+
+def get_principal(user) -> Principal:
+    principal = getattr(user, "_principal", None)
+    if principal is None:
+        principal = Principal(user)
+        user._principal = principal
+    return principal
+
+
+def clear_principal(user):
+    if isinstance(user, LazyObject):
+        if user._wrapped is empty:
+            return
+        user = user._wrapped
+    vars(user).pop("_principal", None)
+
+
 def has_needed_group(object, user):
     needed_group = Domains.group_for_value(object._meta.app_label)
-    if needed_group and needed_group not in [g.name for g in user.groups.all()]:
+    if needed_group and not get_principal(user).has_group(needed_group):
         return False
     return True
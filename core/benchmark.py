@@ -0,0 +1,141 @@
+"""Mesure des temps de réponse des pages et des exports principaux (voir la commande `run_benchmark`).
+
+Les scénarios sont joués avec le client de test de Django sur le jeu de données de `generate_dataset`, connecté avec
+son utilisateur. Chaque domaine fournit ses scénarios dans son module `dataset` (`get_benchmark_scenarios`). Le
+premier passage de chaque scénario remplit les caches et n'est pas compté ; les résultats (durées, nombre de requêtes
+SQL et temps passé en base) sont enregistrés en JSON pour comparer deux exécutions."""
+
+from dataclasses import asdict, dataclass, field
+import datetime
+import statistics
+import time
+
+from django import forms
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from django.urls import reverse
+
+from core.query_stats import collect_query_stats
+
+
+@dataclass
+class Scenario:
+    name: str
+    url: str
+    method: str = "get"
+    data: dict = field(default_factory=dict)
+
+
+def get_sample_value(form_field):
+    """Valeur de filtre valide pour `form_field` : premier choix proposé, ou valeur arbitraire selon le type."""
+    match form_field:
+        case forms.ModelChoiceField():
+            obj = form_field.queryset.first()
+            return obj and form_field.prepare_value(obj)
+        case forms.ChoiceField():
+            for value, label in form_field.choices:
+                if isinstance(label, (list, tuple)):
+                    value = label[0][0] if label else None
+                if value not in (None, ""):
+                    return value
+        case forms.BooleanField() | forms.NullBooleanField():
+            return "true"
+        case forms.DateField() | forms.DateTimeField():
+            return (datetime.date.today() - datetime.timedelta(days=365)).isoformat()
+        case forms.IntegerField() | forms.FloatField() | forms.DecimalField() | forms.CharField():
+            return "1"
+    return None
+
+
+def get_sample_data(html_name, form_field):
+    if isinstance(form_field, forms.MultiValueField):
+        values = [get_sample_value(subfield) for subfield in form_field.fields]
+        return {
+            f"{html_name}{suffix}": value
+            for suffix, value in zip(form_field.widget.widgets_names, values)
+            if value is not None
+        }
+    value = get_sample_value(form_field)
+    return {} if value is None else {html_name: value}
+
+
+def get_list_scenarios(name, url, filterset_class, search_text=None):
+    """Liste sans filtre, puis un scénario par filtre du formulaire de recherche (`search_text` pour la recherche
+    plein texte)."""
+    yield Scenario(f"{name} - liste", url)
+    form = filterset_class().form
+    for field_name, form_field in form.fields.items():
+        if field_name == "full_text_search" and search_text:
+            data = {form.add_prefix(field_name): search_text}
+        else:
+            data = get_sample_data(form.add_prefix(field_name), form_field)
+        if data:
+            yield Scenario(f"{name} - filtre {field_name}", url, data=data)
+
+
+def get_object_scenarios(name, obj, export_url=None):
+    """Page de détail d'un objet, onglets du bloc commun, recherche dans ses messages, historique, téléchargement des
+    documents et export DOCX."""
+    if obj is None:
+        return
+    content_type = ContentType.objects.get_for_model(obj)
+    kwargs = {"content_type": content_type.pk, "pk": obj.pk}
+    yield Scenario(f"{name} - détail", obj.get_absolute_url())
+    for tab in ("messages", "contacts", "documents"):
+        yield Scenario(f"{name} - onglet {tab}", reverse(f"bloc-commun-{tab}", kwargs=kwargs))
+    message = obj.messages.order_by("-pk").first()
+    if search_text := get_search_text(message and message.content):
+        yield Scenario(
+            f"{name} - recherche dans les messages",
+            reverse("bloc-commun-messages", kwargs=kwargs),
+            data={"full_text_search": search_text},
+        )
+    yield Scenario(f"{name} - historique", reverse("revision-list", kwargs=kwargs))
+    yield Scenario(f"{name} - téléchargement des documents", reverse("document-zip"), "post", kwargs)
+    if export_url:
+        yield Scenario(f"{name} - export DOCX", export_url, "post")
+
+
+def get_largest_object(queryset, user, relation):
+    """Objet créé par la structure de `user` ayant le plus d'objets liés par `relation` : le cas le plus coûteux."""
+    return (
+        queryset.filter(createur=user.agent.structure)
+        .annotate(nb_related=Count(relation))
+        .order_by("-nb_related", "-pk")
+        .first()
+    )
+
+
+def get_search_text(text):
+    """Mot d'un texte du jeu de données, utilisé pour la recherche plein texte."""
+    return max(text.split(), key=len).strip(".,") if text else None
+
+
+def run_scenario(client, scenario, repeat):
+    durations = []
+    for _ in range(repeat + 1):
+        with collect_query_stats() as stats:
+            start = time.perf_counter()
+            response = getattr(client, scenario.method)(scenario.url, scenario.data)
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            durations.append(time.perf_counter() - start)
+    durations = [duration * 1000 for duration in durations[1:]]
+    return {
+        **asdict(scenario),
+        "status": response.status_code,
+        "median_ms": round(statistics.median(durations), 1),
+        "min_ms": round(min(durations), 1),
+        "max_ms": round(max(durations), 1),
+        "queries": stats.count,
+        "db_time_ms": round(stats.duration * 1000, 1),
+    }
+
+
+def compare_results(previous, results):
+    """Renvoie, pour chaque scénario présent dans les deux exécutions, les durées médianes avant et après."""
+    previous_results = {result["name"]: result for result in previous["results"]}
+    for result in results:
+        if before := previous_results.get(result["name"]):
+            yield result["name"], before["median_ms"], result["median_ms"]
@@ -0,0 +1,70 @@
+"""Cache applicatif partagé entre les processus (Redis en production, voir `CACHES`).
+
+Chaque valeur est associée à des étiquettes : invalider une étiquette rend obsolètes toutes les valeurs qui en
+dépendent, sans avoir à connaître leurs clés. Un niveau local au processus (alias `local`) évite l'aller-retour
+réseau pendant `LOCAL_TIMEOUT` secondes, ce qui borne aussi le délai de prise en compte d'une invalidation faite par
+un autre processus."""
+
+import uuid
+
+from django.core.cache import caches
+from django.db import transaction
+
+DEFAULT_TIMEOUT = 60 * 60 * 24
+LOCAL_TIMEOUT = 5
+
+CONTACTS_TAG = "contacts"
+
+_MISSING = object()
+
+
+def get_model_tag(model):
+    return model._meta.label_lower
+
+
+def _get_tag_keys(tags):
+    return [f"tag:{tag}" for tag in tags]
+
+
+def _get_tag_versions(tags):
+    keys = _get_tag_keys(tags)
+    versions = caches["local"].get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        shared = caches["default"]
+        for key in missing:
+            shared.add(key, uuid.uuid4().hex, timeout=None)
+        missing_versions = shared.get_many(missing)
+        caches["local"].set_many(missing_versions, LOCAL_TIMEOUT)
+        versions.update(missing_versions)
+    return [versions.get(key, "") for key in keys]
+
+
+def get_or_set(name, compute, tags, timeout=DEFAULT_TIMEOUT):
+    """Valeur mise en cache sous `name`, recalculée avec `compute()` quand une des étiquettes a été invalidée."""
+    key = ":".join([name, *_get_tag_versions(tags)])
+    value = caches["local"].get(key, _MISSING)
+    if value is _MISSING:
+        value = caches["default"].get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            caches["default"].set(key, value, timeout)
+        caches["local"].set(key, value, LOCAL_TIMEOUT)
+    return value
+
+
+def invalidate_tags(*tags):
+    keys = _get_tag_keys(tags)
+    caches["default"].set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+    caches["local"].delete_many(keys)
+
+
+def invalidate_tags_on_commit(*tags):
+    # Invalider avant la fin de la transaction laisserait un autre processus remettre en cache les anciennes données
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def invalidate_model_tag(sender, raw=False, **kwargs):
+    """Récepteur de signal (`post_save`, `post_delete`) invalidant l'étiquette du modèle."""
+    if not raw:
+        invalidate_tags_on_commit(get_model_tag(sender))
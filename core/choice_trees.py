@@ -0,0 +1,101 @@
+"""Arbres de choix des widgets Treeselect servis en JSON (voir `TreeselectMixin(choice_tree=...)`).
+
+Le widget n'inclut dans la page que les options sélectionnées et charge l'arbre complet à la première ouverture.
+L'URL contient la version (empreinte du contenu) : la réponse peut être gardée en cache par le navigateur, et une
+modification des données change l'URL. Les arbres construits depuis la base sont mis en cache avec `cache_tags`
+(voir `core.cache`), les arbres construits depuis des constantes sont calculés une fois par processus."""
+
+from functools import cached_property
+import hashlib
+import json
+
+from django.urls import reverse
+
+from core.cache import get_or_set
+from core.widgets import TreeselectGroup, TreeselectItem
+
+_registry = {}
+
+
+def serialize_choices(choices) -> list[dict]:
+    nodes = []
+    for choice in choices:
+        match choice:
+            case TreeselectGroup():
+                node = {"label": str(choice.label), "can_expand": choice.can_expand}
+                if choice.value:
+                    node["value"] = str(choice.value)
+                node["categorised_label"] = choice.categorised_label and str(choice.categorised_label)
+                node["choices"] = serialize_choices(choice.choices)
+            case TreeselectItem():
+                node = {
+                    "value": str(choice.value),
+                    "label": str(choice.label),
+                    "categorised_label": choice.categorised_label and str(choice.categorised_label),
+                }
+                if choice.html_name_prefix:
+                    node["html_name_prefix"] = choice.html_name_prefix
+            case _:
+                value, label = choice
+                node = {"value": str(value), "label": str(label), "categorised_label": None}
+        nodes.append(node)
+    return nodes
+
+
+def _iter_items(nodes):
+    for node in nodes:
+        if "value" in node and not node.get("html_name_prefix"):
+            yield node
+        yield from _iter_items(node.get("choices", ()))
+
+
+class ChoiceTree:
+    def __init__(self, key, get_choices, cache_tags=()):
+        self.key = key
+        self.get_choices = get_choices
+        self.cache_tags = list(cache_tags)
+
+    def _build(self):
+        content = json.dumps(serialize_choices(self.get_choices()), ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(content.encode()).hexdigest()[:16], content
+
+    @cached_property
+    def _static_data(self):
+        return self._build()
+
+    def get_data(self) -> tuple[str, str]:
+        """Version et contenu JSON de l'arbre."""
+        if not self.cache_tags:
+            return self._static_data
+        return get_or_set(f"choice_tree:{self.key}", self._build, self.cache_tags)
+
+    @property
+    def url(self):
+        version, _ = self.get_data()
+        return reverse("choice-tree", kwargs={"key": self.key, "version": version})
+
+    def get_selected_items(self, values) -> list[TreeselectItem]:
+        values = {str(value) for value in values}
+        if not values:
+            return []
+        _, content = self.get_data()
+        items = {}
+        for node in _iter_items(json.loads(content)):
+            if node["value"] in values:
+                items.setdefault(
+                    node["value"],
+                    TreeselectItem(
+                        value=node["value"], label=node["label"], categorised_label=node["categorised_label"]
+                    ),
+                )
+        return list(items.values())
+
+
+def register_choice_tree(key, get_choices, cache_tags=()) -> ChoiceTree:
+    """`get_choices` renvoie les choix du widget ; `cache_tags` doit couvrir les données dont ils dépendent."""
+    _registry[key] = ChoiceTree(key, get_choices, cache_tags)
+    return _registry[key]
+
+
+def get_choice_tree(key) -> ChoiceTree | None:
+    return _registry.get(key)
@@ -0,0 +1,286 @@
+"""Jeu de données volumineux pour reproduire en local les volumes de production (voir la commande
+`generate_dataset`).
+
+Les objets sont construits avec les factories (`build`) puis insérés par lots avec `bulk_create` : ni `save()` ni
+les signaux ne sont appelés. Les données tenues à jour par les signaux (documents de recherche, structures ayant
+accès, révisions) sont calculées après chaque lot par les mêmes méthodes de classe que les signaux. Chaque domaine
+fournit ses générateurs dans son module `dataset` (`sv.dataset`, `ssa.dataset`, `tiac.dataset`)."""
+
+from collections import defaultdict
+from contextlib import contextmanager
+import datetime
+import itertools
+import random
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import models, transaction
+from django.utils import timezone
+import factory
+from faker import Faker
+from reversion.models import Revision, Version
+
+from core.factories import AgentFactory, DocumentFactory, MessageFactory, StructureFactory
+from core.mixins import WithEtatMixin, WithVisibiliteMixin
+from core.model_mixins import WithSearchVectorMixin
+from core.models import Contact, Departement, Document, FinSuiviContact, Message
+
+BENCHMARK_USER_EMAIL = "benchmark@example.com"
+DOCUMENT_PATH = "dataset/document.pdf"
+DOCUMENT_CONTENT = b"%PDF-1.4\n%%EOF\n"
+
+fake = Faker()
+
+
+def _get_auto_now_fields(model):
+    return [field for field in model._meta.concrete_fields if getattr(field, "auto_now", False) or field.auto_now_add]
+
+
+@contextmanager
+def without_auto_now(model):
+    """Laisse `bulk_create` enregistrer les dates des champs `auto_now` et `auto_now_add` fixées par le générateur."""
+    fields = [(field, field.auto_now, field.auto_now_add) for field in _get_auto_now_fields(model)]
+    for field, _, _ in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def group_by(objects, attname):
+    """Regroupe les objets par valeur de `attname` (ex : `evenement_id`)."""
+    groups = defaultdict(list)
+    for obj in objects:
+        groups[getattr(obj, attname)].append(obj)
+    return groups
+
+
+class DatasetGenerator:
+    def __init__(self, batch_size=1000, nb_structures=30, messages_per_object=2, documents_per_object=1, seed=None):
+        if seed is not None:
+            random.seed(seed)
+            factory.random.reseed_random(seed)
+        self.batch_size = batch_size
+        self.nb_structures = nb_structures
+        self.messages_per_object = messages_per_object
+        self.documents_per_object = documents_per_object
+        self._numeros = {}
+
+    def setup(self):
+        """Crée les structures et leurs agents, dont l'utilisateur de la commande `run_benchmark` au premier appel."""
+        structures = StructureFactory.create_batch(self.nb_structures)
+        Contact.objects.bulk_create(
+            [Contact(structure=structure, email=f"structure-{structure.pk}@example.com") for structure in structures]
+        )
+        agents = [AgentFactory(structure=structure) for structure in structures for _ in range(2)]
+        Contact.objects.bulk_create([Contact(agent=agent, email=agent.user.email) for agent in agents])
+
+        if not get_user_model().objects.filter(email=BENCHMARK_USER_EMAIL).exists():
+            user = agents[0].user
+            user.email = user.username = BENCHMARK_USER_EMAIL
+            user.is_active = True
+            user.save()
+            for name in (settings.SV_GROUP, settings.SSA_GROUP):
+                group, _ = Group.objects.get_or_create(name=name)
+                user.groups.add(group)
+
+        self.structures = structures
+        self.structure_contacts = {
+            contact.structure_id: contact for contact in Contact.objects.filter(structure__in=structures)
+        }
+        self.agent_contacts = defaultdict(list)
+        for contact in Contact.objects.filter(agent__in=agents).select_related("agent__structure"):
+            self.agent_contacts[contact.agent.structure_id].append(contact)
+        self.departements = list(Departement.objects.all())
+        if not default_storage.exists(DOCUMENT_PATH):
+            default_storage.save(DOCUMENT_PATH, ContentFile(DOCUMENT_CONTENT))
+
+    def random_datetime(self):
+        return fake.date_time_this_decade(tzinfo=datetime.UTC)
+
+    def choice(self, values):
+        return factory.LazyFunction(lambda: random.choice(values))
+
+    def choice_with_weights(self, weights: dict):
+        return factory.LazyFunction(lambda: random.choices(list(weights), weights=list(weights.values()))[0])
+
+    def get_etat(self):
+        return self.choice_with_weights(
+            {WithEtatMixin.Etat.EN_COURS: 70, WithEtatMixin.Etat.CLOTURE: 25, WithEtatMixin.Etat.BROUILLON: 5}
+        )
+
+    def get_numero(self, model):
+        """Numéros d'évènement à la suite de ceux déjà en base, pour respecter l'unicité (année, numéro)."""
+        if model not in self._numeros:
+            last = model._base_manager.aggregate(last=models.Max("numero_evenement"))["last"] or 0
+            self._numeros[model] = itertools.count(last + 1)
+        counter = self._numeros[model]
+        return factory.LazyFunction(lambda: next(counter))
+
+    def get_etablissement_kwargs(self):
+        """Valeurs des établissements dont les factories feraient une requête ou créeraient une instance de Faker."""
+        return {
+            "departement": self.choice(self.departements),
+            "numero_agrement": factory.LazyFunction(lambda: fake.numerify("##.###.###")),
+        }
+
+    def get_referentiel(self, factory_class, count=20):
+        """Objets d'un référentiel, créés avec `factory_class` si la table est vide."""
+        objects = list(factory_class._meta.model.objects.all()[:200])
+        return objects or factory_class.create_batch(count)
+
+    def _prepare(self, model, objects):
+        auto_now_fields = _get_auto_now_fields(model)
+        datetime_fields = [f for f in model._meta.concrete_fields if isinstance(f, models.DateTimeField)]
+        for obj in objects:
+            for field in auto_now_fields:
+                if getattr(obj, field.attname) is None:
+                    value = self.random_datetime()
+                    setattr(obj, field.attname, value if isinstance(field, models.DateTimeField) else value.date())
+            # Certaines factories donnent des dates ou des dates sans fuseau horaire pour des champs DateTimeField
+            for field in datetime_fields:
+                value = getattr(obj, field.attname)
+                if value is None:
+                    continue
+                if not isinstance(value, datetime.datetime):
+                    value = datetime.datetime.combine(value, datetime.time(12))
+                if timezone.is_naive(value):
+                    value = timezone.make_aware(value)
+                setattr(obj, field.attname, value)
+
+    def bulk_create(self, model, objects):
+        self._prepare(model, objects)
+        with without_auto_now(model):
+            return model._base_manager.bulk_create(objects, batch_size=self.batch_size)
+
+    def create_batches(self, factory_class, count, **kwargs):
+        """Construit `count` objets avec `factory_class` et les insère par lots : chaque lot inséré est renvoyé."""
+        model = factory_class._meta.model
+        for start in range(0, count, self.batch_size):
+            with transaction.atomic():
+                yield self.bulk_create(model, factory_class.build_batch(min(self.batch_size, count - start), **kwargs))
+
+    def create_children(self, factory_class, parents, parent_field, nb_min=1, nb_max=3, **kwargs):
+        """Crée entre `nb_min` et `nb_max` objets liés à chacun des `parents` par `parent_field`."""
+        children = [
+            factory_class.build(**{parent_field: parent}, **kwargs)
+            for parent in parents
+            for _ in range(random.randint(nb_min, nb_max))
+        ]
+        return self.bulk_create(factory_class._meta.model, children)
+
+    def finalize(self, objects, related=None):
+        """Calcule pour un lot d'objets principaux ce que tiennent à jour les signaux, puis crée leur bloc commun.
+
+        `related` associe à la clé primaire de chaque objet les objets liés enregistrés dans sa révision."""
+        model = type(objects[0])
+        pks = [obj.pk for obj in objects]
+        if issubclass(model, WithSearchVectorMixin):
+            model.update_search_vector(*pks)
+        if issubclass(model, WithVisibiliteMixin):
+            model.update_structures_acces(*pks)
+        content_type = ContentType.objects.get_for_model(model)
+        contacts = self.add_contacts(objects)
+        self.add_messages(objects, contacts)
+        self.add_documents(objects)
+        self.add_fins_de_suivi(objects, contacts, content_type)
+        self.add_revisions(objects, related or {})
+
+    def add_contacts(self, objects):
+        model = type(objects[0])
+        field = model._meta.get_field("contacts")
+        source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+        contacts = {}
+        for obj in objects:
+            structures = {
+                obj.createur_id,
+                *(s.pk for s in random.sample(self.structures, k=random.randint(1, min(4, len(self.structures))))),
+            }
+            contacts[obj.pk] = [self.structure_contacts[pk] for pk in structures] + self.agent_contacts[obj.createur_id]
+        field.remote_field.through.objects.bulk_create(
+            [
+                field.remote_field.through(**{f"{source}_id": pk, f"{target}_id": contact.pk})
+                for pk, object_contacts in contacts.items()
+                for contact in object_contacts
+            ]
+        )
+        return contacts
+
+    def add_messages(self, objects, contacts):
+        messages = []
+        for obj in objects:
+            for _ in range(self.messages_per_object):
+                sender = random.choice(self.agent_contacts[obj.createur_id])
+                messages.append(
+                    MessageFactory.build(
+                        content_object=obj,
+                        sender=sender,
+                        sender_structure=sender.agent.structure,
+                        date_publication=self.random_datetime(),
+                    )
+                )
+        messages = self.bulk_create(Message, messages)
+        Message.recipients.through.objects.bulk_create(
+            [
+                Message.recipients.through(message_id=message.pk, contact_id=contact.pk)
+                for message in messages
+                for contact in contacts[message.object_id]
+                if contact.structure_id
+            ]
+        )
+        Message.update_search_text(*(message.pk for message in messages))
+
+    def add_documents(self, objects):
+        documents = [
+            DocumentFactory.build(
+                content_object=obj,
+                file=DOCUMENT_PATH,
+                mimetype="application/pdf",
+                is_infected=False,
+                created_by=None,
+                created_by_structure=obj.createur,
+            )
+            for obj in objects
+            for _ in range(self.documents_per_object)
+        ]
+        self.bulk_create(Document, documents)
+
+    def add_fins_de_suivi(self, objects, contacts, content_type):
+        fins_de_suivi = [
+            FinSuiviContact(content_type=content_type, object_id=obj.pk, contact=contact)
+            for obj in objects
+            if random.random() < 0.1
+            for contact in contacts[obj.pk][:1]
+        ]
+        FinSuiviContact.objects.bulk_create(fins_de_suivi)
+
+    def add_revisions(self, objects, related):
+        revisions = Revision.objects.bulk_create(
+            [
+                Revision(date_created=getattr(obj, "date_creation", None) or timezone.now(), comment="")
+                for obj in objects
+            ]
+        )
+        Version.objects.bulk_create(
+            [
+                Version(
+                    revision=revision,
+                    object_id=str(version_object.pk),
+                    content_type=ContentType.objects.get_for_model(version_object),
+                    db="default",
+                    format="json",
+                    serialized_data=serializers.serialize("json", [version_object]),
+                    object_repr=str(version_object)[:191],
+                )
+                for obj, revision in zip(objects, revisions)
+                for version_object in [obj, *related.get(obj.pk, [])]
+            ],
+            batch_size=self.batch_size,
+        )
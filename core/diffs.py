@@ -1,17 +1,21 @@
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
-from functools import cache
+from functools import cache, lru_cache
 import json
 import logging
 
-from django.contrib.contenttypes.fields import GenericRelation
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache as django_cache
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.serializers.base import DeserializationError
 from django.db import models
 from django.db.models import ManyToOneRel
 from django.utils import timezone
 from django.utils.encoding import force_str
-from reversion import is_registered
+from reversion import get_registered_models, is_registered
 from reversion.models import Revision, Version
 from reversion.revisions import _get_options
 from reversion_compare.compare import (
@@ -108,7 +112,99 @@ def force_update_on_version(object):
             last_version.save(update_fields=["serialized_data"])
 
 
+HISTORY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def get_history_cache_key(model, pk):
+    return f"revision-history:{ContentType.objects.get_for_model(model).pk}:{pk}"
+
+
+def get_cached_history(obj, compute_history):
+    """Retourne l'historique (liste de `Diff`) de l'objet, calculé par `compute_history` uniquement s'il n'est pas
+    déjà en cache. Le cache est invalidé à chaque nouvelle version de l'objet ou d'un objet suivi dans son historique."""
+    key = get_history_cache_key(obj.__class__, obj.pk)
+    history = django_cache.get(key)
+    if history is None:
+        history = compute_history()
+        django_cache.set(key, history, HISTORY_CACHE_TIMEOUT)
+    return history
+
+
 @cache
+def _get_history_parents_accessors(model):
+    """Fonctions permettant de retrouver, pour un objet du modèle, les objets (modèle, pk) dont l'historique l'inclut :
+    objets qui le suivent via `reversion.register(follow=...)` et objet générique auquel il est rattaché."""
+    accessors = []
+    for parent_model in get_registered_models():
+        for name in _get_options(parent_model).follow:
+            field = parent_model._meta.get_field(name)
+            if field.related_model is not model or field.many_to_many:
+                continue
+            if isinstance(field, GenericRelation):
+                content_type_attname = model._meta.get_field(field.content_type_field_name).attname
+
+                def accessor(obj, parent_model=parent_model, field=field, content_type_attname=content_type_attname):
+                    if getattr(obj, content_type_attname) == ContentType.objects.get_for_model(parent_model).pk:
+                        return [(parent_model, getattr(obj, field.object_id_field_name))]
+                    return []
+
+            elif field.auto_created:
+
+                def accessor(obj, parent_model=parent_model, field=field):
+                    return [(parent_model, getattr(obj, field.field.attname))]
+
+            else:
+
+                def accessor(obj, parent_model=parent_model, name=name):
+                    pks = parent_model._base_manager.filter(**{name: obj.pk}).values_list("pk", flat=True)
+                    return [(parent_model, pk) for pk in pks]
+
+            accessors.append(accessor)
+
+    for field in model._meta.private_fields:
+        if isinstance(field, GenericForeignKey):
+
+            def accessor(obj, field=field):
+                content_type_id = getattr(obj, model._meta.get_field(field.ct_field).attname)
+                if not content_type_id:
+                    return []
+                parent_model = ContentType.objects.get_for_id(content_type_id).model_class()
+                return [(parent_model, getattr(obj, field.fk_field))]
+
+            accessors.append(accessor)
+    return accessors
+
+
+def invalidate_history(model, pk, obj=None, seen=None):
+    """Supprime du cache l'historique de l'objet et celui des objets dont l'historique l'inclut."""
+    seen = seen if seen is not None else set()
+    if pk is None or (model, str(pk)) in seen:
+        return
+    seen.add((model, str(pk)))
+    django_cache.delete(get_history_cache_key(model, pk))
+
+    obj = obj or model._base_manager.filter(pk=pk).first()
+    if obj is None:
+        return
+    for accessor in _get_history_parents_accessors(model):
+        for parent_model, parent_pk in accessor(obj):
+            if parent_model is not None:
+                invalidate_history(parent_model, parent_pk, seen=seen)
+
+
+def invalidate_history_for_version(version, seen=None):
+    model = version.content_type.model_class()
+    obj = model._base_manager.filter(pk=version.object_id).first()
+    if obj is None:
+        # L'objet a été supprimé : on se base sur les données de la version pour retrouver ses parents
+        try:
+            obj = version._object_version.object
+        except DeserializationError:
+            obj = None
+    invalidate_history(model, version.object_id, obj=obj, seen=seen)
+
+
+@lru_cache(maxsize=settings.REVERSION_LOOKUP_CACHE_SIZE)
 def get_queryset_with_related_objects(old_revision, related_model, target_ids):
     return {
         ver.object_id: ver
@@ -118,6 +214,19 @@ def get_queryset_with_related_objects(old_revision, related_model, target_ids):
     }
 
 
+@contextmanager
+def related_objects_cache():
+    """Limite la durée de vie du cache de `get_queryset_with_related_objects` au calcul d'un historique :
+    les versions ne restent pas en mémoire dans le worker et ne peuvent pas être périmées d'une requête à l'autre."""
+    get_queryset_with_related_objects.cache_clear()
+    try:
+        yield
+    finally:
+        info = get_queryset_with_related_objects.cache_info()
+        logger.debug(f"Related objects cache: {info.hits} hits, {info.misses} misses, {info.currsize} entries")
+        get_queryset_with_related_objects.cache_clear()
+
+
 class CompareObject(InitialCompareObject):
     def get_many_to_something(self, target_ids, related_model, is_reverse=False):
         """
@@ -0,0 +1,33 @@
+"""Rendu des documents Word (.docx) des évènements (bouton « Télécharger »).
+
+Les sous-documents sont composés en mémoire : aucun fichier intermédiaire n'est écrit sur le disque, deux exports
+simultanés ne peuvent donc plus se gêner."""
+
+from functools import cache
+import io
+
+from django.conf import settings
+from docxtpl import DocxTemplate
+
+DOCX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+@cache
+def _read_template(template_name) -> bytes:
+    return (settings.BASE_DIR / template_name).read_bytes()
+
+
+def get_docx_template(template_name) -> DocxTemplate:
+    """Le fichier du gabarit n'est lu qu'une fois par processus, chaque rendu travaille sur sa propre copie."""
+    return DocxTemplate(io.BytesIO(_read_template(template_name)))
+
+
+def render_docx(template: DocxTemplate, context) -> bytes:
+    template.render(context)
+    stream = io.BytesIO()
+    template.save(stream)
+    return stream.getvalue()
+
+
+def new_subdoc(doc: DocxTemplate, template_name, context):
+    return doc.new_subdoc(io.BytesIO(render_docx(get_docx_template(template_name), context)))
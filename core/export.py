@@ -1,59 +1,241 @@
+import csv
 from datetime import date, datetime
+from functools import cache
+import gzip
+import io
+import shutil
 
+from django.apps import apps
 from django.contrib.postgres.fields import ArrayField
 from django.core.exceptions import FieldDoesNotExist
+from django.core.files.base import ContentFile
 from django.utils.html import strip_tags
 
-from core.models import Departement
+from core.models import Departement, Export
+from core.notifications import notify_export_failed, notify_export_is_ready
+from core.storage import open_for_streaming_write
 
 
-class BaseExport:
-    blank_value = None
+@cache
+def _resolve_attribute(model, attr):
+    """Retourne, pour un attribut d'un modèle, la méthode d'affichage et les choix à utiliser lors de l'export.
+
+    Le résultat ne dépend que de la classe du modèle : il est calculé une seule fois par couple (modèle, attribut)
+    au lieu de l'être pour chaque cellule exportée."""
+    display_method = f"get_{attr}_display"
+    if hasattr(model, display_method):
+        return display_method, None
+
+    try:
+        model_field = model._meta.get_field(attr)
+    except (AttributeError, FieldDoesNotExist):
+        return None, None
+
+    if isinstance(model_field, ArrayField) and getattr(model_field.base_field, "choices", None):
+        return None, dict(model_field.base_field.choices)
+    return None, None
 
-    def get_field_value(self, instance, field):
-        attrs = field.split("__")
-        for i, attr in enumerate(attrs):
-            is_last = i == len(attrs) - 1
 
+class FieldAccessor:
+    """Accès pré-compilé à la valeur d'un champ exporté (ex: `evenement__organisme_nuisible__libelle_court`)."""
+
+    def __init__(self, field, blank_value, format_value):
+        *self.path, self.attr = field.split("__")
+        self.blank_value = blank_value
+        self.format_value = format_value
+
+    def __call__(self, instance):
+        for attr in self.path:
             if instance is None:
                 return ""
+            instance = getattr(instance, attr, self.blank_value)
 
-            value = getattr(instance, attr, self.blank_value)
-            if value is None:
-                return ""
+        if instance is None:
+            return ""
+
+        value = getattr(instance, self.attr, self.blank_value)
+        if value is None:
+            return ""
+
+        display_method, choices = _resolve_attribute(type(instance), self.attr)
+        if display_method:
+            return getattr(instance, display_method)()
+        if choices is not None:
+            return ", ".join(strip_tags(choices.get(v, v)) for v in value or [])
+        return self.format_value(value)
 
-            try:
-                model_field = instance._meta.get_field(attr)
-            except FieldDoesNotExist:
-                model_field = None
-
-            if is_last:
-                display_method = f"get_{attr}_display"
-
-                if hasattr(instance, display_method):
-                    return getattr(instance, display_method)()
-                if (
-                    model_field
-                    and isinstance(model_field, ArrayField)
-                    and getattr(model_field.base_field, "choices", None)
-                ):
-                    choices_dict = dict(model_field.base_field.choices)
-                    return ", ".join(strip_tags(choices_dict.get(v, v)) for v in value or [])
-                if isinstance(value, list):
-                    return ",".join(value) if value else None
-                if isinstance(value, datetime):
-                    return value.strftime("%d/%m/%Y %H:%M")
-                if isinstance(value, date):
-                    return value.strftime("%d/%m/%Y")
-                if isinstance(value, Departement):
-                    return str(value)
-                if isinstance(value, bool):
-                    return "Oui" if value is True else "Non"
-                return value
-
-            instance = value
+
+class BaseExport:
+    blank_value = None
+    chunk_size = 500
+    filename = None
+    # Modèle du domaine de l'export, utilisé pour choisir l'adresse du destinataire de la notification
+    model = None
+
+    def __init__(self):
+        self._accessors = {}
+        self._contacts = {}
+
+    def get_fieldnames(self):
+        raise NotImplementedError
+
+    def get_lines_from_instance(self, instance):
+        raise NotImplementedError
+
+    def format_value(self, value):
+        if isinstance(value, list):
+            return ",".join(value) if value else None
+        if isinstance(value, datetime):
+            return value.strftime("%d/%m/%Y %H:%M")
+        if isinstance(value, date):
+            return value.strftime("%d/%m/%Y")
+        if isinstance(value, Departement):
+            return str(value)
+        if isinstance(value, bool):
+            return "Oui" if value is True else "Non"
+        return value
+
+    def get_accessors(self, fields):
+        key = tuple(fields)
+        if key not in self._accessors:
+            self._accessors[key] = [
+                (header, FieldAccessor(field, self.blank_value, self.format_value)) for field, header in fields
+            ]
+        return self._accessors[key]
 
     def add_data(self, result, instance, fields):
-        for field, header in fields:
-            result[header] = self.get_field_value(instance, field)
+        for header, accessor in self.get_accessors(fields):
+            result[header] = accessor(instance)
         return result
+
+    def iter_instances(self, querysets):
+        """Parcourt les querysets par paquets de `chunk_size` lignes (curseur côté serveur),
+        les prefetch étant appliqués à chaque paquet : la mémoire utilisée ne dépend pas du nombre de lignes."""
+        for queryset in querysets:
+            yield from queryset.iterator(chunk_size=self.chunk_size)
+
+    def get_writer(self, stream):
+        return csv.DictWriter(
+            stream,
+            fieldnames=self.get_fieldnames(),
+            quoting=csv.QUOTE_ALL,
+            doublequote=True,
+        )
+
+    def write_lines(self, writer, instances):
+        nb_lines = 0
+        for instance in instances:
+            for line in self.get_lines_from_instance(instance):
+                writer.writerow(line)
+                nb_lines += 1
+        return nb_lines
+
+    def write_csv(self, stream, querysets):
+        writer = self.get_writer(stream)
+        writer.writeheader()
+        return self.write_lines(writer, self.iter_instances(querysets))
+
+    def stream_csv(self, querysets):
+        """Générateur des lignes CSV, destiné à une `StreamingHttpResponse`."""
+        writer = self.get_writer(_Echo())
+        yield writer.writeheader()
+        for instance in self.iter_instances(querysets):
+            for line in self.get_lines_from_instance(instance):
+                yield writer.writerow(line)
+
+    def get_queryset(self, model, ids, contact):
+        raise NotImplementedError
+
+    def get_contact(self, task):
+        if task.user_id not in self._contacts:
+            self._contacts[task.user_id] = task.user.agent.structure.contact_set.get()
+        return self._contacts[task.user_id]
+
+    def get_chunk_querysets(self, task, chunk):
+        contact = self.get_contact(task)
+        return [self.get_queryset(apps.get_model(model_label), ids, contact) for model_label, ids in chunk]
+
+    def export(self, task_id):
+        task = Export.objects.select_related("user__agent__structure").get(id=task_id)
+        while not (task.task_done or task.task_failed):
+            self.export_chunk_or_clean(task)
+
+    def export_next_chunk(self, task_id):
+        """Exporte un seul paquet d'objets de la tâche, retourne True lorsque l'export est terminé ou a échoué.
+
+        Permet à la tâche Celery de se replanifier entre deux paquets pour ne pas bloquer le worker."""
+        task = Export.objects.select_related("user__agent__structure").get(id=task_id)
+        if not (task.task_done or task.task_failed):
+            self.export_chunk_or_clean(task)
+        return task.task_done or task.task_failed
+
+    def export_chunk_or_clean(self, task):
+        """Exporte le paquet suivant ; en cas d'erreur l'export est marqué en échec et ne sera pas repris.
+
+        Un worker arrêté brutalement ne passe pas par ici : le message Celery est redélivré et les fichiers partiels
+        déjà écrits sont réutilisés."""
+        try:
+            self.export_chunk(task)
+        except Exception:
+            self.mark_as_failed(task)
+            raise
+
+    def mark_as_failed(self, task):
+        """Supprime les fichiers partiels et remet la progression à zéro : un export en échec n'est jamais repris à
+        partir d'un curseur dont les lignes précédentes ont été perdues."""
+        storage = task.file.storage
+        for part in task.parts:
+            storage.delete(part)
+        task.cursor, task.nb_lines, task.parts, task.task_failed = 0, 0, [], True
+        Export.objects.filter(pk=task.pk).update(cursor=0, nb_lines=0, parts=[], task_failed=True)
+        notify_export_failed(task, object=self.model)
+
+    def export_chunk(self, task):
+        if task.task_failed:
+            return
+        chunk = task.get_next_chunk(self.chunk_size)
+        if not chunk:
+            return self.finalize(task)
+
+        stream = io.StringIO(newline="")
+        nb_lines = self.write_lines(self.get_writer(stream), self.iter_instances(self.get_chunk_querysets(task, chunk)))
+        storage = task.file.storage
+        part = storage.save(
+            f"export/parts/{task.pk}/{task.cursor}.csv.gz", ContentFile(gzip.compress(stream.getvalue().encode()))
+        )
+
+        cursor = task.cursor
+        task.cursor += sum(len(ids) for _, ids in chunk)
+        task.nb_lines += nb_lines
+        task.parts = [*task.parts, part]
+        updated = Export.objects.filter(pk=task.pk, cursor=cursor).update(
+            cursor=task.cursor, nb_lines=task.nb_lines, parts=task.parts
+        )
+        if not updated:
+            # Le même paquet a déjà été traité par un autre worker (message Celery redélivré)
+            storage.delete(part)
+            task.refresh_from_db()
+
+    def finalize(self, task):
+        storage = task.file.storage
+        header = io.StringIO(newline="")
+        self.get_writer(header).writeheader()
+        name = task.file.field.generate_filename(task, self.filename)
+        with open_for_streaming_write(storage, name) as (file, name):
+            file.write(header.getvalue().encode())
+            for part in task.parts:
+                with storage.open(part, "rb") as part_file, gzip.GzipFile(fileobj=part_file) as content:
+                    shutil.copyfileobj(content, file)
+
+        task.file.name = name
+        task.task_done = True
+        task.save()
+        for part in task.parts:
+            storage.delete(part)
+        # Seul le domaine de l'objet est utilisé pour choisir l'adresse du destinataire
+        notify_export_is_ready(task, object=self.model)
+
+
+class _Echo:
+    def write(self, value):
+        return value
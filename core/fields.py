@@ -2,7 +2,9 @@ from django import forms
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ObjectDoesNotExist
+from django.forms.models import ModelChoiceIterator
 
+from core.cache import get_or_set
 from core.content_types import content_type_str_to_obj
 
 
@@ -67,6 +69,46 @@ class DSFRCheckboxInput(forms.CheckboxInput):
         return context
 
 
+class CachedModelChoiceIterator(ModelChoiceIterator):
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        yield from self.field.get_cached_choices()
+
+    def __len__(self):
+        return len(self.field.get_cached_choices()) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.get_cached_choices())
+
+
+class CachedChoicesMixin:
+    """Les choix affichés sont lus dans le cache applicatif (voir `core.cache`) : le queryset ne sert plus qu'à
+    valider les valeurs envoyées. `cache_tags` doit couvrir tout ce dont dépendent le queryset et les libellés."""
+
+    iterator = CachedModelChoiceIterator
+
+    def __init__(self, queryset, *, cache_name, cache_tags, **kwargs):
+        self.cache_name = cache_name
+        self.cache_tags = cache_tags
+        super().__init__(queryset, **kwargs)
+
+    def get_cached_choices(self):
+        return get_or_set(
+            self.cache_name,
+            lambda: [(obj.pk, self.label_from_instance(obj)) for obj in self.queryset],
+            self.cache_tags,
+        )
+
+
+class CachedChoicesModelChoiceField(CachedChoicesMixin, forms.ModelChoiceField):
+    pass
+
+
+class CachedChoicesModelMultipleChoiceField(CachedChoicesMixin, forms.ModelMultipleChoiceField):
+    pass
+
+
 class ContactModelMultipleChoiceField(forms.ModelMultipleChoiceField):
     def label_from_instance(self, obj):
         return obj.display_with_agent_unit
@@ -2,12 +2,50 @@ from django.forms import DateInput
 from django.forms.widgets import TextInput
 import django_filters
 
+from core.cache import CONTACTS_TAG
+from core.choice_trees import register_choice_tree
+from core.fields import CachedChoicesModelMultipleChoiceField
 from core.mixins import WithEtatMixin
 from core.models import Contact, Structure
 from core.widgets import TreeselectCheckbox
 from seves import settings
 
 
+def get_structure_contacts():
+    return (
+        Contact.objects.filter(structure__in=Structure.objects.can_be_contacted())
+        .order_by("structure__libelle")
+        .select_related("structure")
+    )
+
+
+def get_agent_contacts():
+    return (
+        Contact.objects.agents_only()
+        .can_be_emailed()
+        .select_related("agent", "agent__structure")
+        .order_by_contact_name()
+    )
+
+
+STRUCTURE_CONTACT_TREE = register_choice_tree(
+    "structure_contact",
+    lambda: [(contact.pk, str(contact)) for contact in get_structure_contacts()],
+    cache_tags=[CONTACTS_TAG],
+)
+AGENT_CONTACT_TREE = register_choice_tree(
+    "agent_contact",
+    lambda: [(contact.pk, str(contact)) for contact in get_agent_contacts()],
+    cache_tags=[CONTACTS_TAG],
+)
+
+
+class CachedModelMultipleChoiceFilter(django_filters.ModelMultipleChoiceFilter):
+    """Filtre dont les choix sont servis par le cache applicatif (arguments `cache_name` et `cache_tags`)."""
+
+    field_class = CachedChoicesModelMultipleChoiceField
+
+
 class WithNumeroFilterMixin(django_filters.FilterSet):
     annee = django_filters.CharFilter(
         method="filter_annee",
@@ -50,17 +88,13 @@ class WithStructureContactFilterMixin(django_filters.FilterSet):
         widget=TreeselectCheckbox(
             choices=(),
             attrs={"min_search_length": 1, "placeholder": "Rechercher"},
+            choice_tree=STRUCTURE_CONTACT_TREE,
         ),
     )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        queryset = (
-            Contact.objects.filter(structure__in=Structure.objects.can_be_contacted())
-            .order_by("structure__libelle")
-            .select_related("structure")
-        )
-        self.filters["structure_contact"].queryset = queryset
+        self.filters["structure_contact"].queryset = get_structure_contacts()
 
     def filter_structure_contact(self, queryset, name, value):
         if not value:
@@ -73,18 +107,12 @@ class WithAgentContactFilterMixin(django_filters.FilterSet):
         label="Agent en contact",
         queryset=Contact.objects.none(),
         method="filter_agent_contact",
-        widget=TreeselectCheckbox(choices=(), attrs={"placeholder": "Rechercher"}),
+        widget=TreeselectCheckbox(choices=(), attrs={"placeholder": "Rechercher"}, choice_tree=AGENT_CONTACT_TREE),
     )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        queryset = (
-            Contact.objects.agents_only()
-            .can_be_emailed()
-            .select_related("agent", "agent__structure")
-            .order_by_contact_name()
-        )
-        self.filters["agent_contact"].queryset = queryset
+        self.filters["agent_contact"].queryset = get_agent_contacts()
 
     def filter_agent_contact(self, queryset, name, value):
         if not value:
@@ -0,0 +1,52 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from core.dataset import BENCHMARK_USER_EMAIL, DatasetGenerator
+from ssa.dataset import generate_evenements_produit, generate_investigations_cas_humain
+from sv.dataset import generate_evenements
+from tiac.dataset import generate_evenements_simples, generate_investigations
+
+GENERATORS = {
+    "sv": ("évènements SV", generate_evenements, 30_000),
+    "ssa_produit": ("évènements produit", generate_evenements_produit, 100_000),
+    "ssa_cas_humain": ("investigations de cas humain", generate_investigations_cas_humain, 10_000),
+    "tiac_simple": ("évènements simples TIAC", generate_evenements_simples, 10_000),
+    "tiac_investigation": ("investigations TIAC", generate_investigations, 10_000),
+}
+
+
+class Command(BaseCommand):
+    help = """
+        Génère un jeu de données aux volumes de production (insertions par lots), pour reproduire les problèmes de
+        performance en local et servir de base à la commande run_benchmark. Ne pas lancer en production.
+        Usage: python manage.py generate_dataset --scale 0.1
+    """
+
+    def add_arguments(self, parser):
+        for name, (label, _, default) in GENERATORS.items():
+            parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, help=f"Nombre de {label}")
+        parser.add_argument("--scale", type=float, default=1, help="Coefficient appliqué à tous les volumes")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--messages", type=int, default=2, help="Nombre de messages par objet")
+        parser.add_argument("--documents", type=int, default=1, help="Nombre de documents par objet")
+        parser.add_argument("--structures", type=int, default=30, help="Nombre de structures créées")
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        generator = DatasetGenerator(
+            batch_size=options["batch_size"],
+            nb_structures=options["structures"],
+            messages_per_object=options["messages"],
+            documents_per_object=options["documents"],
+            seed=options["seed"],
+        )
+        generator.setup()
+        for name, (label, generate, _) in GENERATORS.items():
+            count = round(options[name] * options["scale"])
+            created = 0
+            for batch_count in generate(generator, count):
+                created += batch_count
+                self.stdout.write(f"{label} : {created}/{count}")
+
+        call_command("refresh_evenement_produit_view", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"Jeu de données généré, utilisateur de test : {BENCHMARK_USER_EMAIL}"))
@@ -1,18 +1,30 @@
 import csv
 import time
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand
 from django.core.validators import validate_email
 from django.db import transaction
-from django.db.utils import DataError
 
+from core.cache import CONTACTS_TAG, invalidate_tags_on_commit
 from core.constants import SEVES_STRUCTURE
 from core.models import Agent, Contact, Structure
 
 User = get_user_model()
 
+AGENT_FIELDS = [
+    "structure_complete",
+    "prenom",
+    "nom",
+    "fonction_hierarchique",
+    "complement_fonction",
+    "telephone",
+    "mobile",
+]
+
 
 class Command(BaseCommand):
     help = "Importe des contacts à partir d'un fichier CSV (export Agricoll)"
@@ -26,80 +38,168 @@ class Command(BaseCommand):
             if not row["Mail"].strip().lower() == "inconnu":
                 yield row
 
-    def save_contact(self, row, ligne):
-        try:
-            # Contact pour structure
-            parts = row["Structure"].split("/")
-            niveau1 = ""
-            niveau2 = ""
-
-            if row["Structure"].startswith("AC/DAC/DGAL"):
-                niveau1 = "/".join(parts[:3])
-                niveau2 = "/".join(parts[3:])
-            elif row["Structure"].startswith(("SD/DRAAF", "SD/DAAF", "DDI/DDPP", "DDI/DDETSPP")):
-                niveau1 = "/".join(parts[:2])
-                niveau2 = parts[2]
-            elif row["Structure"].startswith("UE/MINISTERES/MEEDDM/DDE"):
-                niveau1 = "/".join(parts[:4])
-                niveau2 = parts[4]
-
+    def get_niveaux(self, structure_complete):
+        parts = structure_complete.split("/")
+        if structure_complete.startswith("AC/DAC/DGAL"):
+            return "/".join(parts[:3]), "/".join(parts[3:])
+        if structure_complete.startswith(("SD/DRAAF", "SD/DAAF", "DDI/DDPP", "DDI/DDETSPP")):
+            return "/".join(parts[:2]), parts[2]
+        if structure_complete.startswith("UE/MINISTERES/MEEDDM/DDE"):
+            return "/".join(parts[:4]), parts[4]
+        return "", ""
+
+    def check_max_length(self, model, values, ligne):
+        for field_name, value in values.items():
+            max_length = model._meta.get_field(field_name).max_length
+            if max_length and len(value) > max_length:
+                raise Exception(
+                    f"Erreur lors de l'importation à la ligne {ligne} : "
+                    f"la valeur de '{field_name}' dépasse {max_length} caractères"
+                )
+
+    def read_rows(self, reader):
+        """Retourne les structures trouvées et les données des agents indexées par email (la dernière ligne l'emporte)"""
+        structures_keys = set()
+        agents_data = {}
+        ligne = 1
+        for row in self.clean_contacts_data(reader):
+            ligne += 1
+            niveau1, niveau2 = self.get_niveaux(row["Structure"])
             if not niveau1:
-                return
+                continue
+            self.check_max_length(Structure, {"niveau1": niveau1, "niveau2": niveau2}, ligne)
+            structures_keys.add((niveau1, niveau2))
 
-            structure, _ = Structure.objects.get_or_create(
-                niveau1=niveau1, niveau2=niveau2, defaults={"libelle": niveau2 or niveau1}
-            )
-
-            Contact.objects.get_or_create(structure=structure)
-
-            # Contact pour agent
             try:
                 validate_email(row["Mail"])
-                email = row["Mail"]
             except ValidationError:
-                return
-
-            user, _ = User.objects.get_or_create(username=email, email=email, defaults={"is_active": False})
-            self.found_emails.append(email)
-
-            agent, _ = Agent.objects.update_or_create(
-                user=user,
-                defaults={
-                    "structure": structure,
-                    "structure_complete": row["Structure"],
-                    "prenom": row["Prénom"],
-                    "nom": row["Nom"],
-                    "fonction_hierarchique": row.get("Fonction_hiérarchique", ""),
-                    "complement_fonction": row.get("Complément_fonction", ""),
-                    "telephone": row.get("Téléphone", ""),
-                    "mobile": row.get("Mobile", ""),
-                },
+                continue
+
+            email = row["Mail"]
+            values = {
+                "structure_complete": row["Structure"],
+                "prenom": row["Prénom"],
+                "nom": row["Nom"],
+                "fonction_hierarchique": row.get("Fonction_hiérarchique", ""),
+                "complement_fonction": row.get("Complément_fonction", ""),
+                "telephone": row.get("Téléphone", ""),
+                "mobile": row.get("Mobile", ""),
+            }
+            self.check_max_length(Agent, values, ligne)
+            self.check_max_length(User, {"username": email, "email": email}, ligne)
+            agents_data[email] = ((niveau1, niveau2), values)
+        return structures_keys, agents_data
+
+    def save_structures(self, structures_keys):
+        structures = {(s.niveau1, s.niveau2): s for s in Structure.objects.all()}
+        new_structures = [
+            Structure(niveau1=niveau1, niveau2=niveau2, libelle=niveau2 or niveau1)
+            for niveau1, niveau2 in structures_keys
+            if (niveau1, niveau2) not in structures
+        ]
+        for structure in Structure.objects.bulk_create(new_structures):
+            structures[(structure.niveau1, structure.niveau2)] = structure
+
+        structures_ids = {structures[key].pk for key in structures_keys}
+        with_contact = set(
+            Contact.objects.filter(structure_id__in=structures_ids).values_list("structure_id", flat=True)
+        )
+        Contact.objects.bulk_create(
+            [Contact(structure_id=structure_id) for structure_id in structures_ids - with_contact]
+        )
+        self.stats["structures"] = len(new_structures)
+        return structures
+
+    def save_users(self, emails):
+        users = {user.username: user for user in User.objects.filter(username__in=list(emails))}
+        new_users = [User(username=email, email=email, is_active=False) for email in emails if email not in users]
+        new_users = User.objects.bulk_create(new_users)
+        for user in new_users:
+            users[user.username] = user
+
+        # bulk_create n'envoie pas le signal post_save qui ajoute les groupes par défaut
+        if settings.USERS_DEFAULT_GROUPS and new_users:
+            groups = Group.objects.filter(name__in=settings.USERS_DEFAULT_GROUPS)
+            User.groups.through.objects.bulk_create(
+                [User.groups.through(user_id=user.pk, group_id=group.pk) for user in new_users for group in groups]
             )
-
-            Contact.objects.update_or_create(
-                agent=agent,
-                defaults={
-                    "email": email,
-                },
+        self.stats["users"] = len(new_users)
+        return users
+
+    def save_agents(self, agents_data, structures, users):
+        agents = {
+            agent.user_id: agent for agent in Agent.objects.filter(user_id__in=[user.pk for user in users.values()])
+        }
+        new_agents, updated_agents = [], []
+        for email, (structure_key, values) in agents_data.items():
+            user = users[email]
+            values = {**values, "structure_id": structures[structure_key].pk}
+            agent = agents.get(user.pk)
+            if agent is None:
+                agent = Agent(user=user, **values)
+                new_agents.append(agent)
+                agents[user.pk] = agent
+            elif any(getattr(agent, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(agent, field, value)
+                updated_agents.append(agent)
+
+        Agent.objects.bulk_create(new_agents)
+        Agent.objects.bulk_update(updated_agents, fields=["structure", *AGENT_FIELDS], batch_size=1000)
+        self.stats["agents_created"] = len(new_agents)
+        self.stats["agents_updated"] = len(updated_agents)
+        return agents
+
+    def save_agents_contacts(self, agents_data, users, agents):
+        agents_by_email = {email: agents[users[email].pk] for email in agents_data}
+        contacts = {
+            contact.agent_id: contact
+            for contact in Contact.objects.filter(agent_id__in=[agent.pk for agent in agents_by_email.values()]).only(
+                "id", "agent", "email"
             )
-        except DataError as e:
-            raise Exception(f"Erreur lors de l'importation à la ligne {ligne} : {e}")
+        }
+        new_contacts, updated_contacts = [], []
+        for email, agent in agents_by_email.items():
+            contact = contacts.get(agent.pk)
+            if contact is None:
+                new_contacts.append(Contact(agent=agent, email=email))
+            elif contact.email != email:
+                contact.email = email
+                updated_contacts.append(contact)
+
+        Contact.objects.bulk_create(new_contacts)
+        Contact.objects.bulk_update(updated_contacts, fields=["email"], batch_size=1000)
+
+    def deactivate_missing_users(self, found_emails):
+        users_to_check = (
+            User.objects.filter(is_active=True)
+            .exclude(agent__structure__niveau1=SEVES_STRUCTURE)
+            .values_list("pk", "email")
+        )
+        to_deactivate = [pk for pk, email in users_to_check if email not in found_emails]
+        self.stats["users_deactivated"] = User.objects.filter(pk__in=to_deactivate).update(is_active=False)
 
     def handle(self, *args, **kwargs):
         self.stdout.write("Début de l'importation...")
         start_time = time.time()
-        csv_file_path = kwargs["csv_file"]
-        ligne = 1
-        self.found_emails = []
-        with open(csv_file_path, mode="r", encoding="utf-8") as csv_file:
+        self.stats = {}
+        with open(kwargs["csv_file"], mode="r", encoding="utf-8") as csv_file:
             reader = csv.DictReader(csv_file, delimiter=",")
-            with transaction.atomic():
-                for row in self.clean_contacts_data(reader):
-                    ligne += 1
-                    self.save_contact(row, ligne)
+            structures_keys, agents_data = self.read_rows(reader)
+
+        with transaction.atomic():
+            structures = self.save_structures(structures_keys)
+            users = self.save_users(agents_data.keys())
+            agents = self.save_agents(agents_data, structures, users)
+            self.save_agents_contacts(agents_data, users, agents)
+            self.deactivate_missing_users(set(agents_data.keys()))
+            # Les créations et mises à jour en masse n'envoient pas de signaux
+            invalidate_tags_on_commit(CONTACTS_TAG)
 
-        User.objects.exclude(email__in=self.found_emails).exclude(agent__structure__niveau1=SEVES_STRUCTURE).update(
-            is_active=False
-        )
         end_time = time.time()
+        self.stdout.write(
+            f"Structures créées : {self.stats['structures']}, utilisateurs créés : {self.stats['users']}, "
+            f"agents créés : {self.stats['agents_created']}, agents modifiés : {self.stats['agents_updated']}, "
+            f"utilisateurs désactivés : {self.stats['users_deactivated']}"
+        )
         self.stdout.write(self.style.SUCCESS(f"Importation terminée en {int(end_time - start_time)} secondes"))
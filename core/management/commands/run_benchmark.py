@@ -0,0 +1,75 @@
+import datetime
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from core.benchmark import compare_results, run_scenario
+from core.dataset import BENCHMARK_USER_EMAIL
+from seves.celery import app
+from ssa.dataset import get_benchmark_scenarios as get_ssa_scenarios
+from sv.dataset import get_benchmark_scenarios as get_sv_scenarios
+from tiac.dataset import get_benchmark_scenarios as get_tiac_scenarios
+
+SCENARIOS = {
+    "sv": get_sv_scenarios,
+    "ssa": get_ssa_scenarios,
+    "tiac": get_tiac_scenarios,
+}
+
+
+class Command(BaseCommand):
+    help = """
+        Mesure les temps de réponse des listes (avec chaque filtre), des pages de détail, des onglets du bloc commun et
+        des exports sur le jeu de données de generate_dataset. Les exports CSV sont exécutés sans passer par Celery.
+        Usage: python manage.py run_benchmark --output avant.json
+               python manage.py run_benchmark --output apres.json --compare avant.json
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", help="Fichier JSON dans lequel enregistrer les résultats")
+        parser.add_argument("--compare", help="Fichier JSON d'une exécution précédente à comparer")
+        parser.add_argument("--repeat", type=int, default=5, help="Nombre de mesures par scénario")
+        parser.add_argument("--email", default=BENCHMARK_USER_EMAIL, help="Utilisateur avec lequel jouer les scénarios")
+        parser.add_argument("--only", choices=SCENARIOS, action="append", help="Domaines à mesurer (tous par défaut)")
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat doit valoir au moins 1")
+        user = get_user_model().objects.filter(email=options["email"]).select_related("agent__structure").first()
+        if user is None:
+            raise CommandError(f"Aucun utilisateur {options['email']}, lancer d'abord generate_dataset")
+
+        app.conf.task_always_eager = True
+        client = Client()
+        client.force_login(user)
+        results = []
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+            POST_OFFICE={
+                **settings.POST_OFFICE,
+                "BACKENDS": {"default": "django.core.mail.backends.locmem.EmailBackend"},
+            },
+        ):
+            for name in options["only"] or SCENARIOS:
+                for scenario in SCENARIOS[name](user):
+                    result = run_scenario(client, scenario, options["repeat"])
+                    results.append(result)
+                    self.stdout.write(
+                        f"{result['name']} : {result['median_ms']} ms ({result['queries']} requêtes, "
+                        f"{result['db_time_ms']} ms en base, statut {result['status']})"
+                    )
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({"date": datetime.datetime.now().isoformat(), "results": results}, f, indent=2)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                previous = json.load(f)
+            for name, before, after in compare_results(previous, results):
+                style = self.style.ERROR if after > before * 1.1 else self.style.SUCCESS
+                self.stdout.write(style(f"{name} : {before} ms -> {after} ms ({(after - before) / before:+.0%})"))
@@ -1,6 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
 from django.core.management.base import BaseCommand
 
-from core.antivirus import scan_document
+from core.antivirus import claim_documents_to_scan, save_scan_result, scan_document
 from core.models import Document
 
 
@@ -8,14 +11,20 @@ class Command(BaseCommand):
     help = "Run antivirus scan on files hosted in an S3 like bucket."
     BATCH_SIZE = 200
 
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.ANTIVIRUS_SCAN_WORKERS)
+        parser.add_argument("--batch-size", type=int, default=self.BATCH_SIZE)
+
     def handle(self, *args, **options):
         documents_to_analyze = Document._base_manager.exclude(file="").filter(is_infected__isnull=True)
-        documents_to_analyze[: self.BATCH_SIZE].select_for_update()
+        nb_analyzed = nb_failed = 0
 
-        for document in documents_to_analyze:
-            is_infected = scan_document(document)
-            if is_infected is not None:
-                document.is_infected = is_infected
-                document.save(update_fields=["is_infected"])
+        # Les analyses (appels HTTP) sont faites en parallèle, les écritures en base restent dans le thread principal
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            while documents := claim_documents_to_scan(documents_to_analyze, options["batch_size"], options["workers"]):
+                for document, is_infected in zip(documents, executor.map(scan_document, documents)):
+                    save_scan_result(document, is_infected)
+                    nb_analyzed += is_infected is not None
+                    nb_failed += is_infected is None
 
-        self.stdout.write(f"Analyzed {documents_to_analyze.count()} documents")
+        self.stdout.write(f"Analyzed {nb_analyzed} documents, {nb_failed} will be retried later")
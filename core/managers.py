@@ -1,9 +1,12 @@
+import re
 import typing
 from typing import Literal
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.lookups import Unaccent
+from django.contrib.postgres.search import SearchQuery
 from django.db.models import (
     Case,
     DateTimeField,
@@ -14,11 +17,13 @@ from django.db.models import (
     OuterRef,
     Q,
     QuerySet,
-    Subquery,
     Value,
     When,
 )
+from django.db.models.functions import Lower
+from queryset_sequence import ModelIterable, QuerySetSequence
 
+from core.authorization import get_principal
 from core.constants import (
     BSV_STRUCTURE,
     MUS_STRUCTURE,
@@ -26,7 +31,9 @@ from core.constants import (
     SEVES_STRUCTURE,
     SSA_STRUCTURES,
     TIAC_STRUCTURES,
+    Visibilite,
 )
+from core.model_mixins import SEARCH_CONFIG
 
 if typing.TYPE_CHECKING:
     from core.models import Agent
@@ -204,6 +211,33 @@ class StructureQueryset(QuerySet):
         return self.get(niveau2=MUS_STRUCTURE)
 
 
+class SearchVectorQuerysetMixin:
+    def search(self, query):
+        """Recherche plein texte sur `search_vector` : chaque mot saisi doit être le début d'un mot du document."""
+        words = re.findall(r"\w+", query)
+        words = [word for word in words if len(word) > 1] or words
+        if not words:
+            return self.none()
+        search_query = SearchQuery(" & ".join(f"{word}:*" for word in words), config=SEARCH_CONFIG, search_type="raw")
+        return self.filter(search_vector=search_query)
+
+
+def get_user_can_view_condition(user, prefix=""):
+    """Condition des objets `WithVisibiliteMixin` visibles par l'utilisateur, même règle que `can_user_access`.
+
+    `prefix` permet de l'appliquer depuis un modèle lié (ex. `evenement__`)."""
+    from core.mixins import WithEtatMixin
+    from core.models import user_is_referent_national
+
+    structure = user.agent.structure
+    condition = Q(**{f"{prefix}visibilite": Visibilite.NATIONALE}) | Q(
+        **{f"{prefix}structures_acces__contains": [structure.pk]}
+    )
+    if structure.is_mus_or_bsv or user_is_referent_national(user):
+        condition |= ~Q(**{f"{prefix}etat": WithEtatMixin.Etat.BROUILLON})
+    return condition
+
+
 class EvenementManagerMixin:
     def with_fin_de_suivi(self, contact):
         from .models import FinSuiviContact
@@ -240,7 +274,7 @@ class MessageQueryset(QuerySet):
     def for_user(self, user):
         from core.models import Message
 
-        return self.filter(Q(status=Message.Status.FINALISE) | Q(sender=user.agent.contact_set.get()))
+        return self.filter(Q(status=Message.Status.FINALISE) | Q(sender=get_principal(user).agent_contact))
 
     def order_by_status_and_date(self):
         from core.models import Message
@@ -266,32 +300,73 @@ class MessageQueryset(QuerySet):
         )
 
     def search(self, query):
-        fields = [
-            "sender__agent__prenom",
-            "sender__agent__nom",
-            "sender_structure__libelle",
-            "recipients__agent__prenom",
-            "recipients__agent__nom",
-            "recipients__structure__libelle",
-            "recipients_copy__agent__prenom",
-            "recipients_copy__agent__nom",
-            "recipients_copy__structure__libelle",
-            "title",
-            "content",
-        ]
-        query_object = Q()
-        for f in fields:
-            query_object |= Q(**{f"{f}__unaccent__icontains": query})
-
-        # Add fields for document
-        from .models import Document
-
-        ct = ContentType.objects.get_for_model(self.model)
-        doc_qs = (
-            Document.objects.filter(content_type=ct)
-            .filter(Q(nom__unaccent__icontains=query) | Q(description__unaccent__icontains=query))
-            .values("object_id")
-        )
-        query_object |= Q(pk__in=Subquery(doc_qs))
-
-        return self.filter(query_object).distinct()
+        return self.filter(search_text__contains=Unaccent(Lower(Value(query))))
+
+
+class UnionModelIterable(ModelIterable):
+    def __init__(self, querysetsequence):
+        super().__init__(querysetsequence)
+        self._offset = querysetsequence._low_mark
+
+    def __iter__(self):
+        if not self._order_by or not self._querysets:
+            return super().__iter__()
+        return self._union_iterator()
+
+    def _get_union(self):
+        """`UNION ALL` des querysets ne sélectionnant que l'index du queryset, la clé primaire et les valeurs de tri."""
+        sort_fields = [field.lstrip("-") for field in self._order_by]
+        parts = []
+        for index, queryset in zip(self._queryset_idxs, self._querysets):
+            annotations = {
+                f"sort_{i}": Value(index) if field == "#" else F(field) for i, field in enumerate(sort_fields)
+            }
+            if not queryset.query.standard_ordering:
+                # Le sens du tri est porté par la séquence (`_standard_ordering`), pas par chacun des querysets
+                queryset = queryset.reverse()
+            parts.append(
+                queryset.order_by()
+                .prefetch_related(None)
+                .annotate(queryset_index=Value(index), **annotations)
+                .values_list("queryset_index", "pk", *annotations)
+            )
+        ordering = [f"{'-' if field.startswith('-') else ''}sort_{i}" for i, field in enumerate(self._order_by)]
+        if not self._standard_ordering:
+            ordering = [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
+        return parts[0].union(*parts[1:], all=True).order_by(*ordering)
+
+    def _union_iterator(self):
+        union = self._get_union()
+        rows = list(union[self._offset : self._high_mark] if self._high_mark is not None else union[self._offset :])
+
+        # Seuls les objets de la page sont chargés, avec les select_related / prefetch_related de leur queryset
+        querysets = dict(zip(self._queryset_idxs, self._querysets))
+        objects = {}
+        for index in {index for index, *_ in rows}:
+            pks = [pk for row_index, pk, *_ in rows if row_index == index]
+            objects[index] = querysets[index].in_bulk(pks)
+
+        for index, pk, *_ in rows:
+            yield self._add_queryset_index(objects[index][pk], index)
+
+
+class UnionQuerySetSequence(QuerySetSequence):
+    """`QuerySetSequence` dont le tri et la pagination sont faits par PostgreSQL (`UNION ALL`) et non en Python.
+
+    Les filtres restent appliqués sur chacun des querysets ; seuls les objets de la tranche demandée sont chargés."""
+
+    def __init__(self, *args, model=None):
+        super().__init__(*args, model=model)
+        self._iterable_class = UnionModelIterable
+
+    def _clone(self):
+        clone = super()._clone()
+        clone.__class__ = self.__class__
+        return clone
+
+    def reverse(self):
+        # Contrairement à QuerySetSequence, l'ordre des querysets est conservé : l'index `#` reste associé au même modèle
+        clone = self._clone()
+        clone._querysets = [qs.reverse() for qs in clone._querysets]
+        clone._standard_ordering = not self._standard_ordering
+        return clone
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:33
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0064_auto_20260727_1357"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="export",
+            name="cursor",
+            field=models.PositiveIntegerField(default=0, verbose_name="Nombre d'objets déjà exportés"),
+        ),
+        migrations.AddField(
+            model_name="export",
+            name="nb_lines",
+            field=models.PositiveIntegerField(default=0, verbose_name="Nombre de lignes écrites"),
+        ),
+        migrations.AddField(
+            model_name="export",
+            name="parts",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(), default=list, verbose_name="Fichiers partiels déjà écrits"
+            ),
+        ),
+    ]
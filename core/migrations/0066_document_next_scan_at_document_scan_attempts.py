@@ -0,0 +1,24 @@
+# Generated by Django 6.0.7 on 2026-10-18 16:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0065_export_cursor_export_nb_lines_export_parts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="next_scan_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Date à partir de laquelle le fichier peut être (ré)analysé"
+            ),
+        ),
+        migrations.AddField(
+            model_name="document",
+            name="scan_attempts",
+            field=models.PositiveSmallIntegerField(default=0, verbose_name="Nombre d'analyses antivirus échouées"),
+        ),
+    ]
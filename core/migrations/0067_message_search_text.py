@@ -0,0 +1,78 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:46
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.lookups import Unaccent
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import StringAgg, Value
+from django.db.models.functions import Lower
+from django.utils.html import strip_tags
+
+BATCH_SIZE = 1000
+
+SEARCH_TEXT_FIELDS = [
+    "sender__agent__prenom",
+    "sender__agent__nom",
+    "sender_structure__libelle",
+    "recipients__agent__prenom",
+    "recipients__agent__nom",
+    "recipients__structure__libelle",
+    "recipients_copy__agent__prenom",
+    "recipients_copy__agent__nom",
+    "recipients_copy__structure__libelle",
+    "title",
+    "content",
+]
+
+
+def update_search_texts(apps, schema_editor):
+    Message = apps.get_model("core", "Message")
+    Document = apps.get_model("core", "Document")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+
+    # La GenericRelation `documents` n'existe pas dans les modèles historiques
+    documents = {}
+    content_type = ContentType.objects.filter(app_label="core", model="message").first()
+    if content_type:
+        for object_id, nom, description in Document.objects.filter(content_type=content_type).values_list(
+            "object_id", "nom", "description"
+        ):
+            documents.setdefault(object_id, []).extend([nom, description])
+
+    pks = list(Message.objects.order_by("pk").values_list("pk", flat=True))
+    aggregates = {
+        f"field_{i}": StringAgg(field, delimiter=Value("\n"), distinct=True)
+        for i, field in enumerate(SEARCH_TEXT_FIELDS)
+    }
+    for start in range(0, len(pks), BATCH_SIZE):
+        messages = []
+        rows = Message.objects.filter(pk__in=pks[start : start + BATCH_SIZE]).values("pk").annotate(**aggregates)
+        for row in rows:
+            text = "\n".join(
+                [*(row[f"field_{i}"] or "" for i in range(len(SEARCH_TEXT_FIELDS))), *documents.get(row["pk"], [])]
+            )
+            messages.append(Message(pk=row["pk"], search_text=Unaccent(Lower(Value(strip_tags(text))))))
+        Message.objects.bulk_update(messages, ["search_text"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("core", "0066_document_next_scan_at_document_scan_attempts"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="message",
+            name="search_text",
+            field=models.TextField(default="", editable=False),
+        ),
+        migrations.RunPython(update_search_texts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="message",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_text"], name="core_message_search_trgm", opclasses=["gin_trgm_ops"]
+            ),
+        ),
+    ]
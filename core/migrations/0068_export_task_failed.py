@@ -0,0 +1,17 @@
+# Generated by Django 6.0.7 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0067_message_search_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="export",
+            name="task_failed",
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -15,11 +15,12 @@ from celery.exceptions import OperationalError
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.fields import ArrayField
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.forms import BaseModelFormSet, Media
 from django.forms.utils import RenderableMixin
-from django.http import HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect
 from django.urls import reverse
 from django.utils import timezone
 from django.utils.functional import classproperty
@@ -27,7 +28,7 @@ from django.views.generic import FormView
 from django.views.generic.base import ContextMixin
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import UpdateView
-from docxtpl import DocxTemplate, RichText
+from docxtpl import RichText
 from queryset_sequence import QuerySetSequence
 
 from core.forms import (
@@ -47,13 +48,16 @@ from core.models import (
     user_is_referent_national,
 )
 
-from .authorization import has_needed_group
+from .authorization import get_principal, has_needed_group
 from .constants import BSV_STRUCTURE, MUS_STRUCTURE, Visibilite
+from .documents import DOCX_CONTENT_TYPE, get_docx_template, new_subdoc, render_docx
 from .filters import DocumentFilter, MessageFilter
 from .formsets import FicheDocumentUploadFormSet, MessageDocumentUploadFormSet
 from .html import html_to_simple_text
 from .notifications import notify_message, notify_object_cloture
+from .pagination import CachedCountPaginator, KeysetPaginator
 from .redirect import safe_redirect
+from .tasks import export_document_task
 from .widgets import TreeselectItem
 
 logger = logging.getLogger(__name__)
@@ -135,17 +139,102 @@ class WithDocumentListInContextMixin:
         return context
 
 
-class WithBlocCommunPermission:
+class ObjectPermissionContext:
+    """Droits d'un utilisateur sur un objet du bloc commun, calculés une seule fois par requête.
+
+    Les contacts structure de l'objet sont chargés en une requête, avec leur fin de suivi : l'état affiché, l'ajout
+    et le retrait de la fin de suivi et la clôture sont déduits de ces données."""
+
+    def __init__(self, obj, user):
+        self.object = obj
+        self.user = user
+        self.structure_contact = get_principal(user).structure_contact
+
+    @cached_property
+    def contacts_structures(self) -> list[Contact]:
+        fin_suivi = self.object.fin_suivi.filter(contact=models.OuterRef("pk"))
+        return list(
+            self.object.contacts.exclude(structure__isnull=True)
+            .select_related("structure")
+            .annotate(is_fin_de_suivi=models.Exists(fin_suivi))
+        )
+
+    @cached_property
+    def user_contact_structure(self) -> Contact | None:
+        return next((c for c in self.contacts_structures if c.pk == self.structure_contact.pk), None)
+
+    @cached_property
+    def is_fin_de_suivi(self) -> bool:
+        if self.user_contact_structure:
+            return self.user_contact_structure.is_fin_de_suivi
+        # La structure a pu être retirée des contacts après sa fin de suivi
+        return self.object.fin_suivi.filter(contact=self.structure_contact).exists()
+
+    @cached_property
+    def can_user_access(self) -> bool:
+        return self.object.can_user_access(self.user)
+
+    @property
+    def etat(self) -> dict:
+        return self.object.get_etat_data_from_fin_de_suivi(self.is_fin_de_suivi)
+
+    @property
+    def can_change_fin_de_suivi(self) -> bool:
+        return self.user_contact_structure is not None and self.can_user_access
+
+    @property
+    def can_add_fin_de_suivi(self) -> bool:
+        return self.can_change_fin_de_suivi and not self.is_fin_de_suivi
+
+    @property
+    def can_remove_fin_de_suivi(self) -> bool:
+        return self.can_change_fin_de_suivi and self.is_fin_de_suivi
+
+    @cached_property
+    def contacts_not_in_fin_suivi(self) -> list[Contact]:
+        return [contact for contact in self.contacts_structures if not contact.is_fin_de_suivi]
+
+    def get_cloture_context(self) -> dict:
+        can_be_cloture, _ = self.object.can_be_cloture(self.user)
+        return {
+            "contacts_not_in_fin_suivi": self.contacts_not_in_fin_suivi,
+            "is_evenement_can_be_cloture": can_be_cloture,
+            "is_the_only_remaining_structure": self.object.is_the_only_remaining_structure(
+                self.user, self.contacts_not_in_fin_suivi
+            ),
+        }
+
+    def get_fin_de_suivi_context(self) -> dict:
+        return {
+            "can_fin_de_suivi_be_added": self.can_add_fin_de_suivi,
+            "can_fin_de_suivi_be_removed": self.can_remove_fin_de_suivi,
+        }
+
+    def get_bloc_commun_context(self) -> dict:
+        obj, user = self.object, self.user
+        return {
+            "can_add_document": obj.can_add_document(user),
+            "can_update_document": obj.can_update_document(user),
+            "can_delete_document": obj.can_delete_document(user),
+            "can_download_document": obj.can_download_document(user),
+            "can_add_agent": obj.can_add_agent(user),
+            "can_add_structure": obj.can_add_structure(user),
+            "can_delete_contact": obj.can_delete_contact(user),
+        }
+
+
+class WithObjectPermissionContextMixin:
+    """Partage entre les mixins de la vue un seul `ObjectPermissionContext` pour l'objet de la requête."""
+
+    @cached_property
+    def permission_context(self) -> ObjectPermissionContext:
+        return ObjectPermissionContext(self.get_object(), self.request.user)
+
+
+class WithBlocCommunPermission(WithObjectPermissionContextMixin):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        obj = self.get_object()
-        context["can_add_document"] = obj.can_add_document(self.request.user)
-        context["can_update_document"] = obj.can_update_document(self.request.user)
-        context["can_delete_document"] = obj.can_delete_document(self.request.user)
-        context["can_download_document"] = obj.can_download_document(self.request.user)
-        context["can_add_agent"] = obj.can_add_agent(self.request.user)
-        context["can_add_structure"] = obj.can_add_structure(self.request.user)
-        context["can_delete_contact"] = obj.can_delete_contact(self.request.user)
+        context.update(self.permission_context.get_bloc_commun_context())
         return context
 
 
@@ -157,7 +246,7 @@ class WithMessageMixin:
         message_filter = MessageFilter(self.request.GET, queryset=message_list)
         contact_agent = None
         if message_filter.qs:
-            contact_agent = self.request.user.agent.contact_set.all()[0]
+            contact_agent = self.request.principal.agent_contact
         for message in message_filter.qs:
             message.can_be_deleted = message.can_agent_delete(contact_agent)
         context["message_count"] = message_list.exclude(status=Message.Status.BROUILLON).count()
@@ -221,6 +310,30 @@ class WithContactListInContextMixin(WithContactQuerysetMixin):
         return context
 
 
+class WithBlocCommunTabsMixin(MediaDefiningMixin):
+    """Bloc commun des pages de détail : seuls les compteurs des onglets sont calculés avec la page, le contenu de
+    chaque onglet est chargé à son ouverture (voir `core.views.BlocCommunTabMixin`)."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        obj = self.get_object()
+        context["message_count"] = (
+            obj.messages.for_user(self.request.user).exclude(status=Message.Status.BROUILLON).count()
+        )
+        context["contacts_count"] = obj.contacts.filter(
+            models.Q(agent__isnull=False) | models.Q(structure__isnull=False)
+        ).count()
+        context["document_count"] = Document.objects.for_fiche(obj).exclude(is_deleted=True).count()
+        return context
+
+    def get_media(self, **context_data) -> Media:
+        # Les contrôleurs du formulaire d'ajout de documents doivent être chargés avant l'onglet Documents
+        document_formset = FicheDocumentUploadFormSet(
+            user=self.request.user, related_to=self.get_object(), allowed_document_types=[], next_url=None
+        )
+        return super().get_media(**context_data) + document_formset.media
+
+
 class WithFreeLinksListInContextMixin:
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -255,7 +368,7 @@ class AllowACNotificationMixin(models.Model):
             message_type=Message.NOTIFICATION_AC,
             title="Notification à l'AC",
             content="L'administration a été notifiée de cette fiche.",
-            sender=user.agent.contact_set.get(),
+            sender=get_principal(user).agent_contact,
             sender_structure=user.agent.structure,
             content_object=self,
             date_publication=timezone.now(),
@@ -291,10 +404,29 @@ class WithVisibiliteMixin(models.Model):
         default=Visibilite.LOCALE,
     )
     allowed_structures = models.ManyToManyField(Structure, related_name="allowed_structures")
+    # Structures pouvant voir l'objet en dehors de la visibilité nationale et des MUS/BSV/référents nationaux :
+    # structure créatrice et, hors brouillon en visibilité limitée, structures autorisées.
+    # Tenu à jour par signaux (voir `update_structures_acces`).
+    structures_acces = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
 
     class Meta:
         abstract = True
 
+    @classmethod
+    def update_structures_acces(cls, *pks):
+        structures = defaultdict(set)
+        rows = cls._base_manager.filter(pk__in=pks).values_list(
+            "pk", "createur_id", "etat", "visibilite", "allowed_structures"
+        )
+        for pk, createur_id, etat, visibilite, structure_id in rows:
+            structures[pk].add(createur_id)
+            if structure_id and visibilite == Visibilite.LIMITEE and etat != cls.Etat.BROUILLON:
+                structures[pk].add(structure_id)
+        structures_acces = {pk: sorted(structure_ids) for pk, structure_ids in structures.items()}
+        for pk, structure_ids in structures_acces.items():
+            cls._base_manager.filter(pk=pk).update(structures_acces=structure_ids)
+        return structures_acces
+
     @property
     def is_visibilite_nationale(self):
         return self.visibilite == Visibilite.NATIONALE
@@ -316,13 +448,9 @@ class WithVisibiliteMixin(models.Model):
             return False
         if self.is_visibilite_nationale:
             return True
-        if user.agent.is_in_structure(self.createur):
-            return True
-        if not self.is_draft and (user.agent.structure.is_mus_or_bsv or user_is_referent_national(user)):
-            return True
-        if self.is_visibilite_limitee and not self.is_draft and user.agent.structure in self.allowed_structures.all():
+        if user.agent.structure_id in self.structures_acces:
             return True
-        return False
+        return not self.is_draft and (user.agent.structure.is_mus_or_bsv or user_is_referent_national(user))
 
     def get_visibilite_display_text(self) -> str:
         match self.visibilite:
@@ -601,34 +729,22 @@ class WithAddUserContactsMixin:
             obj.contacts.add(structure_contact)
 
 
-class WithClotureContextMixin:
+class WithClotureContextMixin(WithObjectPermissionContextMixin):
     """
     Mixin qui ajoute au contexte les informations relatives à la clôture d'un objet.
     """
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        object = self.get_object()
-        user = self.request.user
-        context["contacts_not_in_fin_suivi"] = contacts_structures_not_in_fin_suivi = (
-            object.get_contacts_structures_not_in_fin_suivi()
-        )
-        context["is_evenement_can_be_cloture"], _ = object.can_be_cloture(user)
-        context["is_the_only_remaining_structure"] = object.is_the_only_remaining_structure(
-            user, contacts_structures_not_in_fin_suivi
-        )
+        context.update(self.permission_context.get_cloture_context())
         return context
 
 
-class WithFinDeSuiviMixin:
+class WithFinDeSuiviMixin(WithObjectPermissionContextMixin):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["can_fin_de_suivi_be_added"] = FinSuiviContact().can_add_fin_de_suivi(
-            self.get_object(), self.request.user
-        )
-        context["can_fin_de_suivi_be_removed"] = FinSuiviContact().can_remove_fin_de_suivi(
-            self.get_object(), self.request.user
-        )
+        context.update(self.permission_context.get_fin_de_suivi_context())
+        context["etat"] = self.permission_context.etat
         return context
 
 
@@ -663,6 +779,8 @@ class WithACNotificationMixin:
 class WithOrderingMixin:
     ORDER_DIR_ASC = "asc"
     ORDER_DIR_DESC = "desc"
+    keyset_pagination = False
+    paginator_class = CachedCountPaginator
 
     def get_ordering_fields(self):
         raise NotImplementedError
@@ -696,11 +814,25 @@ class WithOrderingMixin:
             return tuple([prefix + field for field in order_by_field])
         return prefix + order_by_field
 
-    def apply_ordering(self, queryset):
+    def get_full_ordering(self, queryset):
+        """Tri complet, terminé par des champs départageant toutes les lignes (nécessaire à la pagination par curseur)"""
         ordering = self.get_ordering()
         if isinstance(ordering, str):
             ordering = (ordering,)
-        return queryset.order_by(*ordering, "-pk")
+        if isinstance(queryset, QuerySetSequence):
+            return (*ordering, "#", "-pk")
+        return (*ordering, "-pk")
+
+    def apply_ordering(self, queryset):
+        return queryset.order_by(*self.get_full_ordering(queryset))
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = KeysetPaginator(queryset, page_size, self.get_full_ordering(queryset))
+        page = paginator.get_page(self.request.GET.get("cursor"), last=self.request.GET.get(self.page_kwarg) == "last")
+        return paginator, page, page.object_list, page.has_other_pages()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -776,7 +908,7 @@ class AbstractMessageHandlingView(
 
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
-        kwargs["sender"] = self.request.user.agent.contact_set.get()
+        kwargs["sender"] = self.request.principal.agent_contact
         kwargs["obj"] = self.fiche_objet
         kwargs["instance"] = self.get_object()
         return kwargs
@@ -825,6 +957,14 @@ class WithCommonContextVars(RenderableMixin):
 
 
 class WithDocumentExportContextMixin(WithContactQuerysetMixin):
+    """Export Word d'un évènement : les vues définissent `document_template_name` et `document_filename_prefix`.
+
+    Le document est rendu dans la requête, ou par une tâche Celery lorsque `should_render_async()` est vrai : il est
+    alors enregistré dans le stockage de fichiers et l'utilisateur reçoit le lien par mail."""
+
+    document_template_name = None
+    document_filename_prefix = None
+
     def get_free_links_numbers(self):
         free_links = LienLibre.objects.for_object(self.object)
         free_links_numbers = []
@@ -835,10 +975,9 @@ class WithDocumentExportContextMixin(WithContactQuerysetMixin):
                 free_links_numbers.append(str(link.related_object_1))
         return free_links_numbers
 
-    def create_document_bloc_commun(self):
+    def create_document_bloc_commun(self, doc):
         obj = self.object
         messages = obj.messages.filter(status=Message.Status.FINALISE).optimized_for_list().order_by_status_and_date()
-        sub_template = DocxTemplate("core/doc_templates/bloc_commun.docx")
 
         for message in messages:
             rich_text = RichText(html_to_simple_text(BeautifulSoup(message.content, "html.parser")))
@@ -850,10 +989,41 @@ class WithDocumentExportContextMixin(WithContactQuerysetMixin):
             "structures": self.get_structures(obj),
             "documents": Document.objects.for_fiche(obj).prefetch_related("created_by_structure"),
         }
-        sub_template.render(context)
-        sub_doc_file = f"subdoc_{obj}.docx"
-        sub_template.save(sub_doc_file)
-        return sub_doc_file
+        return new_subdoc(doc, "core/doc_templates/bloc_commun.docx", context)
+
+    def get_document_context(self, doc):
+        return {
+            "object": self.object,
+            "free_links": self.get_free_links_numbers(),
+            "bloc_commun": self.create_document_bloc_commun(doc),
+            "now": datetime.datetime.now(),
+        }
+
+    def get_document_filename(self):
+        return f"{self.document_filename_prefix}_{self.object.numero}.docx"
+
+    def render_document(self) -> bytes:
+        doc = get_docx_template(self.document_template_name)
+        return render_docx(doc, self.get_document_context(doc))
+
+    def should_render_async(self):
+        return False
+
+    def post(self, request, *args, **kwargs):
+        if self.should_render_async():
+            export = Export.objects.create(
+                user=request.user,
+                queryset_sequence=[Export.from_queryset(type(self.object).objects.filter(pk=self.object.pk))],
+            )
+            export_document_task.delay_on_commit(export.pk, f"{type(self).__module__}.{type(self).__qualname__}")
+            messages.success(
+                request, "Le document est en cours de génération, vous recevrez un mail quand il sera prêt."
+            )
+            return safe_redirect(self.object.get_absolute_url())
+
+        response = HttpResponse(self.render_document(), content_type=DOCX_CONTENT_TYPE)
+        response["Content-Disposition"] = f"attachment; filename={self.get_document_filename()}"
+        return response
 
 
 def normalize(s):
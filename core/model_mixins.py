@@ -1,7 +1,14 @@
+from functools import cache
+
+from django.apps import apps
 from django.contrib.contenttypes.fields import GenericRelation
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.validators import RegexValidator
 from django.db import models, transaction
+from django.db.models import StringAgg, Value
+
+SEARCH_CONFIG = "french_unaccent"
 
 
 class WithBlocCommunFieldsMixin(models.Model):
@@ -180,3 +187,54 @@ class WithLastUpdatedDatetime(models.Model):
 def update_last_updated_on_revision(cls):
     cls._update_last_updated_on_revision = True
     return cls
+
+
+def get_search_texts(queryset, fields):
+    """Retourne, pour chaque objet du queryset, le texte à indexer composé des valeurs des champs donnés.
+
+    Les champs peuvent traverser des relations (ex : `etablissements__raison_sociale`) : les valeurs de chaque champ
+    sont agrégées, l'objet n'est donc pas dupliqué par les jointures."""
+    aggregates = {f"field_{i}": StringAgg(field, Value("\n"), distinct=True) for i, field in enumerate(fields)}
+    for row in queryset.values("pk").annotate(**aggregates):
+        yield row["pk"], "\n".join(row[f"field_{i}"] or "" for i in range(len(fields)))
+
+
+def update_search_vectors(queryset, fields):
+    """Calcule et enregistre le document de recherche plein texte des objets du queryset."""
+    for pk, text in get_search_texts(queryset, fields):
+        queryset.model._base_manager.filter(pk=pk).update(search_vector=SearchVector(Value(text), config=SEARCH_CONFIG))
+
+
+class WithSearchVectorMixin(models.Model):
+    """Document de recherche plein texte, tenu à jour par signaux lors de l'enregistrement de l'objet ou des objets
+    liés présents dans `search_vector_fields`. Chaque modèle concret doit déclarer un `GinIndex` sur `search_vector`."""
+
+    search_vector = SearchVectorField(null=True, editable=False)
+    search_vector_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def update_search_vector(cls, *pks):
+        update_search_vectors(cls._base_manager.filter(pk__in=pks), cls.search_vector_fields)
+
+    @classmethod
+    def get_search_vector_own_fields(cls):
+        return {field for field in cls.search_vector_fields if "__" not in field}
+
+
+@cache
+def get_search_vector_parents(model):
+    """Retourne les couples (modèle, attribut de la clé étrangère) des objets dont le document de recherche dépend
+    des objets de `model`."""
+    parents = []
+    for parent_model in apps.get_models():
+        if not issubclass(parent_model, WithSearchVectorMixin) or parent_model._meta.proxy:
+            continue
+        relations = {field.split("__")[0] for field in parent_model.search_vector_fields if "__" in field}
+        for name in relations:
+            field = parent_model._meta.get_field(name)
+            if field.one_to_many and field.related_model is model._meta.concrete_model:
+                parents.append((parent_model, field.field.attname))
+    return parents
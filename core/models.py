@@ -6,22 +6,26 @@ from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.lookups import Unaccent
 from django.core.exceptions import ValidationError
 from django.core.files.storage import default_storage
 from django.core.validators import FileExtensionValidator, RegexValidator
 from django.db import models
-from django.db.models import CheckConstraint, Q
+from django.db.models import CheckConstraint, Q, Value
+from django.db.models.functions import Lower
 from django.urls.base import reverse
 from django.utils import timezone
 from django.utils.functional import classproperty
+from django.utils.html import strip_tags
 from django.utils.safestring import mark_safe
 from django_countries.fields import CountryField
 import reversion
 from reversion.models import Revision
 
 from core.constants import AC_STRUCTURE, BSV_STRUCTURE, MUS_STRUCTURE, SEVES_STRUCTURE
-from seves import settings
 
+from .authorization import get_principal
 from .html import filter_tags_and_attributes
 from .managers import (
     ContactManager,
@@ -34,7 +38,12 @@ from .managers import (
     MessageQueryset,
     StructureQueryset,
 )
-from .model_mixins import WithDocumentPermissionMixin, WithLastUpdatedDatetime, WithLocalisableMixin
+from .model_mixins import (
+    WithDocumentPermissionMixin,
+    WithLastUpdatedDatetime,
+    WithLocalisableMixin,
+    get_search_texts,
+)
 from .soft_delete_mixins import AllowsSoftDeleteMixin
 from .storage import get_timestamped_filename, get_timestamped_filename_export
 from .validators import (
@@ -49,7 +58,7 @@ User = get_user_model()
 
 
 def user_is_referent_national(user: User):
-    return settings.REFERENT_NATIONAL_GROUP in user.groups.values_list("name", flat=True)
+    return get_principal(user).is_referent_national
 
 
 class Agent(models.Model):
@@ -210,7 +219,7 @@ class FinSuiviContact(models.Model):
 
     @classmethod
     def can_add_fin_de_suivi(cls, object, user):
-        contact = user.agent.structure.contact_set.all()[0]
+        contact = get_principal(user).structure_contact
         content_type = ContentType.objects.get_for_model(object).id
         can_change_fin_de_suivi = cls._can_change_fin_de_suivi(object, user, contact)
         if can_change_fin_de_suivi is False:
@@ -222,7 +231,7 @@ class FinSuiviContact(models.Model):
 
     @classmethod
     def can_remove_fin_de_suivi(cls, object, user):
-        contact = user.agent.structure.contact_set.all()[0]
+        contact = get_principal(user).structure_contact
         content_type = ContentType.objects.get_for_model(object).id
         can_change_fin_de_suivi = cls._can_change_fin_de_suivi(object, user, contact)
         if can_change_fin_de_suivi is False:
@@ -328,6 +337,10 @@ class Document(models.Model):
         default=False, null=False, verbose_name="Est-ce qu'une notification a été envoyé suite à l'upload'"
     )
     mimetype = models.CharField(max_length=100, blank=True)
+    scan_attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Nombre d'analyses antivirus échouées")
+    next_scan_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Date à partir de laquelle le fichier peut être (ré)analysé"
+    )
 
     content_type = models.ForeignKey(ContentType, on_delete=models.PROTECT)
     object_id = models.PositiveIntegerField()
@@ -343,7 +356,7 @@ class Document(models.Model):
         TypeDocument.ANALYSE_RISQUE,
     ]
 
-    ignored_fields_in_revision_list = ["is_infected"]
+    ignored_fields_in_revision_list = ["is_infected", "scan_attempts", "next_scan_at"]
 
     class Meta:
         indexes = [
@@ -471,6 +484,24 @@ class Message(AllowsSoftDeleteMixin, WithDocumentPermissionMixin, WithLastUpdate
 
     historical_data = models.JSONField(default=dict, blank=True)
 
+    # Texte de recherche (minuscules, sans accents) indexé en trigrammes, tenu à jour par signaux
+    search_text = models.TextField(default="", editable=False)
+    search_text_fields = (
+        "sender__agent__prenom",
+        "sender__agent__nom",
+        "sender_structure__libelle",
+        "recipients__agent__prenom",
+        "recipients__agent__nom",
+        "recipients__structure__libelle",
+        "recipients_copy__agent__prenom",
+        "recipients_copy__agent__nom",
+        "recipients_copy__structure__libelle",
+        "title",
+        "content",
+        "documents__nom",
+        "documents__description",
+    )
+
     objects = MessageManager.from_queryset(MessageQueryset)()
 
     show_nested_diff_in_revision_list = False
@@ -484,6 +515,7 @@ class Message(AllowsSoftDeleteMixin, WithDocumentPermissionMixin, WithLastUpdate
     class Meta:
         indexes = [
             models.Index(fields=["content_type", "object_id"]),
+            GinIndex(fields=["search_text"], name="core_message_search_trgm", opclasses=["gin_trgm_ops"]),
         ]
         ordering = ["status", "-date_creation"]
         constraints = [
@@ -497,6 +529,11 @@ class Message(AllowsSoftDeleteMixin, WithDocumentPermissionMixin, WithLastUpdate
         super().__init__(*args, **kwargs)
         self._initial_is_deleted = self.is_deleted
 
+    @classmethod
+    def update_search_text(cls, *pks):
+        for pk, text in get_search_texts(cls._base_manager.filter(pk__in=pks), cls.search_text_fields):
+            cls._base_manager.filter(pk=pk).update(search_text=Unaccent(Lower(Value(strip_tags(text)))))
+
     def __str__(self):
         if len(self.title) > 150:
             return f"{self.message_type}: {self.title[:150]}…"
@@ -534,10 +571,10 @@ class Message(AllowsSoftDeleteMixin, WithDocumentPermissionMixin, WithLastUpdate
         return self.sender == contact
 
     def can_be_updated(self, user):
-        return self.is_draft and self._is_owner(user.agent.contact_set.get())
+        return self.is_draft and self._is_owner(get_principal(user).agent_contact)
 
     def can_user_delete(self, user):
-        agent_contact = user.agent.contact_set.get()
+        agent_contact = get_principal(user).agent_contact
         return self._is_owner(agent_contact)
 
     def can_agent_delete(self, agent):
@@ -599,7 +636,7 @@ class Message(AllowsSoftDeleteMixin, WithDocumentPermissionMixin, WithLastUpdate
         return intro
 
     def _user_can_interact(self, user):
-        return self._is_owner(user.agent.contact_set.get())
+        return self._is_owner(get_principal(user).agent_contact)
 
     def save(self, *args, **kwargs):
         if self.is_finalise:
@@ -666,16 +703,49 @@ class LienLibre(models.Model):
 class Export(models.Model):
     object_ids = ArrayField(models.BigIntegerField(), null=True)
     task_done = models.BooleanField(default=False)
+    task_failed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     file = models.FileField(upload_to=get_timestamped_filename_export)
     user = models.ForeignKey(User, on_delete=models.RESTRICT, related_name="exports")
     queryset_sequence = models.JSONField(default=dict)
+    cursor = models.PositiveIntegerField(default=0, verbose_name="Nombre d'objets déjà exportés")
+    nb_lines = models.PositiveIntegerField(default=0, verbose_name="Nombre de lignes écrites")
+    parts = ArrayField(models.CharField(), default=list, verbose_name="Fichiers partiels déjà écrits")
 
     @classmethod
     def from_queryset(cls, queryset):
         model_label = f"{queryset.model._meta.app_label}.{queryset.model._meta.model_name}"
         return {"model": model_label, "ids": list(queryset.values_list("id", flat=True))}
 
+    @property
+    def nb_objects(self):
+        return sum(len(entry["ids"]) for entry in self.queryset_sequence)
+
+    @property
+    def progress(self):
+        if self.task_done:
+            return 100
+        if not self.nb_objects:
+            return 0
+        return min(99, 100 * self.cursor // self.nb_objects)
+
+    def get_next_chunk(self, size):
+        """Retourne les prochains objets à exporter à partir du curseur, sous la forme [(model_label, ids), ...]"""
+        chunk = []
+        position = 0
+        for entry in self.queryset_sequence:
+            ids = entry["ids"]
+            start = max(self.cursor - position, 0)
+            position += len(ids)
+            if start >= len(ids):
+                continue
+            selected = ids[start : start + size]
+            chunk.append((entry["model"], selected))
+            size -= len(selected)
+            if size == 0:
+                break
+        return chunk
+
 
 class Region(models.Model):
     class Meta:
@@ -182,7 +182,7 @@ def notify_export_is_ready(export: Export, object):
         message=f"""
 Bonjour,
 
-L'export CSV que vous avez demandé est prêt, voici le lien pour télécharger le fichier : {export.file.url} .
+L'export que vous avez demandé est prêt, voici le lien pour télécharger le fichier : {export.file.url} .
 
 Attention, le lien n'est valable que durant 1 heure.
 
@@ -190,7 +190,7 @@ Si vous rencontrez des difficultés, vous pouvez consulter notre centre d’aide
         """,
         html_message=f"""
     <p>Bonjour,<br>
-    L'export CSV que vous avez demandé est prêt, <a href="{export.file.url}">voici le lien pour télécharger le fichier</a>.
+    L'export que vous avez demandé est prêt, <a href="{export.file.url}">voici le lien pour télécharger le fichier</a>.
     <p>Attention, le lien n'est valable que durant 1 heure.</p>
     <p>Si vous rencontrez des difficultés, vous pouvez consulter notre centre d’aide ou nous en faire part à l’adresse email <a href="mailto:support@seves.beta.gouv.fr">support@seves.beta.gouv.fr</a>.</p>
         """,
@@ -199,6 +199,28 @@ Si vous rencontrez des difficultés, vous pouvez consulter notre centre d’aide
     )
 
 
+def notify_export_failed(export: Export, object):
+    send_as_seves(
+        recipients=[export.user.agent.contact_set.get()],
+        object=object,
+        subject="Votre export a échoué",
+        message="""
+Bonjour,
+
+L'export que vous avez demandé n'a pas pu être généré. Vous pouvez relancer l'export depuis Sèves.
+
+Si le problème persiste, vous pouvez nous en faire part à l’adresse email support@seves.beta.gouv.fr.
+        """,
+        html_message="""
+    <p>Bonjour,<br>
+    L'export que vous avez demandé n'a pas pu être généré. Vous pouvez relancer l'export depuis Sèves.</p>
+    <p>Si le problème persiste, vous pouvez nous en faire part à l’adresse email <a href="mailto:support@seves.beta.gouv.fr">support@seves.beta.gouv.fr</a>.</p>
+        """,
+        link_to_fiche=False,
+        filter_fin_suivi=False,
+    )
+
+
 def notify_fin_de_suivi(object, structure):
     send_as_seves(
         recipients=object.contacts.agents_only().filter(agent__structure__niveau2=MUS_STRUCTURE),
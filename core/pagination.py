@@ -0,0 +1,224 @@
+from datetime import date
+import hashlib
+import json
+import math
+
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from queryset_sequence import QuerySetSequence
+
+COUNT_CACHE_TIMEOUT = 60
+CURSOR_SALT = "core.pagination.cursor"
+
+
+def _get_querysets(queryset):
+    return queryset._querysets if isinstance(queryset, QuerySetSequence) else [queryset]
+
+
+def get_cached_count(queryset):
+    """Nombre d'objets du queryset (ou de la QuerySetSequence), mis en cache quelques secondes.
+
+    La clé dépend de la requête SQL : les filtres propres à l'utilisateur en font partie."""
+    queries = []
+    for subqueryset in _get_querysets(queryset):
+        try:
+            queries.append(str(subqueryset.query))
+        except EmptyResultSet:
+            queries.append("")
+    key = "count:" + hashlib.md5("\n".join(queries).encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class CachedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return get_cached_count(self.object_list)
+
+
+class _CursorSerializer:
+    def dumps(self, obj):
+        return json.dumps(
+            obj, default=lambda value: value.isoformat() if isinstance(value, date) else str(value)
+        ).encode()
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+def _get_sort_value(obj, field):
+    if field == "#":
+        return getattr(obj, "#")
+    for attr in field.split("__"):
+        if obj is None:
+            return None
+        obj = getattr(obj, attr)
+    return obj
+
+
+def _and(left, right):
+    if left is False or right is False:
+        return False
+    if left is True:
+        return right
+    if right is True:
+        return left
+    return left & right
+
+
+def _or(left, right):
+    if left is True or right is True:
+        return True
+    if left is False:
+        return right
+    if right is False:
+        return left
+    return left | right
+
+
+def _get_after_condition(field, value, queryset_index):
+    """Condition (True, False ou Q) sur un champ de tri pour les lignes situées après `value`.
+
+    Suit le tri de PostgreSQL : NULL est plus grand que toute valeur (en fin de tri croissant, en tête sinon)."""
+    name, descending = field.lstrip("-"), field.startswith("-")
+    if name == "#":
+        return queryset_index < value if descending else queryset_index > value
+    if value is None:
+        return Q(**{f"{name}__isnull": False}) if descending else False
+    if descending:
+        return Q(**{f"{name}__lt": value})
+    return Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True})
+
+
+def _get_equal_condition(field, value, queryset_index):
+    name = field.lstrip("-")
+    if name == "#":
+        return queryset_index == value
+    if value is None:
+        return Q(**{f"{name}__isnull": True})
+    return Q(**{name: value})
+
+
+def get_keyset_condition(ordering, values, queryset_index=None):
+    """Condition des lignes situées strictement après `values` dans le tri `ordering`."""
+    condition, equal = False, True
+    for field, value in zip(ordering, values):
+        condition = _or(condition, _and(equal, _get_after_condition(field, value, queryset_index)))
+        equal = _and(equal, _get_equal_condition(field, value, queryset_index))
+    return condition
+
+
+def _filter_on(queryset, condition):
+    if condition is True:
+        return queryset
+    if condition is False:
+        return queryset.none()
+    return queryset.filter(condition)
+
+
+def filter_after(queryset, ordering, values):
+    if not isinstance(queryset, QuerySetSequence):
+        return _filter_on(queryset, get_keyset_condition(ordering, values))
+
+    # La condition sur l'index du queryset (`#`) est évaluée pour chacun des querysets de la séquence
+    clone = queryset._clone()
+    clone._querysets = [
+        _filter_on(subqueryset, get_keyset_condition(ordering, values, index))
+        for index, subqueryset in zip(clone._queryset_idxs, clone._querysets)
+    ]
+    return clone
+
+
+def reverse_ordering(ordering):
+    return [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
+
+
+class KeysetPage:
+    def __init__(self, paginator, object_list, number, has_previous, has_next):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.number = number
+        # Les curseurs sont calculés tout de suite : les vues peuvent modifier les objets avant l'affichage
+        self.previous_cursor = self._get_cursor(object_list[0], number - 1, before=True) if has_previous else None
+        self.next_cursor = self._get_cursor(object_list[-1], number + 1) if has_next else None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def _get_cursor(self, obj, number, before=False):
+        return signing.dumps(
+            {
+                "values": [_get_sort_value(obj, field.lstrip("-")) for field in self.paginator.ordering],
+                "number": number,
+                "before": before,
+            },
+            salt=CURSOR_SALT,
+            serializer=_CursorSerializer,
+            compress=True,
+        )
+
+
+class KeysetPaginator(CachedCountPaginator):
+    """Pagination par curseur : la page suivante est obtenue en filtrant sur les valeurs de tri du dernier objet
+    affiché et non avec un OFFSET, le coût d'une page ne dépend donc pas de sa position dans la liste.
+
+    `ordering` doit être le tri complet du queryset, terminé par un champ unique."""
+
+    def __init__(self, object_list, per_page, ordering):
+        super().__init__(object_list, per_page)
+        self.ordering = list(ordering)
+
+    def get_page(self, cursor=None, last=False):
+        data = None
+        if cursor:
+            try:
+                data = signing.loads(cursor, salt=CURSOR_SALT, serializer=_CursorSerializer)
+            except signing.BadSignature:
+                data = None
+
+        size = self.per_page
+        if last:
+            # La dernière page a les mêmes limites que celle atteinte avec les pages suivantes
+            size = self.count % self.per_page or self.per_page
+            queryset, number, before = self.object_list.reverse(), self.num_pages, True
+        elif data is None:
+            queryset, number, before = self.object_list, 1, False
+        elif data["before"]:
+            queryset = filter_after(self.object_list.reverse(), reverse_ordering(self.ordering), data["values"])
+            number, before = data["number"], True
+        else:
+            queryset = filter_after(self.object_list, self.ordering, data["values"])
+            number, before = data["number"], False
+
+        object_list = list(queryset[: size + 1])
+        has_more = len(object_list) > size
+        object_list = object_list[:size]
+        if not object_list:
+            return KeysetPage(self, object_list, 1, has_previous=False, has_next=False)
+        if before:
+            object_list.reverse()
+            return KeysetPage(self, object_list, max(number, 1), has_previous=has_more, has_next=not last)
+        return KeysetPage(self, object_list, number, has_previous=data is not None, has_next=has_more)
+
+    @property
+    def num_pages(self):
+        return max(math.ceil(self.count / self.per_page), 1)
@@ -0,0 +1,126 @@
+"""Mesure des requêtes SQL d'une vue ou d'une tâche Celery, activée par `SQL_STATS_ENABLED`.
+
+Pour chaque requête HTTP ou tâche, on enregistre le nombre de requêtes SQL, le temps passé en base, les requêtes
+répétées (même SQL, paramètres différents : signe probable d'un N+1) et les requêtes les plus lentes. Le résultat
+est écrit dans les logs sous forme d'une ligne JSON et ajouté aux données du span Sentry en cours. Un avertissement
+est écrit quand le nombre de requêtes dépasse le budget de la route ou de la tâche (`SQL_STATS_BUDGETS`).
+
+Les vues sont mesurées par `seves.middlewares.QueryStatsMiddleware`, les tâches par les signaux Celery. Pour les
+réponses en flux (exports CSV, archives ZIP), les requêtes exécutées pendant l'envoi du contenu sont comptées et le
+résultat écrit une fois le flux terminé."""
+
+from collections import Counter
+from contextlib import contextmanager
+import heapq
+import json
+import logging
+import re
+import time
+
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db import connection
+import sentry_sdk
+
+logger = logging.getLogger(__name__)
+
+MAX_SQL_LENGTH = 300
+IN_LIST_RE = re.compile(r"IN \((?:%s, )*%s\)")
+
+
+def get_fingerprint(sql):
+    # Le SQL reçu est paramétré : seule la longueur des listes `IN (...)` varie entre deux requêtes identiques
+    return IN_LIST_RE.sub("IN (...)", sql)
+
+
+class QueryStats:
+    def __init__(self, slowest_count=3):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.slowest = []
+        self.slowest_count = slowest_count
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            self.fingerprints[get_fingerprint(sql)] += 1
+            # `count` départage les durées égales, les chaînes SQL ne sont jamais comparées
+            item = (duration, self.count, sql)
+            if len(self.slowest) < self.slowest_count:
+                heapq.heappush(self.slowest, item)
+            else:
+                heapq.heappushpop(self.slowest, item)
+
+    def get_duplicates(self, threshold):
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+    def as_dict(self, duplicate_threshold):
+        return {
+            "queries": self.count,
+            "db_time_ms": round(self.duration * 1000, 1),
+            "duplicates": [
+                {"count": count, "sql": sql[:MAX_SQL_LENGTH]} for sql, count in self.get_duplicates(duplicate_threshold)
+            ],
+            "slowest": [
+                {"duration_ms": round(duration * 1000, 1), "sql": sql[:MAX_SQL_LENGTH]}
+                for duration, _, sql in sorted(self.slowest, reverse=True)
+            ],
+        }
+
+
+@contextmanager
+def collect_query_stats(stats=None):
+    """Compte les requêtes exécutées dans le bloc, dans `stats` pour reprendre une mesure déjà commencée."""
+    if stats is None:
+        stats = QueryStats()
+    with connection.execute_wrapper(stats):
+        yield stats
+
+
+def get_budget(name):
+    return settings.SQL_STATS_BUDGETS.get(name, settings.SQL_STATS_DEFAULT_BUDGET)
+
+
+def report_query_stats(kind, name, stats):
+    """Écrit la ligne de log de `stats` pour la vue ou la tâche `name` et l'ajoute au span Sentry en cours."""
+    data = {"kind": kind, "name": name, **stats.as_dict(settings.SQL_STATS_DUPLICATE_THRESHOLD)}
+    budget = get_budget(name)
+    data["budget"] = budget
+    logger.info("sql_stats %s", json.dumps(data, ensure_ascii=False))
+    if budget is not None and stats.count > budget:
+        logger.warning(f"{kind} {name} a exécuté {stats.count} requêtes SQL pour un budget de {budget}")
+    if data["duplicates"]:
+        logger.warning(f"{kind} {name} répète des requêtes SQL (N+1 probable) : {data['duplicates'][0]['sql']}")
+
+    if span := sentry_sdk.get_current_span():
+        span.set_data("db.query_count", stats.count)
+        span.set_data("db.time_ms", data["db_time_ms"])
+        span.set_data("db.duplicate_queries", len(data["duplicates"]))
+        span.set_data("db.query_budget", budget)
+
+
+_tasks_stats = {}
+
+
+def start_task_stats(task_id, **kwargs):
+    collector = collect_query_stats()
+    _tasks_stats[task_id] = (collector, collector.__enter__())
+
+
+def stop_task_stats(task_id, task, **kwargs):
+    if task_id not in _tasks_stats:
+        return
+    collector, stats = _tasks_stats.pop(task_id)
+    collector.__exit__(None, None, None)
+    report_query_stats("task", task.name, stats)
+
+
+def connect_task_signals():
+    task_prerun.connect(start_task_stats, weak=False)
+    task_postrun.connect(stop_task_stats, weak=False)
@@ -4,15 +4,33 @@ from celery.exceptions import OperationalError
 from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.signals import user_logged_in
+from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
-from django.db.models.signals import post_migrate, post_save, pre_delete, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 import reversion
+from reversion.models import Version
 from reversion.signals import post_revision_commit
 
-from core.models import AuditLog, CustomRevisionMetaData, Document, FinSuiviContact, LienLibre, Message
-
-from .diffs import create_manual_version
+from core.models import (
+    Agent,
+    AuditLog,
+    Contact,
+    CustomRevisionMetaData,
+    Departement,
+    Document,
+    FinSuiviContact,
+    LienLibre,
+    Message,
+    Region,
+    Structure,
+    User,
+)
+
+from .authorization import clear_principal
+from .cache import CONTACTS_TAG, invalidate_model_tag, invalidate_tags_on_commit
+from .diffs import create_manual_version, invalidate_history_for_version
+from .model_mixins import WithSearchVectorMixin, get_search_vector_parents
 from .notifications import notify_message_deleted
 from .tasks import scan_for_viruses
 
@@ -129,3 +147,82 @@ def update_last_revision(sender, revision, versions, **kwargs):
             instance = model._base_manager.get(pk=v.object_id)
             instance.last_updated = revision.date_created
             instance.save(update_fields=["last_updated"])
+
+
+@receiver(post_revision_commit)
+def invalidate_cached_history(sender, revision, versions, **kwargs):
+    seen = set()
+    for version in versions:
+        invalidate_history_for_version(version, seen=seen)
+
+
+@receiver(post_save, sender=Version)
+def invalidate_cached_history_on_version_change(sender, instance, **kwargs):
+    # Versions créées manuellement (commentaires) ou modifiées par `force_update_on_version`
+    invalidate_history_for_version(instance)
+
+
+@receiver([post_save, post_delete])
+def update_search_vector(sender, instance, signal, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if isinstance(instance, WithSearchVectorMixin) and signal is post_save:
+        if update_fields is None or set(update_fields) & sender.get_search_vector_own_fields():
+            sender.update_search_vector(instance.pk)
+    for parent_model, attname in get_search_vector_parents(sender):
+        if parent_pk := getattr(instance, attname):
+            parent_model.update_search_vector(parent_pk)
+
+
+MESSAGE_SEARCH_TEXT_OWN_FIELDS = {"title", "content", "sender", "sender_structure"}
+
+
+@receiver(post_save, sender=Message)
+def update_message_search_text(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is None or set(update_fields) & MESSAGE_SEARCH_TEXT_OWN_FIELDS:
+        Message.update_search_text(instance.pk)
+
+
+@receiver(m2m_changed, sender=Message.recipients.through)
+@receiver(m2m_changed, sender=Message.recipients_copy.through)
+def update_message_search_text_on_recipients_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        Message.update_search_text(instance.pk)
+    elif pk_set:
+        Message.update_search_text(*pk_set)
+
+
+@receiver([post_save, post_delete], sender=Document)
+def update_message_search_text_on_document_change(sender, instance, raw=False, **kwargs):
+    if not raw and ContentType.objects.get_for_id(instance.content_type_id).model_class() is Message:
+        Message.update_search_text(instance.object_id)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def clear_principal_on_groups_change(sender, instance, action, reverse, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        clear_principal(instance)
+
+
+@receiver([post_save, post_delete], sender=Structure)
+@receiver([post_save, post_delete], sender=Agent)
+@receiver([post_save, post_delete], sender=Contact)
+def invalidate_contacts_cache(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_tags_on_commit(CONTACTS_TAG)
+
+
+@receiver(post_save, sender=User)
+def invalidate_contacts_cache_on_user_change(sender, raw=False, update_fields=None, **kwargs):
+    # Seul `is_active` est utilisé par les listes de contacts (la connexion met à jour `last_login`)
+    if not raw and (update_fields is None or "is_active" in update_fields):
+        invalidate_tags_on_commit(CONTACTS_TAG)
+
+
+for model in (Region, Departement):
+    post_save.connect(invalidate_model_tag, sender=model)
+    post_delete.connect(invalidate_model_tag, sender=model)
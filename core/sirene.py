@@ -0,0 +1,121 @@
+"""Accès à l'API SIRENE de l'INSEE derrière un cache partagé (`CACHES["default"]`).
+
+Les établissements d'un SIREN sont conservés `STALE_TIMEOUT` secondes ; au-delà de `FRESH_TIMEOUT` ils sont encore
+servis pendant qu'une tâche Celery les met à jour. Un seul processus interroge l'API pour un SIREN donné, les autres
+attendent son résultat, et le nombre d'appels est limité au quota de l'INSEE (`SIRENE_RATE_LIMIT` par minute)."""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+import requests
+
+logger = logging.getLogger(__name__)
+
+FRESH_TIMEOUT = 60 * 60 * 24
+STALE_TIMEOUT = 60 * 60 * 24 * 30
+LOCK_TIMEOUT = 10
+WAIT_INTERVAL = 0.2
+RATE_LIMIT_WINDOW = 60
+
+# Seuls les champs utilisés par l'autocomplétion (`siret.mjs`) sont conservés
+ADRESSE_FIELDS = (
+    "numeroVoieEtablissement",
+    "typeVoieEtablissement",
+    "libelleVoieEtablissement",
+    "codePostalEtablissement",
+    "libelleCommuneEtablissement",
+    "codeCommuneEtablissement",
+)
+UNITE_LEGALE_FIELDS = ("denominationUniteLegale", "prenom1UniteLegale", "nomUniteLegale")
+
+
+class SireneError(Exception):
+    pass
+
+
+class SireneRateLimitError(SireneError):
+    pass
+
+
+def _get_key(siren):
+    return f"sirene:{siren}"
+
+
+def normalize_etablissement(etablissement):
+    adresse = etablissement.get("adresseEtablissement") or {}
+    unite_legale = etablissement.get("uniteLegale") or {}
+    return {
+        "siret": etablissement.get("siret"),
+        "adresseEtablissement": {field: adresse.get(field) for field in ADRESSE_FIELDS},
+        "uniteLegale": {field: unite_legale.get(field) for field in UNITE_LEGALE_FIELDS},
+    }
+
+
+def acquire_token() -> bool:
+    """Réserve un appel dans la fenêtre d'une minute en cours, partagée par tous les processus."""
+    key = f"sirene:rate:{int(time.time() // RATE_LIMIT_WINDOW)}"
+    cache.add(key, 0, RATE_LIMIT_WINDOW * 2)
+    try:
+        return cache.incr(key) <= settings.SIRENE_RATE_LIMIT
+    except ValueError:
+        # La clé a disparu entre `add` et `incr` (éviction ou cache factice)
+        return True
+
+
+def fetch_etablissements(siren) -> dict:
+    if not acquire_token():
+        raise SireneRateLimitError(f"SIRENE rate limit reached, cannot look up {siren}")
+    try:
+        response = requests.get(
+            f"{settings.SIRENE_API_BASE.removesuffix('/')}/siret",
+            params={"q": f"siren:{siren}* AND -periode(etatAdministratifEtablissement:F)", "nombre": "100"},
+            headers={"X-INSEE-Api-Key-Integration": settings.SIRENE_API_KEY},
+            timeout=4,
+        )
+    except requests.RequestException as e:
+        raise SireneError(f"Cannot contact SIRENE API: {e}") from e
+
+    # L'API répond 404 quand aucun établissement ne correspond : ce résultat est aussi mis en cache
+    if response.status_code == 404:
+        data = {"etablissements": []}
+    elif response.status_code == 200:
+        data = {"etablissements": [normalize_etablissement(it) for it in response.json().get("etablissements", [])]}
+    else:
+        raise SireneError(f"SIRENE API answered {response.status_code} for {siren}")
+
+    cache.set(_get_key(siren), {"data": data, "fetched_at": time.time()}, STALE_TIMEOUT)
+    return data
+
+
+def refresh_etablissements(siren) -> dict | None:
+    """Interroge l'API, sauf si un autre processus le fait déjà pour ce SIREN (renvoie alors None)."""
+    lock_key = f"sirene:lock:{siren}"
+    if not cache.add(lock_key, True, LOCK_TIMEOUT):
+        return None
+    try:
+        return fetch_etablissements(siren)
+    finally:
+        cache.delete(lock_key)
+
+
+def get_etablissements(siren) -> dict:
+    entry = cache.get(_get_key(siren))
+    if entry is not None:
+        if time.time() - entry["fetched_at"] > FRESH_TIMEOUT and cache.add(
+            f"sirene:revalidate:{siren}", True, LOCK_TIMEOUT
+        ):
+            from core.tasks import refresh_sirene
+
+            refresh_sirene.delay(siren)
+        return entry["data"]
+
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while (data := refresh_etablissements(siren)) is None:
+        time.sleep(WAIT_INTERVAL)
+        if (entry := cache.get(_get_key(siren))) is not None:
+            return entry["data"]
+        if time.monotonic() > deadline:
+            raise SireneError(f"Timeout while waiting for the concurrent lookup of {siren}")
+    return data
@@ -1,16 +1,20 @@
+import {applicationReady} from "Application"
 import choicesDefaults from "choicesDefaults"
+import {Controller} from "Stimulus"
 
-document.addEventListener("DOMContentLoaded", () => {
-    const options = {
-        ...choicesDefaults,
-        removeItemButton: true,
-        placeholderValue: "Choisir dans la liste",
-        searchPlaceholderValue: "Choisir dans la liste",
-        noChoicesText: "Aucun contact à sélectionner",
+// Contrôleur Stimulus : les formulaires d'ajout de contacts arrivent avec l'onglet Contacts, après le chargement
+class ContactAddForm extends Controller {
+    connect() {
+        const select = this.element.querySelector("select")
+        select.style.visibility = "visible"
+        new Choices(select, {
+            ...choicesDefaults,
+            removeItemButton: true,
+            placeholderValue: "Choisir dans la liste",
+            searchPlaceholderValue: "Choisir dans la liste",
+            noChoicesText: "Aucun contact à sélectionner",
+        })
     }
+}
 
-    document.querySelectorAll("#id_contacts_structures, #id_contacts_agents").forEach(el => {
-        el.style.visibility = "visible"
-        new Choices(el, options)
-    })
-})
+applicationReady.then(app => app.register("contact-add-form", ContactAddForm))
@@ -5,10 +5,11 @@ import {Controller} from "Stimulus"
  * @property {HTMLElement} tabsTarget
  * @property {HTMLElement} documentsMessageContainerTarget
  * @property {HTMLTemplateElement} successMessageTplTarget
+ * @property {HTMLElement[]} tabContentTargets
  */
 class FicheBlocCommun extends Controller {
     static values = {tab: {type: String, default: ""}}
-    static targets = ["tabs", "documentsMessageContainer", "successMessageTpl"]
+    static targets = ["tabs", "documentsMessageContainer", "successMessageTpl", "tabContent"]
 
     initialize() {
         const actions = [
@@ -27,13 +28,45 @@ class FicheBlocCommun extends Controller {
     connect() {
         this.processDocumentSuccess()
         delete sessionStorage[COMMON_EVENTS.DOCUMENT_SUCCESS]
+        for (const panel of this.tabsTarget.querySelectorAll(".fr-tabs__panel--selected")) {
+            this.loadTabContent(panel)
+        }
+    }
+
+    /** @param {HTMLElement} currentTarget */
+    onPanelDisclosed({currentTarget}) {
+        this.loadTabContent(currentTarget)
+    }
+
+    /**
+     * Le contenu d'un onglet est chargé à sa première ouverture, avec les filtres présents dans l'URL de la page
+     * @param {HTMLElement} panel
+     */
+    async loadTabContent(panel) {
+        const container = this.tabContentTargets.find(target => panel.contains(target))
+        if (container === undefined || container.dataset.loaded) return
+        container.dataset.loaded = "true"
+
+        const url = new URL(container.dataset.url, window.location.href)
+        url.search = window.location.search
+        try {
+            const response = await fetch(url, {headers: {"X-Requested-With": "XMLHttpRequest"}})
+            if (!response.ok) throw new Error(`${response.status}`)
+            container.innerHTML = await response.text()
+        } catch (_e) {
+            delete container.dataset.loaded
+            container.innerHTML = `<p class="fr-error-text">Le contenu de l'onglet n'a pas pu être chargé.</p>`
+        }
+        container.removeAttribute("aria-busy")
     }
 
     /** @param {HTMLElement} currentTarget */
     onTabSelected({currentTarget}) {
         const id = currentTarget.getAttribute("aria-controls")
-        if (id && this.tabsTarget.querySelector(`#${id}`) !== null) {
+        const panel = id ? this.tabsTarget.querySelector(`#${id}`) : null
+        if (panel !== null) {
             window.location.hash = `#${id}`
+            this.loadTabContent(panel)
         }
     }
 
@@ -1,4 +1,4 @@
-import {applicationReady, dsfrDisclosePromise} from "Application"
+import {applicationReady, dsfrDisclosePromise, escapeHTML} from "Application"
 import {Controller} from "Stimulus"
 import {search} from "Utils"
 
@@ -7,6 +7,9 @@ const GROUP_IDENTIFIER = "treeselect-group"
 const CHOICES_CHANGED_EVENT = "choices"
 
 let counter = 0
+let choiceTreeCounter = 0
+
+const escapeAttribute = value => escapeHTML(value).replaceAll('"', "&quot;")
 
 class TreeselectChoicesListener extends Controller {
     connect() {
@@ -281,8 +284,15 @@ class TreeselectSelectedBadge extends TreeselectChoicesListener {
 /**
  * *** Values ***
  * @property {Number} minSearchLengthValue
+ * @property {String} choiceTreeUrlValue
+ * @property {Boolean} hasChoiceTreeUrlValue
  * *** Targets ***
  * @property {HTMLElement} bodyTarget
+ * @property {HTMLElement} optionsTarget
+ * @property {HTMLTemplateElement} optionTplTarget
+ * @property {HTMLTemplateElement} groupTplTarget
+ * @property {HTMLTemplateElement} groupOptionTplTarget
+ * @property {HTMLTemplateElement} groupStaticTplTarget
  * @property {HTMLButtonElement} buttonTarget
  * @property {HTMLInputElement} searchbarTarget
  * @property {HTMLButtonElement[]} unselectAllBtnTargets
@@ -292,8 +302,23 @@ class TreeselectSelectedBadge extends TreeselectChoicesListener {
  * @property {HTMLTemplateElement} selectedTagTplTarget
  */
 class Treeselect extends Controller {
-    static targets = ["body", "button", "searchbar", "unselectAllBtn", "selectedGroup", "selectedTag", "selectedTagTpl"]
-    static values = {minSearchLength: {type: Number, default: 3}}
+    static targets = [
+        "body",
+        "button",
+        "searchbar",
+        "unselectAllBtn",
+        "selectedGroup",
+        "selectedTag",
+        "selectedTagTpl",
+        "options",
+        "optionTpl",
+        "groupTpl",
+        "groupOptionTpl",
+        "groupStaticTpl",
+    ]
+    static values = {minSearchLength: {type: Number, default: 3}, choiceTreeUrl: String}
+
+    #choiceTreeRequested = false
 
     initialize() {
         this.choices = new Map()
@@ -400,6 +425,66 @@ class Treeselect extends Controller {
         this.unselectAllBtnTargets.forEach(it => it.classList.toggle("fr-hidden", size === 0))
     }
 
+    /**
+     * Only selected options are rendered in the page; the full tree is fetched on first opening.
+     * The URL is versioned so the response is served from the browser cache most of the time.
+     */
+    async loadChoiceTree() {
+        if (!this.hasChoiceTreeUrlValue || this.#choiceTreeRequested) return
+        this.#choiceTreeRequested = true
+
+        let nodes
+        try {
+            const response = await fetch(this.choiceTreeUrlValue, {credentials: "same-origin"})
+            if (!response.ok) throw new Error(`Unexpected status ${response.status}`)
+            nodes = await response.json()
+        } catch (error) {
+            this.#choiceTreeRequested = false
+            console.error(error)
+            return
+        }
+
+        const fragment = document.createDocumentFragment()
+        this.appendChoiceTreeNodes(fragment, nodes)
+        for (const it of fragment.querySelectorAll("input")) {
+            it.checked = this.choices.has(it.value.trim())
+        }
+        this.optionsTarget.replaceChildren(fragment)
+    }
+
+    appendChoiceTreeNodes(parent, nodes) {
+        for (const node of nodes) {
+            const element = this.renderChoiceTreeNode(node)
+            parent.append(element)
+            if (node.choices) {
+                this.appendChoiceTreeNodes(element.querySelector('[data-testid="group-container"]'), node.choices)
+            }
+        }
+    }
+
+    renderChoiceTreeNode(node) {
+        let template = this.optionTplTarget
+        if (node.choices && !node.can_expand) {
+            template = this.groupStaticTplTarget
+        } else if (node.choices) {
+            template = "value" in node ? this.groupOptionTplTarget : this.groupTplTarget
+        }
+
+        const container = document.createElement("template")
+        container.innerHTML = template.innerHTML
+            .replaceAll("__index__", `tree${choiceTreeCounter++}`)
+            .replaceAll("__value__", escapeAttribute(node.value ?? ""))
+            .replaceAll("__categorised_label__", escapeAttribute(node.categorised_label || node.label))
+            .replaceAll("__label__", escapeAttribute(node.label))
+        const element = container.content.firstElementChild
+        if (node.html_name_prefix) {
+            for (const it of element.querySelectorAll("input")) {
+                it.name = `${node.html_name_prefix}-${it.name}`
+            }
+        }
+        return element
+    }
+
     onEraseSearch() {
         this.searchbarTarget.value = ""
         this.searchbarTarget.dispatchEvent(new Event("input"))
@@ -1,5 +1,30 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import datetime
+from itertools import islice
 import os
+import zipfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+from core.validators import AllowedExtensions
+
+ALREADY_COMPRESSED_EXTENSIONS = {
+    AllowedExtensions.PNG.value,
+    AllowedExtensions.JPG.value,
+    AllowedExtensions.JPEG.value,
+    AllowedExtensions.GIF.value,
+    AllowedExtensions.PDF.value,
+    AllowedExtensions.DOCX.value,
+    AllowedExtensions.XLSX.value,
+    AllowedExtensions.PPTX.value,
+    AllowedExtensions.ODT.value,
+    AllowedExtensions.ODS.value,
+    AllowedExtensions.ODP.value,
+    AllowedExtensions.QGZ.value,
+}
 
 
 def get_timestamped_filename(instance, filename):
@@ -11,3 +36,72 @@ def get_timestamped_filename(instance, filename):
 def get_timestamped_filename_export(instance, filename):
     new_filename = f"{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{instance.id}_{filename}"
     return os.path.join("export/", new_filename)
+
+
+@contextmanager
+def open_for_streaming_write(storage, name):
+    """Ouvre un fichier du stockage en écriture, sans passer par un fichier temporaire local.
+
+    Avec S3, le contenu est envoyé par morceaux (multipart upload) au fur et à mesure de l'écriture.
+    Le stockage sur le système de fichiers local sert de repli pour le développement et les tests."""
+    name = storage.get_available_name(name)
+    if isinstance(storage, FileSystemStorage):
+        os.makedirs(os.path.dirname(storage.path(name)), exist_ok=True)
+    with storage.open(name, "wb") as file:
+        yield file, name
+
+
+class _ZipOutput:
+    """Flux en écriture seule : `zipfile` y écrit l'archive, les octets sont récupérés au fur et à mesure."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+def _open_for_zip(file_field):
+    file = file_field.storage.open(file_field.name, "rb")
+    file.read(0)  # Déclenche le téléchargement du fichier (S3) dans le thread de préchargement
+    return file
+
+
+def stream_zip(file_fields, prefetch=4):
+    """Générateur des octets d'une archive ZIP contenant les fichiers donnés, destiné à une `StreamingHttpResponse`.
+
+    Les `prefetch` fichiers suivants sont récupérés en parallèle pendant l'écriture du fichier courant : la mémoire
+    utilisée dépend de la taille de ces quelques fichiers et non de celle de l'archive. Les formats déjà compressés
+    sont stockés tels quels."""
+    output = _ZipOutput()
+    date_time = timezone.localtime(timezone.now()).timetuple()[:6]
+    file_fields = iter(file_fields)
+    with ThreadPoolExecutor(max_workers=prefetch) as executor, zipfile.ZipFile(output, "w") as zip_file:
+        pending = deque((field, executor.submit(_open_for_zip, field)) for field in islice(file_fields, prefetch))
+        while pending:
+            file_field, future = pending.popleft()
+            pending.extend((field, executor.submit(_open_for_zip, field)) for field in islice(file_fields, 1))
+
+            filename = file_field.name.split("/")[-1]
+            info = zipfile.ZipInfo(filename, date_time)
+            if os.path.splitext(filename)[1][1:].lower() in ALREADY_COMPRESSED_EXTENSIONS:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+
+            with future.result() as file, zip_file.open(info, "w") as dest:
+                for chunk in file.chunks():
+                    dest.write(chunk)
+                    if data := output.pop():
+                        yield data
+            yield output.pop()
+    yield output.pop()
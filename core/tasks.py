@@ -1,9 +1,14 @@
 import logging
 
 from celery import shared_task
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.utils.module_loading import import_string
 
-from core.antivirus import scan_document
-from core.models import Document
+from core.antivirus import claim_documents_to_scan, save_scan_result, scan_document
+from core.models import Document, Export
+from core.notifications import notify_export_failed, notify_export_is_ready
+from core.sirene import SireneError, refresh_etablissements
 
 logger = logging.getLogger(__name__)
 
@@ -11,9 +16,40 @@ logger = logging.getLogger(__name__)
 @shared_task
 def scan_for_viruses(document_pk):
     logger.info(f"Will start scanning of {document_pk}")
-    document = Document.objects.get(pk=document_pk)
-    is_infected = scan_document(document)
-    if is_infected is not None:
-        document.is_infected = is_infected
-        document.save(update_fields=["is_infected"])
+    documents = claim_documents_to_scan(Document._base_manager.filter(pk=document_pk), limit=1)
+    if not documents:
+        logger.info(f"Document {document_pk} is already being scanned")
+        return
+    save_scan_result(documents[0], scan_document(documents[0]))
     logger.info(f"Will end scanning of {document_pk}")
+
+
+@shared_task
+def refresh_sirene(siren):
+    try:
+        refresh_etablissements(siren)
+    except SireneError as e:
+        logger.info(f"Cannot refresh SIRENE data of {siren}: {e}")
+
+
+@shared_task(acks_late=True, reject_on_worker_lost=True)
+def export_document_task(export_id, view_path):
+    """Rend le document Word d'un évènement avec la vue d'export `view_path`, hors de la requête."""
+    export = Export.objects.select_related("user__agent").get(id=export_id)
+    if export.task_done or export.task_failed:
+        return
+    entry = export.queryset_sequence[0]
+    model = apps.get_model(entry["model"])
+    try:
+        view = import_string(view_path)()
+        view.object = model.objects.get(pk=entry["ids"][0])
+        export.file.save(view.get_document_filename(), ContentFile(view.render_document()), save=False)
+    except Exception:
+        export.task_failed = True
+        export.save(update_fields=["task_failed"])
+        notify_export_failed(export, object=model)
+        raise
+
+    export.task_done = True
+    export.save()
+    notify_export_is_ready(export, object=view.object)
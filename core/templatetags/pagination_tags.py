@@ -20,5 +20,8 @@ register = template.Library()
 def url_replace(context, **kwargs):
     query = context["request"].GET.copy()
     for k, v in kwargs.items():
-        query[k] = v
+        if v in ("", None):
+            query.pop(k, None)
+        else:
+            query[k] = v
     return query.urlencode()
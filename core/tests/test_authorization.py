@@ -0,0 +1,26 @@
+import pytest
+
+from core.authorization import get_principal
+from core.factories import AgentFactory, ContactAgentFactory, ContactStructureFactory
+from core.models import Contact
+
+
+@pytest.mark.django_db
+def test_principal_contacts():
+    contact = ContactAgentFactory()
+    structure_contact = ContactStructureFactory(structure=contact.agent.structure)
+
+    principal = get_principal(contact.agent.user)
+
+    assert principal.agent_contact == contact
+    assert principal.structure_contact == structure_contact
+
+
+@pytest.mark.django_db
+def test_principal_without_contact_raises_does_not_exist():
+    principal = get_principal(AgentFactory().user)
+
+    with pytest.raises(Contact.DoesNotExist):
+        principal.agent_contact
+    with pytest.raises(Contact.DoesNotExist):
+        principal.structure_contact
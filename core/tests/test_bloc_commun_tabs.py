@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.middleware.csrf import CSRF_SECRET_LENGTH
+from django.urls import reverse
+import pytest
+
+from core.factories import ContactStructureFactory, DocumentFactory, MessageFactory, StructureFactory
+from sv.factories import EvenementFactory, FicheDetectionFactory
+from sv.models import Evenement, FicheDetection
+
+
+def get_tab_url(evenement, tab):
+    content_type = ContentType.objects.get_for_model(Evenement)
+    return reverse(f"bloc-commun-{tab}", kwargs={"content_type": content_type.pk, "pk": evenement.pk})
+
+
+@pytest.mark.django_db
+def test_detail_page_only_renders_tab_counts(client):
+    evenement = EvenementFactory()
+    message = MessageFactory(content_object=evenement, title="Point sur les prélèvements")
+    document = DocumentFactory(content_object=evenement, nom="Compte rendu de la réunion")
+
+    response = client.get(evenement.get_absolute_url())
+
+    content = response.content.decode()
+    assert response.context["message_count"] == 1
+    assert response.context["document_count"] == 1
+    assert get_tab_url(evenement, "messages") in content
+    assert message.title not in content
+    assert document.nom not in content
+
+
+@pytest.mark.django_db
+def test_tabs_render_their_content(client):
+    evenement = EvenementFactory()
+    MessageFactory(content_object=evenement, title="Point sur les prélèvements")
+    DocumentFactory(content_object=evenement, nom="Compte rendu de la réunion")
+    contact = ContactStructureFactory()
+    evenement.contacts.add(contact)
+
+    assert "Point sur les prélèvements" in client.get(get_tab_url(evenement, "messages")).content.decode()
+    assert "Compte rendu de la réunion" in client.get(get_tab_url(evenement, "documents")).content.decode()
+    response = client.get(get_tab_url(evenement, "contacts"))
+    assert [item["contact"] for item in response.context["contacts_structures"]] == [contact]
+
+
+@pytest.mark.django_db
+def test_tabs_forward_filters(client):
+    evenement = EvenementFactory()
+    MessageFactory(content_object=evenement, title="Premier message")
+    MessageFactory(content_object=evenement, title="Second message")
+
+    response = client.get(get_tab_url(evenement, "messages"), {"full_text_search": "Premier"})
+
+    assert [message.title for message in response.context["message_filter"].qs] == ["Premier message"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("tab", ["messages", "contacts", "documents"])
+def test_tabs_check_object_access(client, tab):
+    evenement = EvenementFactory(createur=StructureFactory(), etat=Evenement.Etat.BROUILLON)
+
+    response = client.get(get_tab_url(evenement, tab))
+
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_tab_is_not_sent_again_when_unchanged(client):
+    evenement = EvenementFactory()
+    MessageFactory(content_object=evenement)
+    url = get_tab_url(evenement, "messages")
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert "private" in response["Cache-Control"]
+
+    response = client.get(url, headers={"If-None-Match": response["ETag"]})
+    assert response.status_code == 304
+
+    MessageFactory(content_object=evenement)
+    response = client.get(url, headers={"If-None-Match": response["ETag"]})
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("tab", ["messages", "contacts", "documents"])
+def test_tabs_are_only_available_for_objects_with_bloc_commun(client, tab):
+    detection = FicheDetectionFactory()
+    content_type = ContentType.objects.get_for_model(FicheDetection)
+
+    response = client.get(reverse(f"bloc-commun-{tab}", kwargs={"content_type": content_type.pk, "pk": detection.pk}))
+
+    assert response.status_code == 404
+
+
+@pytest.mark.django_db
+def test_tab_is_sent_again_when_csrf_secret_changes(client):
+    evenement = EvenementFactory()
+    url = get_tab_url(evenement, "documents")
+    response = client.get(url)
+
+    client.cookies[settings.CSRF_COOKIE_NAME] = "a" * CSRF_SECRET_LENGTH
+    response = client.get(url, headers={"If-None-Match": response["ETag"]})
+
+    assert response.status_code == 200
@@ -0,0 +1,36 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from core.cache import get_or_set, invalidate_tags
+from core.factories import ContactStructureFactory
+from core.filters_mixins import STRUCTURE_CONTACT_TREE
+
+
+def test_get_or_set_is_invalidated_by_tags(locmem_caches):
+    compute = Mock(side_effect=[1, 2])
+
+    assert get_or_set("value", compute, ["tag_1", "tag_2"]) == 1
+    assert get_or_set("value", compute, ["tag_1", "tag_2"]) == 1
+    invalidate_tags("tag_2")
+    assert get_or_set("value", compute, ["tag_1", "tag_2"]) == 2
+    assert get_or_set("value", compute, ["tag_1", "tag_2"]) == 2
+    assert compute.call_count == 2
+
+
+@pytest.mark.django_db
+def test_structure_contact_tree_is_invalidated_on_contact_change(
+    locmem_caches, django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    version, _ = STRUCTURE_CONTACT_TREE.get_data()
+
+    with django_assert_num_queries(0):
+        assert STRUCTURE_CONTACT_TREE.get_data()[0] == version
+
+    with django_capture_on_commit_callbacks(execute=True):
+        contact = ContactStructureFactory(structure__force_can_be_contacted=True)
+
+    new_version, content = STRUCTURE_CONTACT_TREE.get_data()
+    assert new_version != version
+    assert {"value": str(contact.pk), "label": str(contact), "categorised_label": None} in json.loads(content)
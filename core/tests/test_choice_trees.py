@@ -0,0 +1,58 @@
+from django.urls import reverse
+
+from core.choice_trees import register_choice_tree
+from core.widgets import TreeselectCheckbox, TreeselectGroup, TreeselectItem
+
+TEST_TREE = register_choice_tree(
+    "test",
+    lambda: [
+        TreeselectGroup(
+            label="Europe",
+            value="europe",
+            categorised_label="Europe",
+            choices=[TreeselectItem(value="france", label="France", categorised_label="Europe > France")],
+        ),
+        ("chili", "Chili"),
+    ],
+)
+
+
+def test_choice_tree_view_is_cacheable(client):
+    version, content = TEST_TREE.get_data()
+
+    response = client.get(TEST_TREE.url)
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "label": "Europe",
+            "can_expand": True,
+            "value": "europe",
+            "categorised_label": "Europe",
+            "choices": [{"value": "france", "label": "France", "categorised_label": "Europe > France"}],
+        },
+        {"value": "chili", "label": "Chili", "categorised_label": None},
+    ]
+    assert response.headers["ETag"] == f'"{version}"'
+    assert "immutable" in response.headers["Cache-Control"]
+
+    response = client.get(TEST_TREE.url, headers={"If-None-Match": f'"{version}"'})
+    assert response.status_code == 304
+
+    response = client.get(reverse("choice-tree", kwargs={"key": "test", "version": "obsolete"}))
+    assert response.content.decode() == content
+    assert "no-cache" in response.headers["Cache-Control"]
+
+    response = client.get(reverse("choice-tree", kwargs={"key": "inconnu", "version": version}))
+    assert response.status_code == 404
+
+
+def test_lazy_treeselect_only_renders_selected_options():
+    widget = TreeselectCheckbox(choice_tree=TEST_TREE)
+
+    html = widget.render("pays", ["france"], attrs={"id": "id_pays"})
+
+    assert f'data-treeselect-choice-tree-url-value="{TEST_TREE.url}"' in html
+    assert 'value="france"' in html and "checked" in html
+    assert 'value="chili"' not in html
+    assert 'value="__value__"' in html
@@ -0,0 +1,88 @@
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+import pytest
+from reversion.models import Version
+
+from core.benchmark import get_list_scenarios, get_object_scenarios, run_scenario
+from core.dataset import BENCHMARK_USER_EMAIL, DatasetGenerator
+from core.models import Document, FinSuiviContact, Message
+from ssa.dataset import generate_evenements_produit
+from ssa.models import EvenementProduit
+from sv.dataset import generate_evenements
+from sv.filters import EvenementFilter
+from sv.models import Evenement, FicheDetection, Lieu
+
+
+@pytest.fixture
+def generator():
+    generator = DatasetGenerator(batch_size=2, nb_structures=2, messages_per_object=2, documents_per_object=1, seed=1)
+    generator.setup()
+    return generator
+
+
+@pytest.mark.django_db
+def test_generate_evenements_produit(generator):
+    assert list(generate_evenements_produit(generator, 3)) == [2, 1]
+
+    evenements = EvenementProduit.objects.all()
+    assert evenements.count() == 3
+    assert Message.objects.count() == 3 * 2
+    assert Document.objects.count() == 3
+    for evenement in evenements:
+        assert evenement.search_vector is not None
+        assert evenement.contacts.filter(structure=evenement.createur).exists()
+        assert Version.objects.get_for_object(evenement).count() == 1
+    assert set(FinSuiviContact.objects.values_list("object_id", flat=True)) <= set(
+        evenements.values_list("pk", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_generate_evenements_sv(generator):
+    assert sum(generate_evenements(generator, 3)) == 3
+
+    assert Evenement.objects.count() == 3
+    assert 3 <= FicheDetection.objects.count() <= 9
+    assert Lieu.objects.count() >= FicheDetection.objects.count()
+    for evenement in Evenement.objects.all():
+        assert evenement.createur_id in evenement.structures_acces
+        version = Version.objects.get_for_object(evenement).get()
+        assert version.revision.version_set.count() > 1
+        assert all(detection.numero.startswith(evenement.numero) for detection in evenement.detections.all())
+
+
+@pytest.mark.django_db
+def test_setup_does_not_recreate_benchmark_user(generator, django_user_model):
+    DatasetGenerator(nb_structures=1).setup()
+
+    assert django_user_model.objects.filter(email=BENCHMARK_USER_EMAIL).count() == 1
+
+
+@pytest.mark.django_db
+def test_list_scenarios_use_valid_filters(client, generator):
+    list(generate_evenements(generator, 2))
+
+    scenarios = list(get_list_scenarios("SV", reverse("sv:evenement-liste"), EvenementFilter))
+
+    assert len(scenarios) > 1
+    for scenario in scenarios:
+        result = run_scenario(client, scenario, repeat=1)
+        assert result["status"] == 200, scenario
+        assert result["queries"] > 0
+
+
+@pytest.mark.django_db
+def test_object_scenarios_search_messages_with_a_generated_word(generator):
+    list(generate_evenements(generator, 1))
+    evenement = Evenement.objects.get()
+
+    [scenario] = [s for s in get_object_scenarios("SV", evenement) if "recherche" in s.name]
+
+    word = scenario.data["full_text_search"]
+    assert word != "1"
+    assert evenement.messages.filter(content__contains=word).exists()
+
+
+def test_run_benchmark_requires_at_least_one_repeat():
+    with pytest.raises(CommandError):
+        call_command("run_benchmark", repeat=0)
@@ -0,0 +1,57 @@
+import pytest
+
+from core.factories import ContactStructureFactory
+from core.models import Contact, FinSuiviContact
+from ssa.factories import EvenementProduitFactory, InvestigationCasHumainFactory
+from sv.factories import EvenementFactory
+from tiac.factories import EvenementSimpleFactory, InvestigationTiacFactory
+
+# Requêtes de chaque page de détail quand la structure de l'utilisateur n'est pas parmi les contacts de l'objet
+DETAIL_PAGES_NUM_QUERIES = [
+    # Évènement, détections, zone délimitée, dernière version, liens libres, droits et compteurs des onglets
+    (EvenementFactory, 11),
+    # Évènement, établissements, dernière version, liens libres, droits et compteurs des onglets
+    (EvenementProduitFactory, 8),
+    # Comme l'évènement produit
+    (InvestigationCasHumainFactory, 8),
+    # Comme l'évènement produit, plus la liste des DD du formulaire de transfert
+    (EvenementSimpleFactory, 9),
+    # Comme l'évènement produit, plus les repas, documents, analyses et le formulaire de conclusion
+    (InvestigationTiacFactory, 21),
+]
+
+
+def add_structures(obj, number, in_fin_suivi=0):
+    for index, contact in enumerate(ContactStructureFactory.create_batch(number)):
+        obj.contacts.add(contact)
+        if index < in_fin_suivi:
+            FinSuiviContact.objects.create(content_object=obj, contact=contact)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("factory,num_queries", DETAIL_PAGES_NUM_QUERIES)
+def test_detail_page_query_budget_does_not_depend_on_contacts_and_fin_de_suivi(
+    client, django_assert_num_queries, factory, num_queries, mocked_authentification_user
+):
+    obj = factory(etat="en_cours")
+    client.get(obj.get_absolute_url())
+
+    with django_assert_num_queries(num_queries):
+        client.get(obj.get_absolute_url())
+
+    add_structures(obj, 5, in_fin_suivi=3)
+
+    with django_assert_num_queries(num_queries):
+        client.get(obj.get_absolute_url())
+
+    structure_contact = Contact.objects.get(structure=mocked_authentification_user.agent.structure)
+    obj.contacts.add(structure_contact)
+    FinSuiviContact.objects.create(content_object=obj, contact=structure_contact)
+
+    # La structure de l'utilisateur est parmi les contacts : sa fin de suivi est lue avec eux, sans requête dédiée
+    with django_assert_num_queries(num_queries - 1):
+        response = client.get(obj.get_absolute_url())
+    assert response.context["etat"]["etat"] == "fin de suivi"
+    assert response.context["can_fin_de_suivi_be_added"] is False
+    assert response.context["can_fin_de_suivi_be_removed"] is True
+    assert len(response.context["contacts_not_in_fin_suivi"]) == 2
@@ -1,6 +1,7 @@
 from io import StringIO
 
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.management import call_command
 import pytest
@@ -146,3 +147,42 @@ def test_import_contacts_twice_with_user_activation(mock_csv_data):
     user.is_active = True
     user.save()
     call_command("import_contacts", mock_csv_data)
+
+
+@pytest.mark.django_db
+def test_import_contacts_only_updates_changed_agents(mock_csv_data, tmp_path):
+    _reset_contacts()
+    call_command("import_contacts", mock_csv_data)
+    agent = Agent.objects.get(user__username="sophie.martin@example.com")
+
+    data = """Structure,Prénom,Nom,Mail,Fonction_hiérarchique,Complément_fonction,Téléphone,Mobile
+DDI/DDPP/DDPP17/SSA,John,Doe,test@example.com,Manager,,+33 5 46 00 00 00,+33 6 00 00 00 00
+DDI/DDPP/DDPP17/SSA,Sophie,Martin,sophie.martin@example.com,Responsable,Contrôle sanitaire,+33 5 57 01 02 03,+33 6 12 34 56 78"""
+    p = tmp_path / "test_2.csv"
+    p.write_text(data, encoding="utf-8")
+    out = StringIO()
+    call_command("import_contacts", str(p), stdout=out)
+
+    assert "agents créés : 0, agents modifiés : 1" in out.getvalue()
+    agent.refresh_from_db()
+    assert agent.structure == Structure.objects.get(niveau2="DDPP17")
+    assert agent.structure_complete == "DDI/DDPP/DDPP17/SSA"
+    assert Agent.objects.count() == 3
+    assert Contact.objects.filter(agent__isnull=False).count() == 3
+    assert Contact.objects.filter(structure__isnull=False).count() == 3
+    assert User.objects.get(username="test2@example2.com").is_active is False
+
+
+@pytest.mark.django_db
+def test_import_contacts_adds_default_groups_to_new_users(mock_csv_data, settings):
+    _reset_contacts()
+    group = Group.objects.create(name="default_group")
+    settings.USERS_DEFAULT_GROUPS = ["default_group"]
+
+    call_command("import_contacts", mock_csv_data)
+
+    assert set(group.user_set.values_list("username", flat=True)) == {
+        "test@example.com",
+        "test2@example2.com",
+        "sophie.martin@example.com",
+    }
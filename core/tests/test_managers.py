@@ -5,9 +5,19 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 import pytest
 
-from core.factories import ContactAgentFactory, ContactStructureFactory, DocumentFactory, StructureFactory, UserFactory
-from core.models import Contact, Document
+from core.factories import (
+    ContactAgentFactory,
+    ContactStructureFactory,
+    DocumentFactory,
+    MessageFactory,
+    StructureFactory,
+    UserFactory,
+)
+from core.managers import UnionQuerySetSequence
+from core.models import Contact, Document, Message
 from sv.factories import EvenementFactory
+from tiac.factories import EvenementSimpleFactory, InvestigationTiacFactory
+from tiac.models import EvenementSimple, InvestigationTiac
 
 User = get_user_model()
 
@@ -85,3 +95,43 @@ def test_order_by_structure_and_name():
         contact_ddpp1,
         contact_mus,
     ]
+
+
+@pytest.mark.django_db
+def test_message_search_uses_up_to_date_search_text():
+    evenement = EvenementFactory()
+    recipient = ContactAgentFactory(agent__nom="Lefèvre")
+    message = MessageFactory(
+        content_object=evenement, title="Résultats", content="<p>Analyse du lot</p>", recipients=[], recipients_copy=[]
+    )
+
+    assert list(Message.objects.search("resultats")) == [message]
+    assert list(Message.objects.search("ANALYSE DU")) == [message]
+    assert list(Message.objects.search("lefevre")) == []
+
+    message.recipients.add(recipient)
+    assert list(Message.objects.search("lefevre")) == [message]
+
+    DocumentFactory(content_object=message, nom="Rapport d'essai")
+    assert list(Message.objects.search("rapport d'essai")) == [message]
+
+    message.recipients.remove(recipient)
+    assert list(Message.objects.search("lefevre")) == []
+
+
+@pytest.mark.django_db
+def test_union_queryset_sequence_orders_and_slices_in_database(django_assert_num_queries):
+    simple_1 = EvenementSimpleFactory(numero_annee=2025, numero_evenement=2)
+    simple_2 = EvenementSimpleFactory(numero_annee=2024, numero_evenement=5)
+    investigation_1 = InvestigationTiacFactory(numero_annee=2025, numero_evenement=22)
+    investigation_2 = InvestigationTiacFactory(numero_annee=2023, numero_evenement=1)
+    queryset = UnionQuerySetSequence(EvenementSimple.objects.all(), InvestigationTiac.objects.all()).order_by(
+        "-numero_annee", "-numero_evenement"
+    )
+
+    assert list(queryset) == [investigation_1, simple_1, simple_2, investigation_2]
+    assert list(queryset.reverse()) == [investigation_2, simple_2, simple_1, investigation_1]
+    # Une requête pour la page, une pour charger les objets de chaque modèle présent dans la page
+    with django_assert_num_queries(2):
+        assert list(queryset[1:3]) == [simple_1, simple_2]
+    assert [getattr(obj, "#") for obj in queryset[2:4]] == [0, 1]
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from django.utils import timezone
+import pytest
+
+from core.managers import UnionQuerySetSequence
+from core.pagination import KeysetPaginator
+from sv.factories import EvenementFactory
+from sv.models import Evenement
+from tiac.factories import EvenementSimpleFactory, InvestigationTiacFactory
+from tiac.models import EvenementSimple, InvestigationTiac
+
+
+def get_all_pages(paginator):
+    pages = [paginator.get_page()]
+    while pages[-1].has_next():
+        pages.append(paginator.get_page(pages[-1].next_cursor))
+    return pages
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", [("date_publication", "-pk"), ("-date_publication", "-pk")])
+def test_keyset_pagination_with_null_values(ordering):
+    for day in (None, 3, 1, None, 2, 1, None):
+        evenement = EvenementFactory()
+        date_publication = timezone.make_aware(datetime(2025, 1, day)) if day else None
+        Evenement.objects.filter(pk=evenement.pk).update(date_publication=date_publication)
+    queryset = Evenement.objects.order_by(*ordering)
+    paginator = KeysetPaginator(queryset, 2, ordering)
+
+    pages = get_all_pages(paginator)
+
+    assert [page.number for page in pages] == [1, 2, 3, 4]
+    assert [evenement for page in pages for evenement in page] == list(queryset)
+    previous_page = paginator.get_page(pages[2].previous_cursor)
+    assert previous_page.object_list == pages[1].object_list
+    assert previous_page.number == 2
+
+
+@pytest.mark.django_db
+def test_keyset_pagination_on_union_queryset_sequence():
+    for numero in (1, 2, 3):
+        EvenementSimpleFactory(numero_annee=2025, numero_evenement=numero)
+        InvestigationTiacFactory(numero_annee=2025, numero_evenement=numero)
+    ordering = ("-numero_annee", "-numero_evenement", "#", "-pk")
+    queryset = UnionQuerySetSequence(EvenementSimple.objects.all(), InvestigationTiac.objects.all()).order_by(*ordering)
+    paginator = KeysetPaginator(queryset, 4, ordering)
+
+    pages = get_all_pages(paginator)
+
+    assert paginator.count == 6
+    assert [[str(obj) for obj in page] for page in pages] == [
+        ["T-2025.3", "T-2025.3", "T-2025.2", "T-2025.2"],
+        ["T-2025.1", "T-2025.1"],
+    ]
+    assert [obj for page in pages for obj in page] == list(queryset)
+    assert [type(obj) for obj in pages[0]] == [EvenementSimple, InvestigationTiac] * 2
+    last_page = paginator.get_page(last=True)
+    assert last_page.object_list == pages[-1].object_list
+    assert last_page.number == 2
+    assert last_page.has_next() is False
+    previous_page = paginator.get_page(last_page.previous_cursor)
+    assert previous_page.object_list == pages[0].object_list
+    assert previous_page.number == 1
+    assert previous_page.has_previous() is False
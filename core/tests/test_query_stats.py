@@ -0,0 +1,102 @@
+import json
+import logging
+from unittest.mock import Mock
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+import pytest
+
+from core.factories import StructureFactory
+from core.models import Structure
+from core.query_stats import collect_query_stats, get_fingerprint, start_task_stats, stop_task_stats
+from seves.middlewares import QueryStatsMiddleware
+
+
+def get_sql_stats_lines(caplog):
+    return [json.loads(r.getMessage().removeprefix("sql_stats ")) for r in caplog.records if r.levelname == "INFO"]
+
+
+def test_fingerprint_ignores_in_list_length():
+    assert get_fingerprint('SELECT 1 WHERE "id" IN (%s, %s, %s)') == get_fingerprint('SELECT 1 WHERE "id" IN (%s)')
+
+
+@pytest.mark.django_db
+def test_collect_query_stats_detects_repeated_queries():
+    structures = StructureFactory.create_batch(5)
+
+    with collect_query_stats() as stats:
+        for structure in structures:
+            Structure.objects.get(pk=structure.pk)
+        Structure.objects.count()
+
+    assert stats.count == 6
+    [(_, count)] = stats.get_duplicates(threshold=5)
+    assert count == 5
+    assert len(stats.as_dict(duplicate_threshold=5)["slowest"]) == 3
+
+
+@pytest.mark.django_db
+def test_middleware_warns_when_budget_is_exceeded(caplog, settings):
+    settings.SQL_STATS_BUDGETS = {"sv:evenement-liste": 1}
+    settings.SQL_STATS_DUPLICATE_THRESHOLD = 2
+    StructureFactory()
+
+    def get_response(request):
+        Structure.objects.count()
+        Structure.objects.count()
+        return HttpResponse()
+
+    request = RequestFactory().get("/sv/evenements/")
+    request.resolver_match = resolve("/sv/evenements/")
+    with caplog.at_level(logging.INFO, logger="core.query_stats"):
+        QueryStatsMiddleware(get_response)(request)
+
+    [line] = get_sql_stats_lines(caplog)
+    assert line["kind"] == "view"
+    assert line["name"] == "sv:evenement-liste"
+    assert line["queries"] == 2
+    assert line["duplicates"][0]["count"] == 2
+    warnings = [r.getMessage() for r in caplog.records if r.levelname == "WARNING"]
+    assert "view sv:evenement-liste a exécuté 2 requêtes SQL pour un budget de 1" in warnings
+    assert len(warnings) == 2
+
+
+@pytest.mark.django_db
+def test_middleware_counts_queries_run_while_streaming(caplog):
+    def rows():
+        for _ in range(3):
+            yield f"{Structure.objects.count()}\n"
+
+    def get_response(request):
+        Structure.objects.count()
+        return StreamingHttpResponse(rows())
+
+    request = RequestFactory().get("/sv/evenements/")
+    request.resolver_match = resolve("/sv/evenements/")
+    with caplog.at_level(logging.INFO, logger="core.query_stats"):
+        response = QueryStatsMiddleware(get_response)(request)
+        assert get_sql_stats_lines(caplog) == []
+        assert b"".join(response.streaming_content) == b"0\n0\n0\n"
+        Structure.objects.count()
+
+    [line] = get_sql_stats_lines(caplog)
+    assert line["name"] == "sv:evenement-liste"
+    assert line["queries"] == 4
+
+
+@pytest.mark.django_db
+def test_task_stats_are_reported(caplog):
+    task = Mock()
+    task.name = "core.tasks.scan_for_viruses"
+
+    with caplog.at_level(logging.INFO, logger="core.query_stats"):
+        start_task_stats(task_id="1234")
+        Structure.objects.count()
+        stop_task_stats(task_id="1234", task=task)
+        Structure.objects.count()
+
+    [line] = get_sql_stats_lines(caplog)
+    assert line["kind"] == "task"
+    assert line["name"] == "core.tasks.scan_for_viruses"
+    assert line["queries"] == 1
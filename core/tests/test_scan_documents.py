@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from unittest.mock import MagicMock
+
+from django.core.management import call_command
+from django.utils import timezone
+import pytest
+
+from core.antivirus import MultipartFileBody, claim_documents_to_scan, scan_document
+from core.factories import DocumentFactory, UserFactory
+from core.models import Document
+
+
+@pytest.fixture
+def documents_to_scan(settings):
+    settings.ANTIVIRUS_URL = "https://test.com"
+    settings.ANTIVIRUS_TOKEN = "NOT_A_REAL_TOKEN"
+    user = UserFactory()
+    documents = DocumentFactory.create_batch(3, content_object=user)
+    Document.objects.filter(pk__in=[document.pk for document in documents]).update(is_infected=None)
+    return documents
+
+
+@pytest.mark.django_db
+def test_scan_documents_scans_all_pending_documents(documents_to_scan):
+    mock_post = MagicMock(status_code=200)
+    mock_post.json.return_value = {"is_malware": False}
+    output = StringIO()
+    with mock.patch("core.antivirus.requests.Session.post", mock.Mock(return_value=mock_post)) as mocked_antivirus:
+        call_command("scan_documents", "--workers", "2", "--batch-size", "2", stdout=output)
+
+    assert mocked_antivirus.call_count == 3
+    assert "Analyzed 3 documents, 0 will be retried later" in output.getvalue()
+    assert Document.objects.filter(is_infected=False, next_scan_at__isnull=True).count() == 3
+
+
+@pytest.mark.django_db
+def test_scan_documents_retries_later_when_antivirus_fails(documents_to_scan):
+    output = StringIO()
+    with mock.patch("core.antivirus.requests.Session.post", mock.Mock(return_value=MagicMock(status_code=500))):
+        call_command("scan_documents", stdout=output)
+    assert "Analyzed 0 documents, 3 will be retried later" in output.getvalue()
+
+    for document in Document._base_manager.filter(pk__in=[document.pk for document in documents_to_scan]):
+        assert document.is_infected is None
+        assert document.scan_attempts == 1
+        assert document.next_scan_at > timezone.now()
+
+    with mock.patch("core.antivirus.requests.Session.post") as mocked_antivirus:
+        call_command("scan_documents", stdout=StringIO())
+    mocked_antivirus.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_scan_document_streams_the_file(documents_to_scan):
+    document = documents_to_scan[0]
+    with document.file.open("rb") as file:
+        content = file.read()
+    sent = {}
+
+    def post(url, headers, data, timeout):
+        sent["content_type"], sent["body"] = headers["Content-Type"], data.read()
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"is_malware": False}
+        return response
+
+    with mock.patch("core.antivirus.requests.Session.post", side_effect=post):
+        assert scan_document(document) is False
+
+    assert sent["content_type"].startswith("multipart/form-data; boundary=")
+    assert content in sent["body"]
+
+
+def test_multipart_file_body_is_read_by_chunks():
+    body = MultipartFileBody("file", "rapport.pdf", BytesIO(b"0123456789"), 10)
+
+    chunks = [body.read(16) for _ in range(len(body) // 16 + 2)]
+
+    content = b"".join(chunks)
+    assert len(content) == len(body)
+    assert all(len(chunk) <= 16 for chunk in chunks)
+    assert b'name="file"; filename="rapport.pdf"\r\n' in content
+    assert b"\r\n\r\n0123456789\r\n--" in content
+
+
+@pytest.mark.django_db
+def test_claimed_documents_are_reserved_for_the_whole_batch(documents_to_scan):
+    queryset = Document._base_manager.filter(is_infected__isnull=True)
+
+    documents = claim_documents_to_scan(queryset, limit=3, workers=1)
+
+    assert len(documents) == 3
+    for document in queryset:
+        assert document.next_scan_at > timezone.now() + timedelta(seconds=3 * 30)
+    assert claim_documents_to_scan(queryset, limit=3) == []
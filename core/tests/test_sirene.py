@@ -0,0 +1,96 @@
+import time
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.urls import reverse
+import pytest
+
+from core.sirene import FRESH_TIMEOUT, get_etablissements
+
+ETABLISSEMENT = {
+    "siret": "12007901700030",
+    "statutDiffusionEtablissement": "O",
+    "uniteLegale": {
+        "denominationUniteLegale": "DIRECTION GENERALE DE L'ALIMENTATION",
+        "prenom1UniteLegale": None,
+        "nomUniteLegale": None,
+        "categorieJuridiqueUniteLegale": "7113",
+    },
+    "adresseEtablissement": {
+        "numeroVoieEtablissement": "175",
+        "typeVoieEtablissement": "RUE",
+        "libelleVoieEtablissement": "DU CHEVALERET",
+        "codePostalEtablissement": "75015",
+        "libelleCommuneEtablissement": "PARIS",
+        "codeCommuneEtablissement": "75115",
+        "codePaysEtrangerEtablissement": None,
+    },
+}
+
+
+@pytest.fixture
+def sirene_stub(settings, locmem_caches):
+    settings.SIRENE_API_KEY = "FOO"
+    settings.SIRENE_API_BASE = "http://sirene.local/"
+    with patch("core.sirene.requests.get") as mock_get:
+        mock_get.return_value = Mock(status_code=200, json=Mock(return_value={"etablissements": [ETABLISSEMENT]}))
+        yield mock_get
+
+
+def test_sirene_api_caches_normalized_etablissements(client, sirene_stub):
+    url = reverse("siret-api", kwargs={"siret": "120 079 017"})
+
+    assert client.get(url).json() == client.get(url).json()
+
+    assert sirene_stub.call_count == 1
+    assert client.get(url).json() == {
+        "etablissements": [
+            {
+                "siret": "12007901700030",
+                "adresseEtablissement": {
+                    "numeroVoieEtablissement": "175",
+                    "typeVoieEtablissement": "RUE",
+                    "libelleVoieEtablissement": "DU CHEVALERET",
+                    "codePostalEtablissement": "75015",
+                    "libelleCommuneEtablissement": "PARIS",
+                    "codeCommuneEtablissement": "75115",
+                },
+                "uniteLegale": {
+                    "denominationUniteLegale": "DIRECTION GENERALE DE L'ALIMENTATION",
+                    "prenom1UniteLegale": None,
+                    "nomUniteLegale": None,
+                },
+            }
+        ]
+    }
+
+
+def test_sirene_stale_data_is_served_while_revalidated(sirene_stub):
+    cache.set("sirene:120079017", {"data": {"etablissements": []}, "fetched_at": time.time() - FRESH_TIMEOUT - 1})
+
+    with patch("core.tasks.refresh_sirene.delay") as mock_delay:
+        assert get_etablissements("120079017") == {"etablissements": []}
+        assert get_etablissements("120079017") == {"etablissements": []}
+
+    mock_delay.assert_called_once_with("120079017")
+    assert sirene_stub.call_count == 0
+
+
+def test_sirene_concurrent_lookups_share_one_call(sirene_stub):
+    cache.add("sirene:lock:120079017", True)
+
+    def other_process_done(seconds):
+        cache.set("sirene:120079017", {"data": {"etablissements": []}, "fetched_at": time.time()})
+
+    with patch("core.sirene.time.sleep", side_effect=other_process_done):
+        assert get_etablissements("120079017") == {"etablissements": []}
+
+    assert sirene_stub.call_count == 0
+
+
+def test_sirene_api_is_rate_limited(client, settings, sirene_stub):
+    settings.SIRENE_RATE_LIMIT = 1
+
+    assert client.get(reverse("siret-api", kwargs={"siret": "120079017"})).status_code == 200
+    assert client.get(reverse("siret-api", kwargs={"siret": "552100554"})).status_code == 429
+    assert sirene_stub.call_count == 1
@@ -1,5 +1,48 @@
-from core.storage import get_timestamped_filename
+import io
+import zipfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+import pytest
+
+from core.factories import DocumentFactory, UserFactory
+from core.storage import get_timestamped_filename, open_for_streaming_write, stream_zip
 
 
 def test_storage_filename():
     assert get_timestamped_filename(None, "X" * 300 + "Y.txt").endswith("X.txt")
+
+
+def test_open_for_streaming_write_does_not_overwrite_existing_file():
+    existing_name = default_storage.save("export/streaming/test.csv", ContentFile(b"existing"))
+
+    with open_for_streaming_write(default_storage, "export/streaming/test.csv") as (file, name):
+        file.write(b"first,")
+        file.write(b"second")
+
+    assert name != existing_name
+    assert default_storage.open(name).read() == b"first,second"
+    assert default_storage.open(existing_name).read() == b"existing"
+
+
+@pytest.mark.django_db
+def test_stream_zip_stores_already_compressed_files():
+    user = UserFactory()
+    files = [
+        DocumentFactory(content_object=user, file=SimpleUploadedFile(f"test.{ext}", f"{ext} content".encode())).file
+        for ext in ("txt", "PNG", "pdf", "csv")
+    ]
+
+    content = b"".join(stream_zip(files, prefetch=2))
+
+    with zipfile.ZipFile(io.BytesIO(content)) as zip_file:
+        infos = zip_file.infolist()
+        assert [info.filename for info in infos] == [file.name.split("/")[-1] for file in files]
+        assert [info.compress_type for info in infos] == [
+            zipfile.ZIP_DEFLATED,
+            zipfile.ZIP_STORED,
+            zipfile.ZIP_STORED,
+            zipfile.ZIP_DEFLATED,
+        ]
+        assert zip_file.read(infos[0]) == b"txt content"
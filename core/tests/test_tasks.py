@@ -16,7 +16,7 @@ def test_without_virus(settings):
 
     mock_post = MagicMock(status_code=200)
     mock_post.json.return_value = {"is_malware": False}
-    with mock.patch("core.antivirus.requests.post", mock.Mock(return_value=mock_post)) as mocked_antivirus:
+    with mock.patch("core.antivirus.requests.Session.post", mock.Mock(return_value=mock_post)) as mocked_antivirus:
         scan_for_viruses(document.pk)
     mocked_antivirus.assert_called_once()
 
@@ -33,7 +33,7 @@ def test_with_virus(settings):
 
     mock_post = MagicMock(status_code=200)
     mock_post.json.return_value = {"is_malware": True}
-    with mock.patch("core.antivirus.requests.post", mock.Mock(return_value=mock_post)) as mocked_antivirus:
+    with mock.patch("core.antivirus.requests.Session.post", mock.Mock(return_value=mock_post)) as mocked_antivirus:
         scan_for_viruses(document.pk)
     mocked_antivirus.assert_called_once()
 
@@ -5,15 +5,20 @@ from . import auth_views
 from .views import (
     ACNotificationView,
     AgentAddView,
+    ChoiceTreeView,
     CloturerView,
     ContactDeleteView,
+    ContactsTabView,
     DocumentDeleteView,
+    DocumentsTabView,
     DocumentUpdateView,
     DocumentUploadView,
     EvenementOuvrirView,
+    ExportProgressView,
     FinDeSuiviHandlingView,
     MessageCreateView,
     MessageDetailsView,
+    MessagesTabView,
     MessageUpdateView,
     PublishAndACNotificationView,
     PublishView,
@@ -120,6 +125,31 @@ urlpatterns = [
         RevisionsListView.as_view(),
         name="revision-list",
     ),
+    path(
+        "choix/<str:key>/<str:version>.json",
+        ChoiceTreeView.as_view(),
+        name="choice-tree",
+    ),
+    path(
+        "bloc-commun/<int:content_type>/<int:pk>/messages/",
+        MessagesTabView.as_view(),
+        name="bloc-commun-messages",
+    ),
+    path(
+        "bloc-commun/<int:content_type>/<int:pk>/contacts/",
+        ContactsTabView.as_view(),
+        name="bloc-commun-contacts",
+    ),
+    path(
+        "bloc-commun/<int:content_type>/<int:pk>/documents/",
+        DocumentsTabView.as_view(),
+        name="bloc-commun-documents",
+    ),
+    path(
+        "export/<int:pk>/progression/",
+        ExportProgressView.as_view(),
+        name="export-progress",
+    ),
     path(
         "documents/zip/",
         ZipDownloadView.as_view(),
@@ -1,8 +1,8 @@
 import contextlib
-import io
+import hashlib
 import json
 import logging
-import zipfile
+import re
 
 from django.conf import settings
 from django.contrib import messages
@@ -11,18 +11,19 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import PermissionDenied
 from django.db import transaction
 from django.http import HttpResponseRedirect
-from django.http.response import Http404, HttpResponse, HttpResponseServerError, JsonResponse
+from django.http.response import Http404, HttpResponse, HttpResponseServerError, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect
-from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.utils.translation import ngettext
 from django.views import View
 from django.views.generic import DetailView, ListView
 from django.views.generic.edit import FormView, UpdateView
-import requests
 import reversion
 from reversion.models import Version
 
-from core.diffs import CompareMixin, Diff, get_diff_from_comment_version
+from core.choice_trees import get_choice_tree
+from core.diffs import CompareMixin, Diff, get_cached_history, get_diff_from_comment_version, related_objects_cache
 
 from .filters import DocumentFilter
 from .forms import (
@@ -41,13 +42,22 @@ from .mixins import (
     GetFicheObjectMixin,
     PreventActionIfVisibiliteBrouillonMixin,
     WithACNotificationMixin,
+    WithBlocCommunPermission,
+    WithContactFormsInContextMixin,
+    WithContactListInContextMixin,
+    WithDocumentListInContextMixin,
     WithEtatMixin,
+    WithFicheObjectDocumentUploadFormMixin,
     WithFormErrorsAsMessagesMixin,
+    WithMessageMixin,
     WithPublishMixin,
 )
-from .models import Contact, Document, FinSuiviContact, Message, user_is_referent_national
+from .model_mixins import WithBlocCommunFieldsMixin
+from .models import Contact, Document, Export, FinSuiviContact, Message, user_is_referent_national
 from .notifications import notify_contact_agent_added_or_removed
 from .redirect import safe_redirect
+from .sirene import SireneRateLimitError, get_etablissements
+from .storage import stream_zip
 
 logger = logging.getLogger(__name__)
 
@@ -489,7 +499,7 @@ class EvenementOuvrirView(View):
             messages.error(request, "Vous ne pouvez pas ouvrir l'évènement.")
             return redirect(redirect_url)
         with transaction.atomic():
-            user_contact = self.request.user.agent.structure.contact_set.get()
+            user_contact = self.request.principal.structure_contact
             if fin_suivi := obj.fin_suivi.filter(contact=user_contact):
                 fin_suivi.delete()
             obj.publish()
@@ -536,21 +546,111 @@ def sirene_api(request, siret: str):
         return HttpResponseServerError()
 
     try:
-        response = requests.get(
-            f"{settings.SIRENE_API_BASE.removesuffix('/')}/siret",
-            params={"q": f"siren:{siret}* AND -periode(etatAdministratifEtablissement:F)", "nombre": "100"},
-            headers={"X-INSEE-Api-Key-Integration": settings.SIRENE_API_KEY},
-            timeout=4,
-        )
-        if response.status_code != 200:
-            return HttpResponseServerError()
-
-        return JsonResponse(response.json())
+        return JsonResponse(get_etablissements(siret))
+    except SireneRateLimitError as e:
+        logger.warning(e)
+        return HttpResponse(status=429)
     except Exception as e:
         logger.exception(e)
         return HttpResponseServerError()
 
 
+CHOICE_TREE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class ChoiceTreeView(View):
+    def get(self, request, key, version):
+        choice_tree = get_choice_tree(key)
+        if choice_tree is None:
+            raise Http404
+        current_version, content = choice_tree.get_data()
+        etag = f'"{current_version}"'
+
+        response = get_conditional_response(request, etag=etag) or HttpResponse(
+            content, content_type="application/json"
+        )
+        response.headers["ETag"] = etag
+        if version == current_version:
+            # L'URL change avec le contenu : la réponse peut être conservée
+            patch_cache_control(response, private=True, max_age=CHOICE_TREE_MAX_AGE, immutable=True)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+CSRF_INPUT_RE = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]*"')
+
+
+class BlocCommunTabMixin(UserPassesTestMixin):
+    """Onglet du bloc commun d'un objet, chargé par la page de détail à l'ouverture de l'onglet.
+
+    La page transmet ses paramètres (filtres des messages et des documents) dans la requête. La réponse porte un
+    ETag calculé sur son contenu : le navigateur peut réutiliser sa copie tant que l'onglet n'a pas changé."""
+
+    def get_object(self, queryset=None):
+        if hasattr(self, "object"):
+            return self.object
+        try:
+            model_class = ContentType.objects.get_for_id(self.kwargs["content_type"]).model_class()
+        except ContentType.DoesNotExist:
+            raise Http404
+        # Seuls les objets portant un bloc commun (messages, contacts, documents) ont des onglets
+        if model_class is None or not issubclass(model_class, WithBlocCommunFieldsMixin):
+            raise Http404
+        self.object = get_object_or_404(model_class, pk=self.kwargs["pk"])
+        return self.object
+
+    def test_func(self):
+        return self.get_object().can_user_access(self.request.user)
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs).render()
+        # Le jeton CSRF des formulaires est masqué différemment à chaque rendu : seul son secret entre dans l'ETag, pour
+        # que la copie du navigateur soit renvoyée quand le secret change (à la connexion), avec un jeton valide.
+        content = CSRF_INPUT_RE.sub(b"", response.content)
+        csrf_secret = self.request.META.get("CSRF_COOKIE", "").encode()
+        etag = quote_etag(hashlib.md5(content + csrf_secret, usedforsecurity=False).hexdigest())
+        response.headers["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return get_conditional_response(self.request, etag=etag, response=response)
+
+
+class MessagesTabView(BlocCommunTabMixin, WithMessageMixin, DetailView):
+    template_name = "core/_fil-de-suivi.html"
+
+
+class ContactsTabView(
+    BlocCommunTabMixin,
+    WithBlocCommunPermission,
+    WithContactFormsInContextMixin,
+    WithContactListInContextMixin,
+    DetailView,
+):
+    template_name = "core/_contacts.html"
+
+
+class DocumentsTabView(
+    BlocCommunTabMixin,
+    WithBlocCommunPermission,
+    WithDocumentListInContextMixin,
+    WithFicheObjectDocumentUploadFormMixin,
+):
+    template_name = "core/_documents.html"
+
+
+class ExportProgressView(View):
+    def get(self, request, pk):
+        export = get_object_or_404(Export, pk=pk, user=request.user)
+        return JsonResponse(
+            {
+                "progress": export.progress,
+                "nb_lines": export.nb_lines,
+                "done": export.task_done,
+                "failed": export.task_failed,
+            }
+        )
+
+
 class RevisionsListView(UserPassesTestMixin, CompareMixin, ListView):
     compare_exclude = [
         "is_infected",
@@ -558,6 +658,11 @@ class RevisionsListView(UserPassesTestMixin, CompareMixin, ListView):
         "notification_sent",
         "last_updated",
         "date_publication",
+        "search_vector",
+        "search_text",
+        "communes",
+        "regions",
+        "structures_acces",
     ]
     template_name = "reversion/version_list.html"
 
@@ -573,30 +678,33 @@ class RevisionsListView(UserPassesTestMixin, CompareMixin, ListView):
         return self.object.can_user_access(self.request.user)
 
     def get_queryset(self):
-        qs = (
+        return (
             Version.objects.get_for_object(self.object)
             .select_related("revision", "revision__user__agent__structure")
             .exclude(serialized_data={})
         )
 
+    def get_versions(self):
+        versions = list(self.get_queryset())
+
         obj_ct = ContentType.objects.get_for_model(self.object)
         generic_models = [(Message, "messages"), (Document, "documents")]
 
         for related_model, prefetch_name in generic_models:
             related_qs = related_model.objects.filter(content_type=obj_ct, object_id=self.object.id)
-            for version in qs:
+            for version in versions:
                 setattr(version._object_version.object, f"_prefetched_{prefetch_name}", related_qs)
 
         if hasattr(self.object, "get_prefetch_for_revision_list_view"):
             for name, prefetch in self.object.get_prefetch_for_revision_list_view():
-                for version in qs:
+                for version in versions:
                     setattr(version._object_version.object, name, prefetch)
-        return qs
+        return versions
 
     def get_initial_patch(self, versions):
-        etat_value = json.loads(list(versions)[-1].serialized_data)[0]["fields"]["etat"]
+        etat_value = json.loads(versions[-1].serialized_data)[0]["fields"]["etat"]
         readable_etat = self.object.Etat(etat_value).label
-        return Diff(field="Statut", old="Vide", new=readable_etat, revision=list(versions)[-1].revision)
+        return Diff(field="Statut", old="Vide", new=readable_etat, revision=versions[-1].revision)
 
     def get_comment_versions(self):
         return (
@@ -605,25 +713,23 @@ class RevisionsListView(UserPassesTestMixin, CompareMixin, ListView):
             .filter(serialized_data={})
         )
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context["object"] = self.object
-
-        versions = context["object_list"]
+    def get_patches(self):
+        versions = self.get_versions()
         if not versions:
-            return context
+            return []
 
-        context["patches"] = [self.get_initial_patch(versions)]
-        for i in range(1, len(versions)):
-            diffs, _ = self.compare(self.object, versions[i], versions[i - 1])
-            context["patches"].extend(diffs)
+        patches = [self.get_initial_patch(versions)]
+        with related_objects_cache():
+            for i in range(1, len(versions)):
+                diffs, _ = self.compare(self.object, versions[i], versions[i - 1])
+                patches.extend(diffs)
 
         for version in self.get_comment_versions():
             comment_diff = get_diff_from_comment_version(version)
             if comment_diff:
-                context["patches"].append(comment_diff)
+                patches.append(comment_diff)
 
-        patches = sorted(context["patches"], key=lambda x: x.date_created, reverse=True)
+        patches = sorted(patches, key=lambda x: x.date_created, reverse=True)
         for i, diff in enumerate(patches):
             if diff.new == WithEtatMixin.Etat.CLOTURE.label:
                 for d in patches[:i]:
@@ -633,8 +739,12 @@ class RevisionsListView(UserPassesTestMixin, CompareMixin, ListView):
                     else:
                         d.comment = "Modifié après clôture"
                 break
+        return patches
 
-        context["patches"] = patches
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["object"] = self.object
+        context["patches"] = get_cached_history(self.object, self.get_patches)
         return context
 
 
@@ -662,24 +772,7 @@ class ZipDownloadView(UserPassesTestMixin, View):
 
         queryset = queryset.exclude(is_deleted=True).exclude(is_infected=None)
 
-        buffer = io.BytesIO()
-
-        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zip_file:
-            now = timezone.localtime(timezone.now()).timetuple()[:6]
-            for obj in queryset:
-                f = obj.file
-                f.open("rb")
-
-                filename = f.name.split("/")[-1]
-                info = zipfile.ZipInfo(filename)
-                info.date_time = now
-                with zip_file.open(info, "w") as dest:
-                    for chunk in f.chunks():
-                        dest.write(chunk)
-
-                f.close()
-        buffer.seek(0)
-
-        response = HttpResponse(buffer.getvalue(), content_type="application/zip")
+        files = [document.file for document in queryset]
+        response = StreamingHttpResponse(stream_zip(files), content_type="application/zip")
         response["Content-Disposition"] = f'attachment; filename="documents_{str(self.object)}.zip"'
         return response
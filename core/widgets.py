@@ -15,12 +15,20 @@ if typing.TYPE_CHECKING:
 
     from django.db.models import Choices
 
+    from core.choice_trees import ChoiceTree
+
     _Choice: TypeAlias = tuple[Any, Any]
     _ChoiceNamedGroup: TypeAlias = tuple[str, Iterable[_Choice]]
     _Choices: TypeAlias = Iterable["_Choice | _ChoiceNamedGroup | TreeselectGroup | TreeselectItem"] | type[Choices]
 
 _UNSET = type("UNSET", (), {"__bool__": lambda *args: False, "__repr__": lambda *args: "UNSET"})()
 
+# Remplacés côté client dans les gabarits des options chargées à la demande (voir `treeselect.mjs`)
+_INDEX_PLACEHOLDER = "__index__"
+_VALUE_PLACEHOLDER = "__value__"
+_LABEL_PLACEHOLDER = "__label__"
+_CATEGORISED_LABEL_PLACEHOLDER = "__categorised_label__"
+
 
 @dataclasses.dataclass(kw_only=True)
 class TreeselectItem(Promise):
@@ -76,7 +84,7 @@ class TreeselectGroupWidget(widgets.ChoiceWidget):
         if isinstance(item, TreeselectGroup):
             super().__init__(self.parent.attrs, self.item.choices)
         else:
-            super().__init__(self.parent.attrs, ((item.label, item.value),))
+            super().__init__(self.parent.attrs, (item,))
 
     def get_selected(self, option_value, value):
         selected = (not self.parent.has_selected or self.parent.allow_multiple_selected) and str(option_value) in value
@@ -179,11 +187,14 @@ class TreeselectMixin(widgets.ChoiceWidget):
         *,
         input_type: Literal["checkbox", "radio"] = _UNSET,
         has_search_bar: bool = _UNSET,
+        choice_tree: ChoiceTree | None = None,
     ):
         if input_type is not _UNSET:
             self.input_type = input_type
         if has_search_bar is not _UNSET:
             self.has_search_bar = has_search_bar
+        # Avec `choice_tree`, seules les options sélectionnées sont rendues, l'arbre complet est chargé à l'ouverture
+        self.choice_tree = choice_tree
 
         self._choices = ()
         super().__init__(attrs, choices=choices)
@@ -197,16 +208,48 @@ class TreeselectMixin(widgets.ChoiceWidget):
         context = super().get_context(name, value, attrs)
         context["widget"]["has_search_bar"] = self.has_search_bar
         context["widget"]["allow_multiple_selected"] = self.allow_multiple_selected
+        if self.choice_tree is not None:
+            context["widget"]["choice_tree_url"] = self.choice_tree.url
+            context["widget"]["lazy_templates"] = self.get_lazy_templates(name, attrs)
         return context
 
+    def get_lazy_templates(self, name, attrs):
+        """Contextes des gabarits d'option et de groupe, complétés côté client avec les nœuds de l'arbre."""
+        attrs = {**(attrs or {}), "data-categorised-label": _CATEGORISED_LABEL_PLACEHOLDER}
+        id_stream = getattr(self, "_id_stream", None)
+        self._id_stream = itertools.repeat(_INDEX_PLACEHOLDER)
+        self.has_selected = False
+        try:
+            templates = {
+                "option": self.create_option(
+                    name, _VALUE_PLACEHOLDER, _LABEL_PLACEHOLDER, False, _INDEX_PLACEHOLDER, attrs=attrs
+                )
+            }
+            for template_name, kwargs in (
+                ("group", {}),
+                ("group_option", {"value": _VALUE_PLACEHOLDER}),
+                ("group_static", {"can_expand": False}),
+            ):
+                group = TreeselectGroup(
+                    label=_LABEL_PLACEHOLDER, choices=(), categorised_label=_CATEGORISED_LABEL_PLACEHOLDER, **kwargs
+                )
+                templates[template_name] = TreeselectGroupWidget(self, group).get_context(name, [], {**attrs})
+        finally:
+            if id_stream is None:
+                del self._id_stream
+            else:
+                self._id_stream = id_stream
+        return templates
+
     def optgroups(self, name, values, attrs=None):
         self.has_selected = False
-        for choice in self.choices:
+        choices = self.choices if self.choice_tree is None else self.choice_tree.get_selected_items(values)
+        for choice in choices:
             match choice:
                 case TreeselectGroup() | TreeselectItem():
                     yield TreeselectGroupWidget(self, choice).get_context(name, values, attrs)
                 case _:
-                    label, value = choice
+                    value, label = choice
                     yield TreeselectGroupWidget(
                         self, TreeselectItem(label=label, value=value, categorised_label="")
                     ).get_context(name, values, attrs)
@@ -239,8 +282,9 @@ class TreeselectCheckbox(TreeselectMixin):
         input_type: Literal["checkbox", "radio"] = _UNSET,
         has_search_bar: bool = _UNSET,
         auto_select_children: bool = True,
+        choice_tree: ChoiceTree | None = None,
     ):
-        super().__init__(attrs, choices, input_type=input_type, has_search_bar=has_search_bar)
+        super().__init__(attrs, choices, input_type=input_type, has_search_bar=has_search_bar, choice_tree=choice_tree)
         self.auto_select_children = auto_select_children
 
 
@@ -1,6 +1,7 @@
 from django.conf import settings
 from django.urls import reverse_lazy
 
+from core.authorization import get_principal
 from core.constants import Domains
 
 
@@ -31,7 +32,7 @@ def environment_class(request):
 
 
 def domains(request):
-    user_groups = [g.name for g in request.user.groups.all()]
+    user_groups = get_principal(request.user).group_names
 
     current_domain = None
     other_domains = []
@@ -5,8 +5,26 @@ from django.middleware.csp import ContentSecurityPolicyMiddleware
 from django.shortcuts import redirect
 from django.urls import resolve
 from django.utils.csp import CSP
+from django.utils.functional import SimpleLazyObject
 
+from core.authorization import clear_principal, get_principal
 from core.constants import Domains
+from core.query_stats import collect_query_stats, report_query_stats
+
+
+class PrincipalMiddleware:
+    """Expose `request.principal` : agent, structure, contacts et groupes de l'utilisateur chargés une seule fois."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.principal = SimpleLazyObject(lambda: get_principal(request.user))
+        try:
+            return self.get_response(request)
+        finally:
+            # L'instance de l'utilisateur peut être réutilisée par une autre requête (tests)
+            clear_principal(request.user)
 
 
 class LoginAndGroupRequiredMiddleware:
@@ -32,7 +50,7 @@ class LoginAndGroupRequiredMiddleware:
         needed_group = Domains.group_for_value(match.app_name)
         if needed_group:
             request.domain = match.app_name
-            if needed_group in [g.name for g in user.groups.all()]:
+            if get_principal(user).has_group(needed_group):
                 response = self.get_response(request)
                 response.set_cookie("preferred_domain", match.app_name)
                 return response
@@ -47,7 +65,7 @@ class HomeRedirectMiddleware:
 
     def __call__(self, request):
         if request.user.is_authenticated and request.path == "/":
-            groups = [g.name for g in request.user.groups.all()]
+            groups = get_principal(request.user).group_names
             preferred_domain = request.COOKIES.get("preferred_domain")
             if preferred_domain == "ssa" and settings.SSA_GROUP in groups:
                 return redirect("ssa:evenement-produit-liste")
@@ -73,3 +91,36 @@ class SevesCSPMiddleware(ContentSecurityPolicyMiddleware):
             response._csp_config = csp_config
 
         return super().process_response(request, response)
+
+
+class QueryStatsMiddleware:
+    """Mesure les requêtes SQL de chaque vue, la route (`app:nom`) sert de clé pour `SQL_STATS_BUDGETS`."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with collect_query_stats() as stats:
+            response = self.get_response(request)
+        if not (request.resolver_match and request.resolver_match.view_name):
+            return response
+        view_name = request.resolver_match.view_name
+        if response.streaming and not response.is_async:
+            response.streaming_content = self.stream_with_stats(response.streaming_content, view_name, stats)
+        else:
+            report_query_stats("view", view_name, stats)
+        return response
+
+    def stream_with_stats(self, content, view_name, stats):
+        """Compte les requêtes exécutées pendant la production de chaque morceau du flux, et uniquement pendant
+        celle-ci : le serveur peut traiter autre chose entre deux morceaux."""
+        iterator = iter(content)
+        try:
+            while True:
+                with collect_query_stats(stats):
+                    chunk = next(iterator, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            report_query_stats("view", view_name, stats)
@@ -92,6 +92,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "seves.middlewares.PrincipalMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "waffle.middleware.WaffleMiddleware",
@@ -141,10 +142,19 @@ DATABASES = {
 }
 
 CACHES = {
+    # En production : CACHE_CLASS=django.core.cache.backends.redis.RedisCache (partagé entre les processus)
     "default": {
         "BACKEND": env("CACHE_CLASS", default="django.core.cache.backends.locmem.LocMemCache"),
-    }
+        "LOCATION": env("CACHE_LOCATION", default=env("SCALINGO_REDIS_URL", default="")),
+        "KEY_PREFIX": "seves",
+    },
+    # Niveau local au processus placé devant le cache partagé (voir `core.cache`)
+    "local": {
+        "BACKEND": env("LOCAL_CACHE_CLASS", default="django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": "local",
+    },
 }
+REVERSION_LOOKUP_CACHE_SIZE = env("REVERSION_LOOKUP_CACHE_SIZE", int, default=512)
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -242,6 +252,24 @@ OIDC_TIMEOUT = env("OIDC_RP_TIMEOUT", int, default=20)
 
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
+# Mesure des requêtes SQL par vue et par tâche Celery (voir `core.query_stats`)
+SQL_STATS_ENABLED = env("SQL_STATS_ENABLED", default=False)
+SQL_STATS_DEFAULT_BUDGET = env("SQL_STATS_DEFAULT_BUDGET", int, default=50)
+SQL_STATS_DUPLICATE_THRESHOLD = env("SQL_STATS_DUPLICATE_THRESHOLD", int, default=5)
+# Budgets par route (`app:nom`) ou par tâche (nom de la tâche Celery)
+SQL_STATS_BUDGETS = {
+    "sv:evenement-details": 25,
+    "ssa:evenement-produit-details": 25,
+    "ssa:investigation-cas-humain-details": 25,
+    "tiac:evenement-simple-details": 25,
+    "tiac:investigation-tiac-details": 25,
+    "bloc-commun-messages": 15,
+    "bloc-commun-contacts": 15,
+    "bloc-commun-documents": 15,
+}
+if SQL_STATS_ENABLED:
+    MIDDLEWARE.insert(0, "seves.middlewares.QueryStatsMiddleware")
+
 if DEBUG and ENVIRONMENT != "test":
     INSTALLED_APPS.append("debug_toolbar")
     MIDDLEWARE.insert(0, "debug_toolbar.middleware.DebugToolbarMiddleware")
@@ -272,6 +300,7 @@ FILTERS_EMPTY_CHOICE_LABEL = "Choisir dans la liste"
 BYPASS_ANTIVIRUS = env("BYPASS_ANTIVIRUS", default=False)
 ANTIVIRUS_URL = env("ANTIVIRUS_URL", default=None)
 ANTIVIRUS_TOKEN = env("ANTIVIRUS_TOKEN", default=None)
+ANTIVIRUS_SCAN_WORKERS = env("ANTIVIRUS_SCAN_WORKERS", int, default=4)
 
 CELERY_TASK_ALWAYS_EAGER = env("CELERY_TASK_ALWAYS_EAGER", default=False)
 if not CELERY_TASK_ALWAYS_EAGER:
@@ -380,6 +409,8 @@ if ENVIRONMENT != "test":
 
 SIRENE_API_KEY = env("SIRENE_API_KEY", default="")
 SIRENE_API_BASE = env("SIRENE_API_base", default="https://api.insee.fr/api-sirene/3.11/")
+# Nombre d'appels par minute autorisés par l'INSEE, pour l'ensemble des processus
+SIRENE_RATE_LIMIT = env.int("SIRENE_RATE_LIMIT", default=30)
 COMMUNES_API = env("COMMUNES_API", default="https://geo.api.gouv.fr/communes")
 GEO_API_ROOT = env("GEO_API_ROOT", default="https://geo.api.gouv.fr")
 REVERSE_GEO_API = "https://data.geopf.fr/geocodage/reverse"
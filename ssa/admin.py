@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Etablissement, EvenementInvestigationCasHumain, EvenementProduit
+from .models import Etablissement, EvenementInvestigationCasHumain, EvenementProduit, NumeroAgrement
 
 
 class EvenementProduitAdmin(admin.ModelAdmin):
@@ -14,3 +14,9 @@ class EvenementInvestigationCasHumainAdmin(admin.ModelAdmin):
 admin.site.register(EvenementProduit, EvenementProduitAdmin)
 admin.site.register(EvenementInvestigationCasHumain, EvenementInvestigationCasHumainAdmin)
 admin.site.register(Etablissement)
+
+
+@admin.register(NumeroAgrement)
+class NumeroAgrementAdmin(admin.ModelAdmin):
+    list_display = ("numero_agrement", "siret", "liste")
+    search_fields = ("siret", "numero_agrement")
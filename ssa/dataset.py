@@ -0,0 +1,69 @@
+"""Évènements produit et investigations de cas humain du jeu de données de performance (voir `core.dataset`)."""
+
+from django.urls import reverse
+
+from core.benchmark import (
+    Scenario,
+    get_largest_object,
+    get_list_scenarios,
+    get_object_scenarios,
+    get_search_text,
+)
+from core.dataset import group_by
+
+from .factories import EtablissementFactory, EvenementProduitFactory, InvestigationCasHumainFactory
+from .filters import EvenementFilter
+from .models import EvenementInvestigationCasHumain, EvenementProduit
+
+
+def generate_evenements_produit(generator, count):
+    """Évènements produit avec leurs établissements (0 à 3)."""
+    batches = generator.create_batches(
+        EvenementProduitFactory,
+        count,
+        createur=generator.choice(generator.structures),
+        numero_evenement=generator.get_numero(EvenementProduit),
+        etat=generator.get_etat(),
+    )
+    for evenements in batches:
+        etablissements = generator.create_children(
+            EtablissementFactory, evenements, "evenement_produit", nb_min=0, **generator.get_etablissement_kwargs()
+        )
+        generator.finalize(evenements, group_by(etablissements, "evenement_produit_id"))
+        yield len(evenements)
+
+
+def generate_investigations_cas_humain(generator, count):
+    """Investigations de cas humain avec leurs établissements (0 à 3)."""
+    batches = generator.create_batches(
+        InvestigationCasHumainFactory,
+        count,
+        createur=generator.choice(generator.structures),
+        numero_evenement=generator.get_numero(EvenementInvestigationCasHumain),
+        etat=generator.get_etat(),
+    )
+    for investigations in batches:
+        etablissements = generator.create_children(
+            EtablissementFactory,
+            investigations,
+            "investigation_cas_humain",
+            nb_min=0,
+            evenement_produit=None,
+            **generator.get_etablissement_kwargs(),
+        )
+        generator.finalize(investigations, group_by(etablissements, "investigation_cas_humain_id"))
+        yield len(investigations)
+
+
+def get_benchmark_scenarios(user):
+    evenement = get_largest_object(EvenementProduit.objects.all(), user, "etablissements")
+    investigation = get_largest_object(EvenementInvestigationCasHumain.objects.all(), user, "etablissements")
+    search_text = get_search_text(evenement and evenement.description)
+    yield from get_list_scenarios("SSA", reverse("ssa:evenements-liste"), EvenementFilter, search_text)
+    yield Scenario("SSA - export CSV", reverse("ssa:export-csv"), "post")
+    export_url = evenement and reverse("ssa:export-evenement-produit-document", kwargs={"pk": evenement.pk})
+    yield from get_object_scenarios("SSA - évènement produit", evenement, export_url)
+    export_url = investigation and reverse(
+        "ssa:export-investigation-cas-humain-document", kwargs={"pk": investigation.pk}
+    )
+    yield from get_object_scenarios("SSA - investigation de cas humain", investigation, export_url)
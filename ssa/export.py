@@ -1,17 +1,12 @@
-import csv
-import tempfile
-
-from django.apps import apps
-from django.core.files import File
-from queryset_sequence import QuerySetSequence
-
 from core.export import BaseExport
-from core.models import Export
-from core.notifications import notify_export_is_ready
+
+from .models import EvenementProduit
 
 
 class SsaExport(BaseExport):
     blank_value = "-"
+    filename = "export_produit_et_cas.csv"
+    model = EvenementProduit
     evenement_fields = [
         ("numero", "Numéro de fiche"),
         ("get_readable_etat_for_csv", "État"),
@@ -80,47 +75,13 @@ class SsaExport(BaseExport):
             yield self.get_evenement_data_with_etablissement(instance, etablissement)
             continue
 
-    def get_queryset(self, task):
-        querysets = []
-        contact = task.user.agent.structure.contact_set.get()
-        for entry in task.queryset_sequence:
-            model = apps.get_model(entry["model"])
-            queryset = model.objects.filter(id__in=entry["ids"])
-            queryset = (
-                queryset.prefetch_related(
-                    "etablissements",
-                    "etablissements__departement",
-                )
-                .select_related("createur")
-                .with_fin_de_suivi(contact)
+    def get_queryset(self, model, ids, contact):
+        return (
+            model.objects.filter(id__in=ids)
+            .prefetch_related(
+                "etablissements",
+                "etablissements__departement",
             )
-            querysets.append(queryset)
-
-        return QuerySetSequence(*querysets)
-
-    def export(self, task_id):
-        task = Export.objects.select_related("user__agent__structure").get(id=task_id)
-        if task.task_done is True:
-            return
-
-        queryset = self.get_queryset(task)
-        with tempfile.NamedTemporaryFile(mode="w+", newline="", delete=False) as tmp:
-            writer = csv.DictWriter(
-                tmp,
-                fieldnames=self.get_fieldnames(),
-                quoting=csv.QUOTE_ALL,
-                doublequote=True,
-            )
-            writer.writeheader()
-
-            for instance in queryset:
-                for line in self.get_lines_from_instance(instance):
-                    writer.writerow(line)
-
-            tmp.flush()
-            with open(tmp.name, "rb") as read_file:
-                task.file.save("export_produit_et_cas.csv", File(read_file))
-
-            task.task_done = True
-            task.save()
-            notify_export_is_ready(task, object=queryset[0])
+            .select_related("createur")
+            .with_fin_de_suivi(contact)
+        )
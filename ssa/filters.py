@@ -9,6 +9,7 @@ from django_filters.filters import BaseInFilter, CharFilter, MultipleChoiceFilte
 from dsfr.forms import DsfrBaseForm
 from queryset_sequence import QuerySetSequence
 
+from core.choice_trees import register_choice_tree
 from core.filters_mixins import (
     WithAgentContactFilterMixin,
     WithDatePublicationFilterMixin,
@@ -22,6 +23,9 @@ from core.widgets import TreeselectCheckbox
 from ssa.constants import CategorieDanger, CategorieProduit, Source, SourceInvestigationCasHumain, TypeEvenement
 from ssa.models import EvenementProduit
 
+CATEGORIE_PRODUIT_TREE = register_choice_tree("ssa.categorie_produit", lambda: CategorieProduit.treeselect_groups)
+CATEGORIE_DANGER_TREE = register_choice_tree("ssa.categorie_danger", lambda: CategorieDanger.treeselect_groups)
+
 
 class StrInFilter(BaseInFilter, CharFilter):
     pass
@@ -117,13 +121,13 @@ class EvenementFilter(
     categorie_produit = MultipleChoiceFilter(
         field_name="categorie_produit",
         choices=CategorieProduit,
-        widget=TreeselectCheckbox(choices=CategorieProduit.treeselect_groups),
+        widget=TreeselectCheckbox(choice_tree=CATEGORIE_PRODUIT_TREE),
         label="Catégorie de produit",
     )
     categorie_danger = MultipleChoiceFilter(
         field_name="categorie_danger",
         choices=CategorieDanger,
-        widget=TreeselectCheckbox(choices=CategorieDanger.treeselect_groups),
+        widget=TreeselectCheckbox(choice_tree=CATEGORIE_DANGER_TREE),
         label="Catégorie de danger",
     )
     reference_souches = django_filters.CharFilter(lookup_expr="icontains")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from ssa.numeros_agrement import LISTES_URLS, import_numeros_agrement
+
+
+class Command(BaseCommand):
+    help = "Met à jour le référentiel des numéros d'agrément à partir des listes officielles de la DGAL"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "sources",
+            nargs="*",
+            default=LISTES_URLS,
+            help="URLs ou chemins des listes à importer (par défaut, les listes officielles publiées en ligne)",
+        )
+
+    def handle(self, *args, **options):
+        results = import_numeros_agrement(options["sources"])
+        for liste, (nb_created, nb_deleted) in results.items():
+            self.stdout.write(f"{liste} : {nb_created} numéro(s) ajouté(s), {nb_deleted} supprimé(s)")
+        if len(results) < len(options["sources"]):
+            self.stderr.write(f"{len(options['sources']) - len(results)} liste(s) n'ont pas pu être lues")
@@ -1,18 +1,10 @@
-import abc
-from typing import Iterable
-
 from django.db import models
 from django.db.models import Q
 
-from core.managers import EvenementManagerMixin
-
+from core.managers import EvenementManagerMixin, SearchVectorQuerysetMixin
 
-class EvenementBaseQueryset(EvenementManagerMixin, models.QuerySet, abc.ABC):
-    @property
-    @abc.abstractmethod
-    def search_fields(self) -> Iterable[str]:
-        pass
 
+class EvenementBaseQueryset(SearchVectorQuerysetMixin, EvenementManagerMixin, models.QuerySet):
     def order_by_numero(self):
         return self.order_by("-numero_annee", "-numero_evenement")
 
@@ -21,28 +13,8 @@ class EvenementBaseQueryset(EvenementManagerMixin, models.QuerySet, abc.ABC):
 
         return self.filter(Q(createur=user.agent.structure) | ~Q(etat=WithEtatMixin.Etat.BROUILLON))
 
-    def search(self, query):
-        query_object = Q()
-        for f in self.search_fields:
-            query_object |= Q(**{f"{f}__unaccent__icontains": query})
-        return self.filter(query_object).distinct()
-
 
 class EvenementProduitQueryset(EvenementBaseQueryset):
-    @property
-    def search_fields(self) -> Iterable[str]:
-        return (
-            "description",
-            "denomination",
-            "marque",
-            "etablissements__raison_sociale",
-            "etablissements__enseigne_usuelle",
-            "evaluation",
-            "lots",
-            "description_complementaire",
-            "precision_danger",
-        )
-
     def optimized_for_list(self):
         return self.only(
             "id",
@@ -72,16 +44,6 @@ class EvenementProduitManager(models.Manager):
 
 
 class InvestigationCasHumainQueryset(EvenementBaseQueryset):
-    @property
-    def search_fields(self) -> Iterable[str]:
-        return (
-            "description",
-            "precision_danger",
-            "evaluation",
-            "etablissements__raison_sociale",
-            "etablissements__enseigne_usuelle",
-        )
-
     def optimized_for_list(self):
         return self.only(
             "id",
@@ -0,0 +1,70 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models import StringAgg, Value
+
+SEARCH_CONFIG = "french_unaccent"
+
+SEARCH_VECTOR_FIELDS = {
+    "EvenementProduit": [
+        "description",
+        "denomination",
+        "marque",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+        "evaluation",
+        "lots",
+        "description_complementaire",
+        "precision_danger",
+    ],
+    "EvenementInvestigationCasHumain": [
+        "description",
+        "precision_danger",
+        "evaluation",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+    ],
+}
+
+
+def update_search_vectors(apps, schema_editor):
+    for model_name, fields in SEARCH_VECTOR_FIELDS.items():
+        model = apps.get_model("ssa", model_name)
+        aggregates = {
+            f"field_{i}": StringAgg(field, delimiter=Value("\n"), distinct=True) for i, field in enumerate(fields)
+        }
+        for row in model.objects.values("pk").annotate(**aggregates).iterator():
+            text = "\n".join(row[f"field_{i}"] or "" for i in range(len(fields)))
+            model.objects.filter(pk=row["pk"]).update(
+                search_vector=django.contrib.postgres.search.SearchVector(Value(text), config=SEARCH_CONFIG)
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ssa", "0069_auto_20260723_1713"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evenementinvestigationcashumain",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="evenementproduit",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="evenementinvestigationcashumain",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="ssa_ich_search_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="evenementproduit",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="ssa_produit_search_idx"),
+        ),
+        migrations.RunPython(update_search_vectors, migrations.RunPython.noop),
+    ]
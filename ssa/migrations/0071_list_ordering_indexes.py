@@ -0,0 +1,21 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0067_message_search_text"),
+        ("ssa", "0070_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="evenementinvestigationcashumain",
+            index=models.Index(fields=["numero_annee", "numero_evenement", "id"], name="ssa_ich_numero_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="evenementproduit",
+            index=models.Index(fields=["numero_annee", "numero_evenement", "id"], name="ssa_produit_numero_idx"),
+        ),
+    ]
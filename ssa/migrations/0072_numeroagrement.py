@@ -0,0 +1,28 @@
+# Generated by Django 6.0.7 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ssa", "0071_list_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NumeroAgrement",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("liste", models.CharField(max_length=100, verbose_name="Liste officielle")),
+                ("siret", models.CharField(db_index=True, max_length=14, verbose_name="SIRET")),
+                ("numero_agrement", models.CharField(max_length=100, verbose_name="Numéro d'agrément")),
+            ],
+            options={
+                "verbose_name": "Numéro d'agrément",
+                "verbose_name_plural": "Numéros d'agrément",
+                "constraints": [
+                    models.UniqueConstraint(fields=("liste", "siret", "numero_agrement"), name="unique_numero_agrement")
+                ],
+            },
+        ),
+    ]
@@ -6,6 +6,7 @@ from .evenement_produit import (
     TemperatureConservation,
 )
 from .investigation_cas_humain import EvenementInvestigationCasHumain
+from .numero_agrement import NumeroAgrement
 
 __all__ = (
     "EvenementProduit",
@@ -15,4 +16,5 @@ __all__ = (
     "Etablissement",
     "PositionDossier",
     "EvenementInvestigationCasHumain",
+    "NumeroAgrement",
 )
@@ -1,5 +1,6 @@
 from dirtyfields import DirtyFieldsMixin
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models, transaction
 from django.template.defaultfilters import linebreaksbr
 from django.urls import reverse
@@ -17,6 +18,7 @@ from core.model_mixins import (
     WithContactPermissionMixin,
     WithFicheDocumentPermissionMixin,
     WithLastUpdatedDatetime,
+    WithSearchVectorMixin,
     update_last_updated_on_revision,
 )
 from core.models import LienLibre
@@ -147,8 +149,21 @@ class EvenementProduit(
     EmailableObjectMixin,
     DirtyFieldsMixin,
     WithLastUpdatedDatetime,
+    WithSearchVectorMixin,
     models.Model,
 ):
+    search_vector_fields = (
+        "description",
+        "denomination",
+        "marque",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+        "evaluation",
+        "lots",
+        "description_complementaire",
+        "precision_danger",
+    )
+
     # WithEvenementInformationMixin
     type_evenement = models.CharField(max_length=100, choices=TypeEvenement.choices, verbose_name="Type d'événement")
     aliments_animaux = models.BooleanField(null=True, verbose_name="Inclut des aliments pour animaux")
@@ -334,6 +349,10 @@ class EvenementProduit(
         return [("_prefetched_etablissements", Etablissement.objects.filter(evenement_produit=self))]
 
     class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="ssa_produit_search_idx"),
+            models.Index(fields=["numero_annee", "numero_evenement", "id"], name="ssa_produit_numero_idx"),
+        ]
         constraints = [
             models.CheckConstraint(
                 condition=(
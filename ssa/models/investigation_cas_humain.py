@@ -1,4 +1,5 @@
 from dirtyfields import DirtyFieldsMixin
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models, transaction
 from django.urls import reverse
 import reversion
@@ -14,6 +15,7 @@ from core.model_mixins import (
     WithContactPermissionMixin,
     WithFicheDocumentPermissionMixin,
     WithLastUpdatedDatetime,
+    WithSearchVectorMixin,
     update_last_updated_on_revision,
 )
 from core.models import LienLibre
@@ -47,8 +49,17 @@ class EvenementInvestigationCasHumain(
     WithMessageUrlsMixin,
     DirtyFieldsMixin,
     WithLastUpdatedDatetime,
+    WithSearchVectorMixin,
     models.Model,
 ):
+    search_vector_fields = (
+        "description",
+        "precision_danger",
+        "evaluation",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+    )
+
     source = models.CharField(
         max_length=100, choices=SourceInvestigationCasHumain.choices, verbose_name="Source", blank=True
     )
@@ -57,6 +68,12 @@ class EvenementInvestigationCasHumain(
 
     objects = InvestigationCasHumainManager()
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="ssa_ich_search_idx"),
+            models.Index(fields=["numero_annee", "numero_evenement", "id"], name="ssa_ich_numero_idx"),
+        ]
+
     @property
     def numero(self):
         return f"A-{self.numero_annee}.{self.numero_evenement}"
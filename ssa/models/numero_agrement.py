@@ -0,0 +1,21 @@
+from django.db import models
+
+
+class NumeroAgrement(models.Model):
+    """Numéro d'agrément sanitaire d'un établissement, issu des listes officielles publiées par la DGAL.
+
+    Table de référence remplie par la commande `import_numeros_agrement`."""
+
+    liste = models.CharField(max_length=100, verbose_name="Liste officielle")
+    siret = models.CharField(max_length=14, db_index=True, verbose_name="SIRET")
+    numero_agrement = models.CharField(max_length=100, verbose_name="Numéro d'agrément")
+
+    class Meta:
+        verbose_name = "Numéro d'agrément"
+        verbose_name_plural = "Numéros d'agrément"
+        constraints = [
+            models.UniqueConstraint(fields=["liste", "siret", "numero_agrement"], name="unique_numero_agrement"),
+        ]
+
+    def __str__(self):
+        return f"{self.numero_agrement} ({self.siret})"
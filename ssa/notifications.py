@@ -1,10 +1,11 @@
+from core.authorization import get_principal
 from core.models import Contact
 from core.notifications import send_as_seves
 from ssa.models import EvenementProduit
 
 
 def notify_type_evenement_fna(evenement: EvenementProduit, user):
-    recipients = [Contact.objects.get_mus(), user.agent.contact_set.get()]
+    recipients = [Contact.objects.get_mus(), get_principal(user).agent_contact]
     send_as_seves(
         recipients=recipients,
         object=evenement,
@@ -26,7 +27,7 @@ def notify_type_evenement_fna(evenement: EvenementProduit, user):
 
 def notify_souches_clusters(evenement: EvenementProduit, user):
     send_as_seves(
-        recipients=evenement.contacts.agents_only().exclude(id=user.agent.contact_set.get().id),
+        recipients=evenement.contacts.agents_only().exclude(id=get_principal(user).agent_contact.id),
         object=evenement,
         subject=f"{evenement.get_short_email_display_name()} - Souche / cluster",
         message=f"""
@@ -0,0 +1,129 @@
+"""Référentiel des numéros d'agrément sanitaire, chargé depuis les listes officielles de la DGAL."""
+
+import csv
+from io import StringIO
+import logging
+import os
+from pathlib import Path
+
+from django.db import transaction
+import requests
+
+from core.cache import get_model_tag, get_or_set, invalidate_tags_on_commit
+from ssa.models import NumeroAgrement
+
+logger = logging.getLogger(__name__)
+
+LISTES_URLS = [
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_ACTIV_GEN.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_VIAN_ONG_DOM.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_VIAN_COL_LAGO.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_VIAN_GIB_ELEV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_VIAN_GIB_SAUV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_VIAND_HACHE_VSM.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4_AGSANPROBASEVDE_PRV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4B_AS_CE_PRODCOQUI_COV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4B_AS_CE_PRODPECHE_COV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_LAIT.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_OEUF.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA1_GREN_ESCARG.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4_AGSANGREXPR_PRV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4_AGR_ESVEBO_PRV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4_AGSANGELAT_PRV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4_AGSANCOLL_PRV.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA_PROD_RAFF.txt",
+    "https://fichiers-publics.agriculture.gouv.fr/dgal/ListesOfficielles/SSA4_ASCCC_PRV.txt",
+]
+
+
+def get_liste_name(source):
+    return os.path.basename(source)
+
+
+def read_liste(source) -> str:
+    """Contenu d'une liste, `source` étant une URL ou un chemin de fichier local."""
+    if source.startswith(("http://", "https://")):
+        response = requests.get(source, timeout=30)
+        response.raise_for_status()
+        return response.text
+    return Path(source).read_text(encoding="utf-8", errors="replace")
+
+
+def parse_liste(content):
+    """Couples (SIRET, numéro d'agrément) d'une liste : 2e et 3e colonnes, après la ligne d'en-tête."""
+    rows = csv.reader(StringIO(content))
+    next(rows, None)
+    for row in rows:
+        if len(row) >= 3 and (siret := row[2].replace(" ", "")) and (numero_agrement := row[1].strip()):
+            yield siret, numero_agrement
+
+
+def import_numeros_agrement(sources=LISTES_URLS) -> dict[str, tuple[int, int]]:
+    """Met à jour le référentiel à partir des listes, en n'écrivant que les différences.
+
+    Une liste qui n'a pas pu être lue garde ses numéros actuels. Renvoie, par liste importée, le nombre de numéros
+    ajoutés et supprimés."""
+    results = {}
+    for source in sources:
+        liste = get_liste_name(source)
+        try:
+            wanted = set(parse_liste(read_liste(source)))
+        except (OSError, requests.RequestException) as e:
+            logger.error(f"Cannot read {source}: {e}")
+            continue
+
+        with transaction.atomic():
+            existing = {
+                (siret, numero_agrement): pk
+                for pk, siret, numero_agrement in NumeroAgrement.objects.filter(liste=liste).values_list(
+                    "pk", "siret", "numero_agrement"
+                )
+            }
+            to_create = wanted - existing.keys()
+            to_delete = [pk for key, pk in existing.items() if key not in wanted]
+            NumeroAgrement.objects.filter(pk__in=to_delete).delete()
+            NumeroAgrement.objects.bulk_create(
+                (NumeroAgrement(liste=liste, siret=siret, numero_agrement=numero) for siret, numero in to_create),
+                batch_size=1000,
+            )
+            if to_create or to_delete:
+                invalidate_tags_on_commit(get_model_tag(NumeroAgrement))
+        results[liste] = (len(to_create), len(to_delete))
+    return results
+
+
+def _get_liste_rank(numero_agrement):
+    listes = [get_liste_name(url) for url in LISTES_URLS]
+    return listes.index(numero_agrement.liste) if numero_agrement.liste in listes else len(listes)
+
+
+def _find_in_listes(siret):
+    """Recherche directement dans les listes en ligne, tant que le référentiel n'a pas été importé."""
+    for url in LISTES_URLS:
+        try:
+            content = read_liste(url)
+        except (OSError, requests.RequestException) as e:
+            logger.error(f"Cannot read {url}: {e}")
+            continue
+        for liste_siret, numero_agrement in parse_liste(content):
+            if liste_siret == siret:
+                return numero_agrement
+    return None
+
+
+def find_numero_agrement(siret) -> str | None:
+    """Numéro d'agrément d'un SIRET, pris dans la première des listes officielles qui le contient."""
+    siret = siret.replace(" ", "")
+    if not siret.isdigit():
+        return None
+
+    def compute():
+        numeros_agrement = sorted(NumeroAgrement.objects.filter(siret=siret).order_by("pk"), key=_get_liste_rank)
+        if numeros_agrement:
+            return numeros_agrement[0].numero_agrement
+        if NumeroAgrement.objects.exists():
+            return None
+        logger.warning("NumeroAgrement is empty, run import_numeros_agrement")
+        return _find_in_listes(siret)
+
+    return get_or_set(f"numero_agrement:{siret}", compute, [get_model_tag(NumeroAgrement)])
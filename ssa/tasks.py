@@ -5,9 +5,10 @@ from ssa.maestro import send_maestro_webhook
 from ssa.models import EvenementProduit
 
 
-@shared_task
+@shared_task(acks_late=True, reject_on_worker_lost=True)
 def export_task(task_id):
-    SsaExport().export(task_id)
+    if not SsaExport().export_next_chunk(task_id):
+        export_task.delay(task_id)
 
 
 @shared_task()
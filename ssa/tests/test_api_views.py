@@ -1,39 +1,64 @@
 from unittest.mock import patch
 
+from django.core.management import call_command
 from django.urls import reverse
 
+from ssa.models import NumeroAgrement
 
-@patch("ssa.views.api.requests.get")
-@patch("ssa.views.api.csv.reader")
-def test_api_view_siret_found(mock_csv_reader, mock_requests_get, client):
-    mock_requests_get.return_value.text = "mocked content"
-    mock_csv_reader.return_value = iter(
-        [
-            ["Numero de département", "Numéro agrément/Approval number", "SIRET", "Other columns"],
-            ["1", "03.223.432", "12345", "Other data"],
-        ]
-    )
+LISTE_HEADER = "Numero de département,Numéro agrément/Approval number,SIRET,Other columns\n"
+
+
+def test_api_view_siret_found(client):
+    NumeroAgrement.objects.create(liste="SSA1_LAIT.txt", siret="12345", numero_agrement="03.223.432")
 
     response = client.get(reverse("ssa:find-numero-agrement") + "?siret=12345")
 
     assert response.status_code == 200
     assert response.json() == {"numero_agrement": "03.223.432"}
-    assert mock_requests_get.call_count == 1
 
 
-@patch("ssa.views.api.requests.get")
-@patch("ssa.views.api.csv.reader")
-def test_api_view_siret_not_found(mock_csv_reader, mock_requests_get, client):
-    mock_requests_get.return_value.text = "mocked content"
-    mock_csv_reader.return_value = iter(
-        [
-            ["Numero de département", "Numéro agrément/Approval number", "SIRET", "Other columns"],
-            ["1", "03.223.432", "12345", "Other data"],
-        ]
-    )
+def test_api_view_siret_not_found(client):
+    NumeroAgrement.objects.create(liste="SSA1_LAIT.txt", siret="12345", numero_agrement="03.223.432")
 
     response = client.get(reverse("ssa:find-numero-agrement") + "?siret=5555555")
 
     assert response.status_code == 404
     assert response.json() == {"error": "SIRET non trouvé"}
-    assert mock_requests_get.call_count == 18
+
+
+def test_api_view_siret_uses_first_official_list(client):
+    NumeroAgrement.objects.create(liste="SSA1_OEUF.txt", siret="12345", numero_agrement="03.223.999")
+    NumeroAgrement.objects.create(liste="SSA1_ACTIV_GEN.txt", siret="12345", numero_agrement="03.223.432")
+
+    response = client.get(reverse("ssa:find-numero-agrement") + "?siret=12345")
+
+    assert response.json() == {"numero_agrement": "03.223.432"}
+
+
+def test_import_numeros_agrement_only_writes_differences(tmp_path, client):
+    liste = tmp_path / "SSA1_LAIT.txt"
+    liste.write_text(LISTE_HEADER + "1,03.223.432,12345,Other data\n2,04.111.222,67890,Other data\n")
+    call_command("import_numeros_agrement", str(liste))
+    kept = NumeroAgrement.objects.get(siret="12345")
+
+    liste.write_text(LISTE_HEADER + "1,03.223.432,12345,Other data\n3,05.333.444,11111,Other data\n")
+    call_command("import_numeros_agrement", str(liste), str(tmp_path / "absente.txt"))
+
+    assert set(NumeroAgrement.objects.values_list("liste", "siret", "numero_agrement")) == {
+        ("SSA1_LAIT.txt", "12345", "03.223.432"),
+        ("SSA1_LAIT.txt", "11111", "05.333.444"),
+    }
+    assert NumeroAgrement.objects.get(siret="12345").pk == kept.pk
+    response = client.get(reverse("ssa:find-numero-agrement") + "?siret=11111")
+    assert response.json() == {"numero_agrement": "05.333.444"}
+
+
+@patch("ssa.numeros_agrement.requests.get")
+def test_api_view_reads_official_lists_until_first_import(mock_requests_get, client):
+    mock_requests_get.return_value.text = LISTE_HEADER + "1,03.223.432,12345,Other data\n"
+
+    response = client.get(reverse("ssa:find-numero-agrement") + "?siret=12345")
+
+    assert response.status_code == 200
+    assert response.json() == {"numero_agrement": "03.223.432"}
+    assert mock_requests_get.call_count == 1
@@ -1,12 +1,16 @@
+from unittest import mock
+
 from django.contrib.contenttypes.models import ContentType
 from django.urls import reverse
 from playwright.sync_api import expect
 import pytest
 import reversion
 
+from core.diffs import get_queryset_with_related_objects
 from core.factories import DepartementFactory, MessageFactory
 from core.models import LienLibre
 from core.pages import WithDocumentsPage
+from core.views import RevisionsListView
 from ssa.factories import EtablissementFactory, EvenementProduitFactory
 from ssa.models import EvenementProduit
 from ssa.tests.pages import EvenementProduitFormPage
@@ -138,3 +142,41 @@ def test_can_evenement_produit_history_performances_with_messages(client, django
     with django_assert_max_num_queries(base_queries + 18):
         response = client.get(url)
         assert len(response.context["patches"]) == 3
+
+
+@pytest.mark.django_db
+def test_evenement_produit_history_is_cached_until_a_related_version_is_created(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    evenement = EvenementProduitFactory()
+    evenement.description = "I changed"
+    evenement.save()
+
+    content_type = ContentType.objects.get_for_model(EvenementProduit)
+    url = reverse("revision-list", kwargs={"content_type": content_type.pk, "pk": evenement.pk})
+    response = client.get(url)
+    assert len(response.context["patches"]) == 2
+
+    with mock.patch.object(RevisionsListView, "get_patches") as get_patches:
+        response = client.get(url)
+    get_patches.assert_not_called()
+    assert len(response.context["patches"]) == 2
+
+    EtablissementFactory(evenement_produit=evenement)
+    with mock.patch.object(RevisionsListView, "get_patches", return_value=[]) as get_patches:
+        client.get(url)
+    get_patches.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_evenement_produit_history_does_not_keep_related_versions_in_memory(client):
+    evenement = EvenementProduitFactory()
+    with reversion.create_revision():
+        EtablissementFactory(evenement_produit=evenement)
+        evenement.save()
+
+    content_type = ContentType.objects.get_for_model(EvenementProduit)
+    url = reverse("revision-list", kwargs={"content_type": content_type.pk, "pk": evenement.pk})
+    response = client.get(url)
+
+    assert len(response.context["patches"]) == 2
+    assert get_queryset_with_related_objects.cache_info().currsize == 0
@@ -1,6 +1,8 @@
 import csv
 from io import StringIO
+from unittest import mock
 
+from django.urls import reverse
 from playwright.sync_api import Page, expect
 import pytest
 
@@ -10,7 +12,7 @@ from ssa.export import SsaExport
 from ssa.factories import EtablissementFactory, EvenementProduitFactory, InvestigationCasHumainFactory
 from ssa.tests.pages import EvenementProduitListPage
 
-NB_QUERIES = 16
+NB_QUERIES = 12
 
 
 @pytest.mark.django_db
@@ -94,7 +96,7 @@ def test_export_evenement_produit_performances_scales_on_number_of_objects(djang
     ContactStructureFactory(structure=contact.agent.structure)
     task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
 
-    with django_assert_num_queries(NB_QUERIES - 1):
+    with django_assert_num_queries(NB_QUERIES):
         SsaExport().export(task.id)
 
     task.refresh_from_db()
@@ -106,7 +108,7 @@ def test_export_evenement_produit_performances_scales_on_number_of_objects(djang
     ContactStructureFactory(structure=contact.agent.structure)
     task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
 
-    with django_assert_num_queries(NB_QUERIES + 1):
+    with django_assert_num_queries(NB_QUERIES + 2):
         SsaExport().export(task.id)
 
     task.refresh_from_db()
@@ -188,6 +190,105 @@ def test_export_evenement_produit_content_etablissement(mailoutbox):
     assert len(lines) == 4
 
 
+@pytest.mark.django_db
+def test_export_evenement_produit_can_resume_from_last_chunk(mailoutbox):
+    evenements = EvenementProduitFactory.create_batch(3)
+    data = [{"model": "ssa.evenementproduit", "ids": [evenement.pk for evenement in evenements]}]
+    contact = ContactAgentFactory()
+    ContactStructureFactory(structure=contact.agent.structure)
+    task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
+
+    export = SsaExport()
+    export.chunk_size = 2
+    assert export.export_next_chunk(task.id) is False
+
+    task.refresh_from_db()
+    assert task.task_done is False
+    assert task.cursor == 2
+    assert task.nb_lines == 2
+    assert task.progress == 66
+    assert len(task.parts) == 1
+    assert len(mailoutbox) == 0
+
+    # Simulates a worker restart: a new export picks up from the saved cursor
+    export = SsaExport()
+    export.chunk_size = 2
+    export.export(task.id)
+
+    task.refresh_from_db()
+    assert task.task_done is True
+    assert task.cursor == 3
+    assert task.progress == 100
+    lines = task.file.read().decode("utf-8").split("\n")
+    assert len(lines) == 5
+    assert sorted(next(csv.reader(StringIO(line)))[0] for line in lines[1:4]) == sorted(e.numero for e in evenements)
+    assert not task.file.storage.exists(task.parts[0])
+    assert len(mailoutbox) == 1
+
+
+@pytest.mark.django_db
+def test_empty_export_notifies_the_user(mailoutbox):
+    contact = ContactAgentFactory()
+    ContactStructureFactory(structure=contact.agent.structure)
+    task = Export.objects.create(user=contact.agent.user, queryset_sequence=[])
+
+    SsaExport().export(task.id)
+
+    task.refresh_from_db()
+    assert task.task_done is True
+    assert task.file.read().decode("utf-8").count("\n") == 1
+    assert len(mailoutbox) == 1
+
+
+@pytest.mark.django_db
+def test_export_parts_are_deleted_when_export_fails(mailoutbox):
+    evenements = EvenementProduitFactory.create_batch(3)
+    data = [{"model": "ssa.evenementproduit", "ids": [evenement.pk for evenement in evenements]}]
+    contact = ContactAgentFactory()
+    ContactStructureFactory(structure=contact.agent.structure)
+    task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
+    export = SsaExport()
+    export.chunk_size = 2
+    export.export_next_chunk(task.id)
+    task.refresh_from_db()
+    part = task.parts[0]
+
+    export.export_next_chunk(task.id)
+
+    with mock.patch.object(SsaExport, "finalize", side_effect=OSError), pytest.raises(OSError):
+        export.export_next_chunk(task.id)
+
+    task.refresh_from_db()
+    assert task.task_failed is True
+    assert task.task_done is False
+    assert task.cursor == 0
+    assert task.nb_lines == 0
+    assert task.parts == []
+    assert not task.file.storage.exists(part)
+    assert len(mailoutbox) == 1
+    assert "Votre export a échoué" in mailoutbox[0].subject
+
+    assert export.export_next_chunk(task.id) is True
+    task.refresh_from_db()
+    assert task.cursor == 0
+    assert len(mailoutbox) == 1
+
+
+@pytest.mark.django_db
+def test_export_progress_view(client, mocked_authentification_user):
+    evenements = EvenementProduitFactory.create_batch(4)
+    data = [{"model": "ssa.evenementproduit", "ids": [evenement.pk for evenement in evenements]}]
+    task = Export.objects.create(user=mocked_authentification_user, queryset_sequence=data, cursor=1, nb_lines=1)
+
+    response = client.get(reverse("export-progress", kwargs={"pk": task.pk}))
+
+    assert response.json() == {"progress": 25, "nb_lines": 1, "done": False, "failed": False}
+
+    other_task = Export.objects.create(user=ContactAgentFactory().agent.user, queryset_sequence=data)
+    response = client.get(reverse("export-progress", kwargs={"pk": other_task.pk}))
+    assert response.status_code == 404
+
+
 def test_export_evenements_from_ui(live_server, mocked_authentification_user, page: Page, settings, mailoutbox):
     settings.CELERY_TASK_ALWAYS_EAGER = True
     EvenementProduitFactory(numero_annee=2025, numero_evenement=2)
@@ -5,7 +5,8 @@ import pytest
 from core.factories import DocumentFactory
 from core.models import Document
 from ssa.constants import CategorieDanger, PretAManger
-from ssa.factories import EvenementProduitFactory
+from ssa.factories import EtablissementFactory, EvenementProduitFactory
+from ssa.models import EvenementProduit
 
 
 @pytest.mark.django_db
@@ -58,3 +59,17 @@ def test_cant_create_document_with_invalid_document_type():
     DocumentFactory(
         content_object=EvenementProduitFactory(), document_type=Document.TypeDocument.CERTIFICAT_PHYTOSANITAIRE
     )
+
+
+@pytest.mark.django_db
+def test_evenement_produit_search_vector_is_updated_with_etablissements():
+    evenement = EvenementProduitFactory(description="Fromage à pâte pressée")
+    etablissement = EtablissementFactory(evenement_produit=evenement, raison_sociale="Fromagerie Comté")
+
+    assert list(EvenementProduit.objects.all().search("pate fromag")) == [evenement]
+    assert list(EvenementProduit.objects.all().search("comte")) == [evenement]
+
+    etablissement.raison_sociale = "Laiterie"
+    etablissement.save()
+    assert list(EvenementProduit.objects.all().search("comte")) == []
+    assert list(EvenementProduit.objects.all().search("laiterie")) == [evenement]
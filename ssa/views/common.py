@@ -5,6 +5,7 @@ from django.views import View
 from django.views.generic import ListView
 
 from core.mixins import MediaDefiningMixin, WithExportHeterogeneousQuerysetMixin
+from core.pagination import get_cached_count
 from ssa.display import EvenementDisplay
 from ssa.models import EvenementProduit
 from ssa.tasks import export_task
@@ -25,6 +26,7 @@ class EvenementsListView(MediaDefiningMixin, WithFilteredListMixin, ListView):
     template_name = "ssa/evenements_list.html"
     model = EvenementProduit
     paginate_by = 100
+    keyset_pagination = True
 
     def get_media(self, **context_data) -> Media:
         return super().get_media(**context_data) + self.filter.form.media
@@ -32,7 +34,7 @@ class EvenementsListView(MediaDefiningMixin, WithFilteredListMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["filter"] = self.filter
-        context["total_object_count"] = self.get_raw_queryset().count()
+        context["total_object_count"] = get_cached_count(self.get_raw_queryset())
         context["voluminous_extract_threshold"] = settings.VOLUMINOUS_EXTRACT_THRESHOLD
         context["object_list"] = [EvenementDisplay.from_evenement(evenement) for evenement in context["object_list"]]
 
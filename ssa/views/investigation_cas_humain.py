@@ -1,34 +1,25 @@
-import datetime
 from functools import cached_property
-import io
-import os
 
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.contenttypes.models import ContentType
 from django.forms import Media
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.views.generic import CreateView, DetailView, UpdateView
 from django.views.generic.detail import BaseDetailView
-from docxtpl import DocxTemplate
 from reversion.models import Version
 
 from core.audit import audit_log
 from core.mixins import (
     MediaDefiningMixin,
     WithAddUserContactsMixin,
-    WithBlocCommunPermission,
+    WithBlocCommunTabsMixin,
     WithClotureContextMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
     WithDocumentExportContextMixin,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
     WithFinDeSuiviMixin,
     WithFormErrorsAsMessagesMixin,
     WithFormsetInvalidMixin,
     WithFreeLinksListInContextMixin,
-    WithMessageMixin,
 )
 
 from ..forms import InvestigationCasHumainForm
@@ -134,12 +125,7 @@ class InvestigationCasHumainDetailView(
     UserPassesTestMixin,
     WithFreeLinksListInContextMixin,
     WithClotureContextMixin,
-    WithBlocCommunPermission,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
-    WithMessageMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
+    WithBlocCommunTabsMixin,
     WithFinDeSuiviMixin,
     DetailView,
 ):
@@ -171,8 +157,6 @@ class InvestigationCasHumainDetailView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        contact = self.request.user.agent.structure.contact_set.get()
-        context["etat"] = self.get_object().get_etat_data_for_contact(contact)
         context["can_be_deleted"] = self.get_object().can_be_deleted(self.request.user)
         context["can_publish"] = self.get_object().can_publish(self.request.user)
         context["can_be_modified"] = self.get_object().can_be_modified(self.request.user)
@@ -184,6 +168,8 @@ class InvestigationCasHumainDetailView(
 class InvestigationCasHumainDocumentExportView(WithDocumentExportContextMixin, UserPassesTestMixin, BaseDetailView):
     http_method_names = ["post"]
     model = EvenementInvestigationCasHumain
+    document_template_name = "ssa/doc_templates/investigation_cas_humain.docx"
+    document_filename_prefix = "investigtion_cas_humain"
 
     @cached_property
     def object(self):
@@ -192,27 +178,5 @@ class InvestigationCasHumainDocumentExportView(WithDocumentExportContextMixin, U
     def test_func(self):
         return self.object.can_user_access(self.request.user)
 
-    def post(self, request, *args, **kwargs):
-        doc = DocxTemplate("ssa/doc_templates/investigation_cas_humain.docx")
-        sub_doc_file = self.create_document_bloc_commun()
-        sub_doc = doc.new_subdoc(sub_doc_file)
-
-        context = self.get_context_data(
-            object=self.object,
-            free_links=self.get_free_links_numbers(),
-            bloc_commun=sub_doc,
-            now=datetime.datetime.now(),
-        )
-        doc.render(context)
-
-        file_stream = io.BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-
-        response = HttpResponse(
-            file_stream.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-        response["Content-Disposition"] = f"attachment; filename=investigtion_cas_humain_{self.object.numero}.docx"
-        os.remove(sub_doc_file)
-        return response
+    def get_document_context(self, doc):
+        return self.get_context_data(**super().get_document_context(doc))
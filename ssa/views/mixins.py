@@ -1,5 +1,5 @@
-from queryset_sequence import QuerySetSequence
-
+from core.authorization import get_principal
+from core.managers import UnionQuerySetSequence
 from core.mixins import WithOrderingMixin
 from ssa.filters import EvenementFilter
 from ssa.models import EvenementInvestigationCasHumain, EvenementProduit
@@ -21,7 +21,7 @@ class WithFilteredListMixin(WithOrderingMixin):
 
     def get_raw_queryset(self):
         user = self.request.user
-        contact = user.agent.structure.contact_set.get()
+        contact = get_principal(user).structure_contact
 
         evenement_produit_qs = (
             EvenementProduitReadOnly.objects.select_related("createur")
@@ -37,7 +37,7 @@ class WithFilteredListMixin(WithOrderingMixin):
             .optimized_for_list()
         )
 
-        return QuerySetSequence(evenement_produit_qs, ich_qs, model=EvenementProduit)
+        return UnionQuerySetSequence(evenement_produit_qs, ich_qs, model=EvenementProduit)
 
     def get_queryset(self):
         queryset = self.apply_ordering(self.get_raw_queryset())
@@ -1,34 +1,24 @@
-import datetime
-import io
-import os
-
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
 from django.forms import Media
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.views import View
 from django.views.generic import CreateView, DetailView, UpdateView
-from docxtpl import DocxTemplate
 from reversion.models import Version
 
 from core.audit import audit_log
 from core.mixins import (
     MediaDefiningMixin,
     WithAddUserContactsMixin,
-    WithBlocCommunPermission,
+    WithBlocCommunTabsMixin,
     WithClotureContextMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
     WithDocumentExportContextMixin,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
     WithFinDeSuiviMixin,
     WithFormErrorsAsMessagesMixin,
     WithFormsetInvalidMixin,
     WithFreeLinksListInContextMixin,
-    WithMessageMixin,
 )
 from ssa.forms import EvenementProduitForm
 from ssa.formsets import EtablissementFormSet
@@ -102,12 +92,7 @@ class EvenementProduitCreateView(
 
 @audit_log("page view")
 class EvenementProduitDetailView(
-    WithBlocCommunPermission,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
-    WithMessageMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
+    WithBlocCommunTabsMixin,
     WithFreeLinksListInContextMixin,
     WithClotureContextMixin,
     UserPassesTestMixin,
@@ -137,8 +122,6 @@ class EvenementProduitDetailView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        contact = self.request.user.agent.structure.contact_set.all()[0]
-        context["etat"] = self.get_object().get_etat_data_for_contact(contact)
         context["can_be_deleted"] = self.get_object().can_be_deleted(self.request.user)
         context["can_publish"] = self.get_object().can_publish(self.request.user)
         context["content_type"] = ContentType.objects.get_for_model(self.get_object())
@@ -230,35 +213,12 @@ class EvenementUpdateView(
 
 class EvenementProduitDocumentExportView(WithDocumentExportContextMixin, UserPassesTestMixin, View):
     http_method_names = ["post"]
+    document_template_name = "ssa/doc_templates/evenement_produit.docx"
+    document_filename_prefix = "evenement_produit"
 
     def dispatch(self, request, pk, *args, **kwargs):
         self.object = EvenementProduit.objects.get(pk=pk)
         return super().dispatch(request, *args, **kwargs)
 
-    def post(self, request):
-        doc = DocxTemplate("ssa/doc_templates/evenement_produit.docx")
-        sub_doc_file = self.create_document_bloc_commun()
-        sub_doc = doc.new_subdoc(sub_doc_file)
-
-        context = {
-            "object": self.object,
-            "free_links": self.get_free_links_numbers(),
-            "bloc_commun": sub_doc,
-            "now": datetime.datetime.now(),
-        }
-        doc.render(context)
-
-        file_stream = io.BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-
-        response = HttpResponse(
-            file_stream.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-        response["Content-Disposition"] = f"attachment; filename=evenement_produit_{self.object.numero}.docx"
-        os.remove(sub_doc_file)
-        return response
-
     def test_func(self):
         return self.object.can_user_access(self.request.user)
@@ -0,0 +1,100 @@
+"""Évènements SV du jeu de données de performance (voir `core.dataset`)."""
+
+import random
+
+from django.urls import reverse
+
+from core.benchmark import Scenario, get_largest_object, get_list_scenarios, get_object_scenarios, get_search_text
+from core.constants import Visibilite
+from core.dataset import group_by
+
+from .factories import (
+    ContexteFactory,
+    EspeceEchantillonFactory,
+    EvenementFactory,
+    FicheDetectionFactory,
+    LaboratoireFactory,
+    LieuFactory,
+    MatricePreleveeFactory,
+    OrganismeNuisibleFactory,
+    PositionChaineDistributionFactory,
+    PrelevementFactory,
+    StatutEvenementFactory,
+    StatutReglementaireFactory,
+    StructurePreleveuseFactory,
+)
+from .filters import EvenementFilter
+from .models import Evenement
+
+
+def generate_evenements(generator, count):
+    """Évènements avec leurs fiches détection (1 à 3), leurs lieux (1 à 3) et un prélèvement pour un lieu sur deux."""
+    statuts_evenement = generator.get_referentiel(StatutEvenementFactory)
+    contextes = generator.get_referentiel(ContexteFactory)
+    positions = generator.get_referentiel(PositionChaineDistributionFactory)
+    structures_preleveuses = generator.get_referentiel(StructurePreleveuseFactory)
+    laboratoires = generator.get_referentiel(LaboratoireFactory)
+    matrices = generator.get_referentiel(MatricePreleveeFactory)
+    especes = generator.get_referentiel(EspeceEchantillonFactory)
+
+    batches = generator.create_batches(
+        EvenementFactory,
+        count,
+        organisme_nuisible=generator.choice(generator.get_referentiel(OrganismeNuisibleFactory)),
+        statut_reglementaire=generator.choice(generator.get_referentiel(StatutReglementaireFactory)),
+        createur=generator.choice(generator.structures),
+        numero_evenement=generator.get_numero(Evenement),
+        etat=generator.get_etat(),
+        visibilite=generator.choice([Visibilite.LOCALE, Visibilite.NATIONALE]),
+    )
+    for evenements in batches:
+        detections = []
+        for evenement in evenements:
+            for numero in range(1, random.randint(1, 3) + 1):
+                detections.append(
+                    FicheDetectionFactory.build(
+                        evenement=evenement,
+                        numero_detection=f"{evenement.numero}.{numero}",
+                        createur=evenement.createur,
+                        statut_evenement=random.choice(statuts_evenement),
+                        contexte=random.choice(contextes),
+                    )
+                )
+        detections = generator.bulk_create(FicheDetectionFactory._meta.model, detections)
+        lieux = generator.create_children(
+            LieuFactory,
+            detections,
+            "fiche_detection",
+            departement=generator.choice(generator.departements),
+            position_chaine_distribution_etablissement=generator.choice(positions),
+        )
+        prelevements = generator.create_children(
+            PrelevementFactory,
+            lieux[::2],
+            "lieu",
+            nb_max=1,
+            structure_preleveuse=generator.choice(structures_preleveuses),
+            laboratoire=generator.choice(laboratoires),
+            matrice_prelevee=generator.choice(matrices),
+            espece_echantillon=generator.choice(especes),
+        )
+
+        Evenement.update_localisations(*(evenement.pk for evenement in evenements))
+        lieux_by_detection = group_by(lieux, "fiche_detection_id")
+        prelevements_by_lieu = group_by(prelevements, "lieu_id")
+        related = group_by(detections, "evenement_id")
+        for detection in detections:
+            for lieu in lieux_by_detection[detection.pk]:
+                related[detection.evenement_id] += [lieu, *prelevements_by_lieu[lieu.pk]]
+        generator.finalize(evenements, related)
+        yield len(evenements)
+
+
+def get_benchmark_scenarios(user):
+    evenement = get_largest_object(Evenement.objects.all(), user, "detections")
+    message = evenement and evenement.messages.order_by("-pk").first()
+    search_text = get_search_text(message and message.content)
+    yield from get_list_scenarios("SV", reverse("sv:evenement-liste"), EvenementFilter, search_text)
+    yield Scenario("SV - export CSV des fiches détection", reverse("sv:fiche-detection-export"), "post")
+    export_url = evenement and reverse("sv:export-evenement-document", kwargs={"numero": evenement.numero})
+    yield from get_object_scenarios("SV - évènement", evenement, export_url)
@@ -1,10 +1,12 @@
-import csv
+from functools import cached_property
 import itertools
 
 from core.export import BaseExport
+from core.models import Region
 
 
 class FicheDetectionExport(BaseExport):
+    regions_header = "Régions de l'évènement"
     fiche_detection_fields = [
         ("numero", "Numéro de fiche"),
         ("evenement__numero", "Num. événement"),
@@ -72,18 +74,29 @@ class FicheDetectionExport(BaseExport):
 
     def get_fieldnames(self):
         """Retourne les noms des champs pour l'en-tête du CSV"""
-        all_fields = (
-            self.fiche_detection_fields
-            + self.elements_infestes_fields
+        other_fields = (
+            self.elements_infestes_fields
             + self.lieux_fields
             + self.prelevement_fields
             + self.fiche_zone_delimitee_fields
             + self.zone_infestee_fields
         )
-        return [header for _, header in all_fields]
+        return (
+            [header for _, header in self.fiche_detection_fields]
+            + [self.regions_header]
+            + [header for _, header in other_fields]
+        )
+
+    @cached_property
+    def region_names(self):
+        return dict(Region.objects.values_list("pk", "nom"))
 
     def add_fiche_detection_data(self, result, fiche):
         self.add_data(result, fiche, self.fiche_detection_fields)
+        # Régions précalculées de l'évènement (lieux et structures créatrices des fiches détection), sans lien en base
+        # avec les régions : une région supprimée depuis le dernier calcul est ignorée
+        names = [self.region_names[pk] for pk in fiche.evenement.regions if pk in self.region_names]
+        result[self.regions_header] = ", ".join(sorted(names))
 
     def add_lieu_data(self, result, lieu):
         return self.add_data(result, lieu, self.lieux_fields)
@@ -139,14 +152,7 @@ class FicheDetectionExport(BaseExport):
             yield result
 
     def export(self, stream, queryset):
-        writer = csv.DictWriter(
-            stream,
-            fieldnames=self.get_fieldnames(),
-            quoting=csv.QUOTE_ALL,
-            doublequote=True,
-        )
-        writer.writeheader()
+        self.write_csv(stream, [queryset])
 
-        for instance in queryset:
-            for line in self.get_lines_from_instance(instance):
-                writer.writerow(line)
+    def stream(self, queryset):
+        return self.stream_csv([queryset])
@@ -4,7 +4,10 @@ from operator import or_
 from django.db.models import Q
 import django_filters
 
+from core.cache import get_model_tag
+from core.choice_trees import register_choice_tree
 from core.filters_mixins import (
+    CachedModelMultipleChoiceFilter,
     WithAgentContactFilterMixin,
     WithDatePublicationFilterMixin,
     WithEtatFilterMixin,
@@ -17,6 +20,12 @@ from core.widgets import TreeselectCheckbox
 
 from .models import Evenement, OrganismeNuisible
 
+ORGANISME_NUISIBLE_TREE = register_choice_tree(
+    "sv.organisme_nuisible",
+    lambda: [(organisme.pk, str(organisme)) for organisme in OrganismeNuisible.objects.order_by("libelle_court")],
+    cache_tags=[get_model_tag(OrganismeNuisible)],
+)
+
 
 class EvenementFilter(
     WithNumeroFilterMixin,
@@ -26,10 +35,12 @@ class EvenementFilter(
     WithDatePublicationFilterMixin,
     django_filters.FilterSet,
 ):
-    region = django_filters.ModelMultipleChoiceFilter(
+    region = CachedModelMultipleChoiceFilter(
         label="Région",
         queryset=Region.objects.all(),
         method="filter_region",
+        cache_name="sv_region_choices",
+        cache_tags=[get_model_tag(Region)],
         widget=TreeselectCheckbox(
             choices=(),
             attrs={"placeholder": "Rechercher"},
@@ -42,6 +53,7 @@ class EvenementFilter(
         widget=TreeselectCheckbox(
             choices=(),
             attrs={"placeholder": "Rechercher"},
+            choice_tree=ORGANISME_NUISIBLE_TREE,
         ),
     )
 
@@ -76,9 +88,8 @@ class EvenementFilter(
         Filtre les événements en fonction d'une région selon deux critères :
         1. Événements ayant au moins une fiche détection avec un ou plusieurs lieux dans la région spécifiée
         2. Événements dont la structure créatrice à un lien à la région spécifiée
+        Ces régions sont précalculées dans `Evenement.regions` (index GIN).
         """
         if not value:
             return queryset
-        return queryset.filter(
-            Q(detections__lieux__departement__region__in=value) | Q(detections__createur__region__in=value)
-        ).distinct()
+        return queryset.filter(regions__overlap=[region.pk for region in value])
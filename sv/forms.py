@@ -12,8 +12,9 @@ from django.utils.translation import ngettext
 from django_countries.fields import CountryField
 from dsfr.forms import DsfrBaseForm
 
+from core.cache import get_model_tag
 from core.constants import AC_STRUCTURE, BSV_STRUCTURE, MUS_STRUCTURE, Visibilite
-from core.fields import DSFRCheckboxSelectMultiple, DSFRRadioButton
+from core.fields import CachedChoicesModelChoiceField, DSFRCheckboxSelectMultiple, DSFRRadioButton
 from core.form_mixins import DSFRForm, WithLatestVersionLocking, js_module
 from core.forms import BaseCompteRenduDemandeInterventionForm, VisibiliteUpdateBaseForm
 from core.models import Contact, Departement, Structure
@@ -368,8 +369,12 @@ class FicheDetectionForm(DSFRForm, WithLatestVersionLocking, forms.ModelForm):
         required=False,
         widget=forms.DateInput(format="%Y-%m-%d", attrs={"type": "date"}),
     )
-    statut_reglementaire = forms.ModelChoiceField(
-        label="Statut réglementaire", queryset=StatutReglementaire.objects.all(), required=True
+    statut_reglementaire = CachedChoicesModelChoiceField(
+        label="Statut réglementaire",
+        queryset=StatutReglementaire.objects.all(),
+        required=True,
+        cache_name="sv_statut_reglementaire_choices",
+        cache_tags=[get_model_tag(StatutReglementaire)],
     )
     organisme_nuisible = forms.ModelChoiceField(
         label="Organisme nuisible", queryset=OrganismeNuisible.objects.none(), required=True
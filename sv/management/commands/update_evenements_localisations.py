@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from sv.models import Evenement
+
+
+class Command(BaseCommand):
+    help = "Recalcule les communes et les régions de tous les évènements SV à partir de leurs fiches détection."
+    BATCH_SIZE = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=self.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        pks = list(Evenement._base_manager.order_by("pk").values_list("pk", flat=True))
+        for i in range(0, len(pks), options["batch_size"]):
+            Evenement.update_localisations(*pks[i : i + options["batch_size"]])
+        self.stdout.write(f"Updated {len(pks)} evenements")
@@ -2,9 +2,7 @@ from django.db import models
 from django.db.models import Count, Func, IntegerField, OuterRef, Prefetch, Q, Subquery, Value
 from django.db.models.functions import Cast
 
-from core.constants import Visibilite
-from core.managers import EvenementManagerMixin
-from core.models import user_is_referent_national
+from core.managers import EvenementManagerMixin, get_user_can_view_condition
 
 
 class SplitPart(Func):
@@ -42,19 +40,7 @@ class FicheDetectionManager(models.Manager):
 
 class FichesCommonQueryset(models.QuerySet):
     def get_fiches_user_can_view(self, user):
-        from sv.models import Evenement
-
-        if user.agent.structure.is_mus_or_bsv:
-            return self.exclude(Q(evenement__etat=Evenement.Etat.BROUILLON) & ~Q(createur=user.agent.structure))
-        return self.filter(
-            Q(evenement__visibilite=Visibilite.NATIONALE)
-            | Q(createur=user.agent.structure)
-            | Q(
-                ~Q(evenement__etat=Evenement.Etat.BROUILLON)
-                & Q(evenement__visibilite=Visibilite.LIMITEE)
-                & Q(evenement__allowed_structures=user.agent.structure)
-            )
-        )
+        return self.filter(Q(createur=user.agent.structure) | get_user_can_view_condition(user, prefix="evenement__"))
 
 
 class FicheDetectionQuerySet(FichesCommonQueryset):
@@ -134,30 +120,7 @@ class EvenementQueryset(EvenementManagerMixin, models.QuerySet):
         return self.order_by("-numero_annee", "-numero_evenement")
 
     def get_user_can_view(self, user):
-        from sv.models import Evenement
-
-        if user.agent.structure.is_mus_or_bsv or user_is_referent_national(user):
-            return self.exclude(Q(etat=Evenement.Etat.BROUILLON) & ~Q(createur=user.agent.structure))
-        return self.filter(
-            Q(visibilite=Visibilite.NATIONALE)
-            | Q(createur=user.agent.structure)
-            | Q(
-                ~Q(etat=Evenement.Etat.BROUILLON)
-                & Q(visibilite=Visibilite.LIMITEE)
-                & Q(allowed_structures=user.agent.structure)
-            )
-        )
-
-    def with_list_of_lieux_with_commune(self):
-        from sv.models import FicheDetection, Lieu
-
-        lieux_prefetch = Prefetch(
-            "lieux", queryset=Lieu.objects.exclude(commune="").order_by("id"), to_attr="lieux_list_with_commune"
-        )
-        detections_prefetch = Prefetch(
-            "detections", queryset=FicheDetection.objects.filter(is_deleted=False).prefetch_related(lieux_prefetch)
-        )
-        return self.prefetch_related(detections_prefetch)
+        return self.filter(get_user_can_view_condition(user))
 
     def with_nb_fiches_detection(self):
         return self.annotate(
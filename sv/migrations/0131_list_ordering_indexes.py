@@ -0,0 +1,17 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0067_message_search_text"),
+        ("sv", "0130_on_puccinia_kuehnii"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="evenement",
+            index=models.Index(fields=["last_updated", "id"], name="sv_evenement_maj_idx"),
+        ),
+    ]
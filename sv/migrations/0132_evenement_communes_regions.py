@@ -0,0 +1,52 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:55
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("sv", "0131_list_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evenement",
+            name="communes",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=100), blank=True, default=list, editable=False
+            ),
+        ),
+        migrations.AddField(
+            model_name="evenement",
+            name="regions",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(), blank=True, default=list, editable=False
+            ),
+        ),
+        # Même calcul que `Evenement.update_localisations` pour les évènements existants
+        migrations.RunSQL(
+            """
+            UPDATE sv_evenement e SET
+                communes = ARRAY(
+                    SELECT l.commune FROM sv_lieu l
+                    JOIN sv_fiche_detection f ON f.id = l.fiche_detection_id
+                    WHERE f.evenement_id = e.id AND NOT f.is_deleted AND l.commune <> ''
+                    GROUP BY l.commune
+                    ORDER BY min(l.id)
+                ),
+                regions = ARRAY(
+                    SELECT d.region_id FROM sv_lieu l
+                    JOIN sv_fiche_detection f ON f.id = l.fiche_detection_id
+                    JOIN core_departement d ON d.id = l.departement_id
+                    WHERE f.evenement_id = e.id AND NOT f.is_deleted
+                    UNION
+                    SELECT s.region_id FROM sv_fiche_detection f
+                    JOIN core_structure s ON s.id = f.createur_id
+                    WHERE f.evenement_id = e.id AND NOT f.is_deleted AND s.region_id IS NOT NULL
+                    ORDER BY 1
+                )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:57
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0067_message_search_text"),
+        ("sv", "0132_evenement_communes_regions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="evenement",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["regions"], name="sv_evenement_regions_idx"),
+        ),
+    ]
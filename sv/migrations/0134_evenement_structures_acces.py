@@ -0,0 +1,38 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:59
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0067_message_search_text"),
+        ("sv", "0133_evenement_regions_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evenement",
+            name="structures_acces",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.BigIntegerField(), blank=True, default=list, editable=False
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE sv_evenement e SET structures_acces = ARRAY(
+                SELECT e.createur_id
+                UNION
+                SELECT s.structure_id FROM sv_evenement_allowed_structures s
+                WHERE s.evenement_id = e.id AND e.visibilite = 'limitee' AND e.etat <> 'brouillon'
+                ORDER BY 1
+            )
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name="evenement",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["structures_acces"], name="sv_evenement_acces_idx"),
+        ),
+    ]
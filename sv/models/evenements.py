@@ -1,5 +1,7 @@
 import datetime
 
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.exceptions import PermissionDenied
 from django.db import models, transaction
 from django.urls import reverse
@@ -66,6 +68,10 @@ class Evenement(
     numero_europhyt = models.CharField(max_length=8, verbose_name="Numéro Europhyt", blank=True)
     numero_rasff = models.CharField(max_length=255, verbose_name="Numéro RASFF", blank=True)
 
+    # Localisation des fiches détection non supprimées, tenue à jour par signaux (voir `update_localisations`)
+    communes = ArrayField(models.CharField(max_length=100), default=list, blank=True, editable=False)
+    regions = ArrayField(models.BigIntegerField(), default=list, blank=True, editable=False)
+
     objects = EvenementManager()
 
     class Meta:
@@ -74,6 +80,11 @@ class Evenement(
         constraints = [
             models.UniqueConstraint(fields=["numero_annee", "numero_evenement"], name="unique_evenement_numero")
         ]
+        indexes = [
+            models.Index(fields=["last_updated", "id"], name="sv_evenement_maj_idx"),
+            GinIndex(fields=["regions"], name="sv_evenement_regions_idx"),
+            GinIndex(fields=["structures_acces"], name="sv_evenement_acces_idx"),
+        ]
 
     @classmethod
     def _get_annee_and_numero(self):
@@ -87,6 +98,34 @@ class Evenement(
         numero_evenement = last_fiche.numero_evenement + 1 if last_fiche else 1
         return annee_courante, numero_evenement
 
+    @classmethod
+    def update_localisations(cls, *pks):
+        """Recalcule les communes (dans l'ordre de saisie des lieux, sans doublon) et les régions des évènements :
+        régions des lieux et des structures créatrices des fiches détection."""
+        from .fiches_detection import FicheDetection
+        from .lieux import Lieu
+
+        communes = {pk: {} for pk in pks}
+        regions = {pk: set() for pk in pks}
+        lieux = (
+            Lieu.objects.filter(fiche_detection__evenement_id__in=pks, fiche_detection__is_deleted=False)
+            .order_by("id")
+            .values_list("fiche_detection__evenement_id", "commune", "departement__region_id")
+        )
+        for evenement_id, commune, region_id in lieux:
+            if commune:
+                communes[evenement_id].setdefault(commune)
+            if region_id:
+                regions[evenement_id].add(region_id)
+        detections = FicheDetection._base_manager.filter(
+            evenement_id__in=pks, is_deleted=False, createur__region__isnull=False
+        ).values_list("evenement_id", "createur__region_id")
+        for evenement_id, region_id in detections:
+            regions[evenement_id].add(region_id)
+
+        for pk in pks:
+            cls._base_manager.filter(pk=pk).update(communes=list(communes[pk]), regions=sorted(regions[pk]))
+
     @property
     def numero(self):
         return f"{self.numero_annee}.{self.numero_evenement}"
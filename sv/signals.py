@@ -1,11 +1,20 @@
 from django.db import transaction
-from django.db.models.signals import pre_delete
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.forms.models import model_to_dict
 import reversion
 
+from core.cache import invalidate_model_tag
 from core.diffs import force_update_on_version
-from sv.models import FicheZoneDelimitee, Lieu, VersionFicheZoneDelimitee
+from sv.models import (
+    Evenement,
+    FicheDetection,
+    FicheZoneDelimitee,
+    Lieu,
+    OrganismeNuisible,
+    StatutReglementaire,
+    VersionFicheZoneDelimitee,
+)
 
 
 @receiver(pre_delete, sender=FicheZoneDelimitee)
@@ -28,3 +37,45 @@ def create_version_on_fiche_detection_when_lieu_is_deleted_without_any_other_mod
     sender, instance: Lieu, **kwargs
 ):
     force_update_on_version(instance.fiche_detection)
+
+
+@receiver([post_save, post_delete], sender=FicheDetection)
+def update_evenement_localisations_on_detection_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Evenement.update_localisations(instance.evenement_id)
+
+
+@receiver([post_save, post_delete], sender=Lieu)
+def update_evenement_localisations_on_lieu_change(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    evenement_id = (
+        FicheDetection._base_manager.filter(pk=instance.fiche_detection_id)
+        .values_list("evenement_id", flat=True)
+        .first()
+    )
+    if evenement_id:
+        Evenement.update_localisations(evenement_id)
+
+
+@receiver(post_save, sender=Evenement)
+def update_evenement_structures_acces(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is None or set(update_fields) & {"createur", "etat", "visibilite"}:
+        instance.structures_acces = Evenement.update_structures_acces(instance.pk)[instance.pk]
+
+
+@receiver(m2m_changed, sender=Evenement.allowed_structures.through)
+def update_evenement_structures_acces_on_allowed_structures_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        instance.structures_acces = Evenement.update_structures_acces(instance.pk)[instance.pk]
+    elif pk_set:
+        Evenement.update_structures_acces(*pk_set)
+
+
+for model in (OrganismeNuisible, StatutReglementaire):
+    post_save.connect(invalidate_model_tag, sender=model)
+    post_delete.connect(invalidate_model_tag, sender=model)
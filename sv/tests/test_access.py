@@ -7,9 +7,11 @@ from django.test import RequestFactory
 from django.urls import reverse
 import pytest
 
+from core.authorization import get_principal
 from core.factories import UserFactory
+from core.models import user_is_referent_national
 from seves import settings
-from seves.middlewares import HomeRedirectMiddleware, LoginAndGroupRequiredMiddleware
+from seves.middlewares import HomeRedirectMiddleware, LoginAndGroupRequiredMiddleware, PrincipalMiddleware
 
 
 @pytest.mark.django_db
@@ -74,3 +76,26 @@ def test_redirect_to_ssa_per_default():
     response = HomeRedirectMiddleware(lambda request: HttpResponse("OK"))(request)
     assert response.status_code == 302
     assert response.url == reverse("ssa:evenement-produit-liste")
+
+
+@pytest.mark.django_db
+@pytest.mark.disable_mocked_authentification_user
+def test_principal_is_loaded_once_per_request(django_assert_num_queries):
+    user = UserFactory()
+    sv_group, _ = Group.objects.get_or_create(name=settings.SV_GROUP)
+    user.groups.add(sv_group)
+
+    def get_response(request):
+        with django_assert_num_queries(1):
+            assert request.principal.has_group(settings.SV_GROUP)
+            assert get_principal(request.user).has_group(settings.SV_GROUP)
+            assert user_is_referent_national(request.user) is False
+        return HttpResponse("OK")
+
+    request = RequestFactory().get("/")
+    request.user = user
+    PrincipalMiddleware(get_response)(request)
+
+    referent_national_group, _ = Group.objects.get_or_create(name=settings.REFERENT_NATIONAL_GROUP)
+    user.groups.add(referent_national_group)
+    assert user_is_referent_national(user) is True
@@ -1,3 +1,7 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 import pytest
 
 from core.factories import ContactStructureFactory, DocumentFactory, MessageFactory
@@ -10,9 +14,20 @@ from sv.factories import (
     PrelevementFactory,
     ZoneInfesteeFactory,
 )
-from sv.models import FicheDetection
+from sv.models import Evenement, FicheDetection
 
-BASE_NUM_QUERIES = 21  # Please note a first call is made without assertion to warm up any possible cache
+BASE_NUM_QUERIES = 11  # Please note a first call is made without assertion to warm up any possible cache
+
+
+def get_messages_tab_url(evenement):
+    content_type = ContentType.objects.get_for_model(Evenement)
+    return reverse("bloc-commun-messages", kwargs={"content_type": content_type.pk, "pk": evenement.pk})
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return len(context.captured_queries), response
 
 
 @pytest.mark.django_db
@@ -34,13 +49,16 @@ def test_evenement_performances_with_messages_from_same_user(
     sender = mocked_authentification_user.agent.contact_set.get()
     MessageFactory(content_object=evenement, sender=sender, recipients=[], recipients_copy=[])
 
-    with django_assert_num_queries(BASE_NUM_QUERIES + 3):
+    with django_assert_num_queries(BASE_NUM_QUERIES):
         client.get(evenement.get_absolute_url())
+    num_queries, _ = count_queries(client, get_messages_tab_url(evenement))
 
     MessageFactory.create_batch(3, content_object=evenement, sender=sender, recipients=[], recipients_copy=[])
 
-    with django_assert_num_queries(BASE_NUM_QUERIES + 3):
-        response = client.get(evenement.get_absolute_url())
+    with django_assert_num_queries(BASE_NUM_QUERIES):
+        client.get(evenement.get_absolute_url())
+    with django_assert_num_queries(num_queries):
+        response = client.get(get_messages_tab_url(evenement))
 
     assert len(response.context["message_filter"].qs) == 4
 
@@ -53,8 +71,9 @@ def test_evenement_performances_with_multiple_messages_with_documents(
     client.get(evenement.get_absolute_url())
 
     MessageFactory(content_object=evenement)
-    with django_assert_max_num_queries(BASE_NUM_QUERIES + 14):
+    with django_assert_max_num_queries(BASE_NUM_QUERIES):
         client.get(evenement.get_absolute_url())
+    num_queries, _ = count_queries(client, get_messages_tab_url(evenement))
 
     message_1, message_2, message_3 = MessageFactory.create_batch(3, content_object=evenement)
     DocumentFactory(content_object=message_1)
@@ -62,8 +81,10 @@ def test_evenement_performances_with_multiple_messages_with_documents(
     DocumentFactory(content_object=message_2)
     DocumentFactory(content_object=message_3)
 
-    with django_assert_max_num_queries(BASE_NUM_QUERIES + 14):
-        response = client.get(evenement.get_absolute_url())
+    with django_assert_max_num_queries(BASE_NUM_QUERIES):
+        client.get(evenement.get_absolute_url())
+    with django_assert_max_num_queries(num_queries):
+        response = client.get(get_messages_tab_url(evenement))
 
     assert len(response.context["message_filter"].qs) == 4
 
@@ -91,7 +112,7 @@ def test_evenement_performances_with_document(client, django_assert_num_queries)
         client.get(evenement.get_absolute_url())
 
     DocumentFactory.create_batch(3, content_object=evenement)
-    with django_assert_num_queries(BASE_NUM_QUERIES + 1):
+    with django_assert_num_queries(BASE_NUM_QUERIES):
         client.get(evenement.get_absolute_url())
 
 
@@ -141,7 +162,7 @@ def test_evenement_performances_when_adding_structure(client, django_assert_num_
     for structure in ContactStructureFactory.create_batch(10):
         evenement.contacts.add(structure)
 
-    with django_assert_num_queries(BASE_NUM_QUERIES + 1):
+    with django_assert_num_queries(BASE_NUM_QUERIES):
         client.get(evenement.get_absolute_url())
 
 
@@ -167,5 +188,5 @@ def test_fiche_zone_delimitee_with_multiple_zone_infestee(
 
     client.get(evenement.get_absolute_url())
 
-    with django_assert_num_queries(BASE_NUM_QUERIES + 24):
+    with django_assert_num_queries(BASE_NUM_QUERIES + 25):
         client.get(evenement.get_absolute_url())
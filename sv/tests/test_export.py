@@ -3,13 +3,17 @@ import datetime
 from io import StringIO
 from unittest import mock
 
+from django.urls import reverse
 import pytest
 
 from core.constants import Visibilite
-from core.models import FinSuiviContact
+from core.documents import DOCX_CONTENT_TYPE
+from core.models import Export, FinSuiviContact, Region
+from core.tasks import export_document_task
 from sv.export import FicheDetectionExport
 from sv.factories import (
     ElementInfesteFactory,
+    EvenementFactory,
     FicheDetectionFactory,
     FicheZoneFactory,
     LieuFactory,
@@ -17,6 +21,7 @@ from sv.factories import (
     ZoneInfesteeFactory,
 )
 from sv.models import Evenement, FicheDetection, StructurePreleveuse
+from sv.views import EvenementExportView
 
 
 @pytest.mark.django_db
@@ -41,6 +46,7 @@ def test_export_headers_content(mocked_authentification_user):
         "Mesures de consignation",
         "Mesures phytosanitaires",
         "Mesures de surveillance spécifique",
+        "Régions de l'évènement",
         # == Élément infesté ==
         "Type (élément infesté)",
         "Espèce de l'élément infesté",
@@ -114,6 +120,7 @@ def test_export_data_values(force_utc, mocked_authentification_user):
     evenement = fiche_detection.evenement
 
     ElementInfesteFactory(fiche_detection=fiche_detection)
+    evenement.refresh_from_db()
 
     detections = [d.id for e in Evenement.objects.all() for d in e.detections.all()]
     contact = mocked_authentification_user.agent.structure.contact_set.get()
@@ -143,6 +150,7 @@ def test_export_data_values(force_utc, mocked_authentification_user):
         fiche_detection.mesures_consignation,
         fiche_detection.mesures_phytosanitaires,
         fiche_detection.mesures_surveillance_specifique,
+        ", ".join(sorted(Region.objects.filter(pk__in=evenement.regions).values_list("nom", flat=True))),
         # == Element infesté ==
         fiche_detection.elements_infestes.all()[0].get_type_display(),
         str(fiche_detection.elements_infestes.all()[0].espece),
@@ -314,3 +322,104 @@ def test_export_etat_value_in_fin_de_suivi(mocked_authentification_user):
     data = next(csv.reader(stream))
 
     assert "Fin de suivi pour ma structure" in data
+
+
+@pytest.mark.django_db
+def test_export_ignores_deleted_regions(mocked_authentification_user):
+    fiche_detection = FicheDetectionFactory()
+    region = Region.objects.first() or Region.objects.create(nom="Bretagne")
+    Evenement.objects.filter(pk=fiche_detection.evenement_id).update(regions=[region.pk, 999_999])
+    contact = mocked_authentification_user.agent.structure.contact_set.get()
+    queryset = FicheDetection.objects.filter(id=fiche_detection.pk).optimized_for_export(contact=contact)
+
+    stream = StringIO()
+    FicheDetectionExport().export(stream=stream, queryset=queryset)
+    stream.seek(0)
+    reader = csv.DictReader(stream)
+
+    assert next(reader)[FicheDetectionExport.regions_header] == region.nom
+
+
+@pytest.mark.django_db
+def test_export_is_the_same_when_streamed_by_chunks(mocked_authentification_user):
+    for _ in range(3):
+        lieu = LieuFactory()
+        PrelevementFactory.create_batch(2, lieu=lieu)
+        ElementInfesteFactory(fiche_detection=lieu.fiche_detection)
+    contact = mocked_authentification_user.agent.structure.contact_set.get()
+    queryset = FicheDetection.objects.order_by("pk").optimized_for_export(contact=contact)
+
+    stream = StringIO()
+    FicheDetectionExport().export(stream=stream, queryset=queryset)
+
+    export = FicheDetectionExport()
+    export.chunk_size = 1
+    streamed_lines = list(export.stream(queryset))
+
+    assert "".join(streamed_lines) == stream.getvalue()
+    assert len(streamed_lines) == 1 + 3 * 3
+
+
+@pytest.mark.django_db
+def test_evenement_document_is_downloaded_directly(client):
+    evenement = EvenementFactory()
+    FicheDetectionFactory(evenement=evenement)
+
+    response = client.post(reverse("sv:export-evenement-document", kwargs={"numero": evenement.numero}))
+
+    assert response.status_code == 200
+    assert response["Content-Type"] == DOCX_CONTENT_TYPE
+    assert response["Content-Disposition"] == f"attachment; filename=evenement_{evenement.numero}.docx"
+    assert Export.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_evenement_document_with_many_detections_is_generated_by_a_task(
+    client, mocked_authentification_user, mailoutbox
+):
+    evenement = EvenementFactory()
+    FicheDetectionFactory.create_batch(2, evenement=evenement)
+
+    with (
+        mock.patch.object(EvenementExportView, "async_min_detections", 2),
+        mock.patch("core.mixins.export_document_task.delay_on_commit") as mock_delay,
+    ):
+        response = client.post(reverse("sv:export-evenement-document", kwargs={"numero": evenement.numero}))
+
+    assert response.status_code == 302
+    export = Export.objects.get()
+    assert export.user == mocked_authentification_user
+    mock_delay.assert_called_once_with(export.pk, "sv.views.EvenementExportView")
+
+    export_document_task(*mock_delay.call_args.args)
+
+    export.refresh_from_db()
+    assert export.task_done is True
+    assert export.file.name.endswith(".docx")
+    assert len(mailoutbox) == 1
+    assert "Votre export est prêt" in mailoutbox[0].subject
+
+
+@pytest.mark.django_db
+def test_evenement_document_task_failure_marks_export_as_failed(client, mocked_authentification_user, mailoutbox):
+    evenement = EvenementFactory()
+    export = Export.objects.create(
+        user=mocked_authentification_user,
+        queryset_sequence=[Export.from_queryset(Evenement.objects.filter(pk=evenement.pk))],
+    )
+
+    with (
+        mock.patch.object(EvenementExportView, "render_document", side_effect=ValueError),
+        pytest.raises(ValueError),
+    ):
+        export_document_task(export.pk, "sv.views.EvenementExportView")
+
+    export.refresh_from_db()
+    assert export.task_done is False
+    assert export.task_failed is True
+    assert not export.file
+    assert len(mailoutbox) == 1
+    assert "Votre export a échoué" in mailoutbox[0].subject
+
+    response = client.get(reverse("export-progress", kwargs={"pk": export.pk}))
+    assert response.json()["failed"] is True
@@ -9,13 +9,13 @@ def test_list_detection_performance(client, django_assert_num_queries, mocked_au
     FicheDetectionFactory()
     client.get(reverse("sv:evenement-liste"))
 
-    with django_assert_num_queries(13):
+    with django_assert_num_queries(7):
         client.get(reverse("sv:evenement-liste"))
 
     for _ in range(0, 5):
         FicheDetectionFactory()
 
-    with django_assert_num_queries(13):
+    with django_assert_num_queries(7):
         client.get(reverse("sv:evenement-liste"))
 
 
@@ -25,11 +25,11 @@ def test_list_zone_performance(client, django_assert_num_queries, mocked_authent
     url = reverse("sv:evenement-liste")
     client.get(url)
 
-    with django_assert_num_queries(12):
+    with django_assert_num_queries(7):
         client.get(url)
 
     for _ in range(0, 5):
         EvenementFactory(fiche_zone_delimitee=FicheZoneFactory())
 
-    with django_assert_num_queries(12):
+    with django_assert_num_queries(7):
         client.get(url)
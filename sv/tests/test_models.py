@@ -20,6 +20,7 @@ from sv.models import (
     Contexte,
     Departement,
     EspeceEchantillon,
+    Evenement,
     FicheDetection,
     Laboratoire,
     Lieu,
@@ -614,3 +615,54 @@ def test_last_updated_after_fiche_detection_delete():
 @pytest.mark.django_db
 def test_cant_create_document_with_invalid_document_type():
     DocumentFactory(content_object=EvenementFactory(), document_type=Document.TypeDocument.ETIQUETAGE)
+
+
+@pytest.mark.django_db
+def test_evenement_localisations_are_kept_up_to_date(departement_base, autre_region):
+    evenement = EvenementFactory()
+    detection = FicheDetectionFactory(evenement=evenement, createur=StructureFactory(region=autre_region))
+    LieuFactory(fiche_detection=detection, commune="Lyon", departement=departement_base)
+    lieu = LieuFactory(fiche_detection=detection, commune="Paris", departement=None)
+    LieuFactory(fiche_detection=detection, commune="Lyon", departement=None)
+    other_detection = FicheDetectionFactory(evenement=evenement, createur=StructureFactory())
+    LieuFactory(fiche_detection=other_detection, commune="", departement=None)
+
+    evenement.refresh_from_db()
+    assert evenement.communes == ["Lyon", "Paris"]
+    assert evenement.regions == sorted([departement_base.region_id, autre_region.pk])
+
+    lieu.delete()
+    evenement.refresh_from_db()
+    assert evenement.communes == ["Lyon"]
+
+    detection.is_deleted = True
+    detection.save()
+    evenement.refresh_from_db()
+    assert evenement.communes == []
+    assert evenement.regions == []
+
+
+@pytest.mark.django_db
+def test_evenement_structures_acces_are_kept_up_to_date(mocked_authentification_user):
+    structure, other_structure = mocked_authentification_user.agent.structure, StructureFactory()
+    evenement = EvenementFactory(createur=StructureFactory(), etat=Evenement.Etat.BROUILLON)
+    evenement.allowed_structures.set([structure, other_structure])
+    evenement.visibilite = Visibilite.LIMITEE
+    evenement.save()
+
+    assert evenement.structures_acces == [evenement.createur_id]
+    assert evenement.can_user_access(mocked_authentification_user) is False
+    assert not Evenement.objects.all().get_user_can_view(mocked_authentification_user).exists()
+
+    evenement.etat = Evenement.Etat.EN_COURS
+    evenement.save()
+    evenement.refresh_from_db()
+    assert evenement.structures_acces == sorted([evenement.createur_id, structure.pk, other_structure.pk])
+    assert evenement.can_user_access(mocked_authentification_user) is True
+    assert list(Evenement.objects.all().get_user_can_view(mocked_authentification_user)) == [evenement]
+
+    evenement.allowed_structures.remove(structure)
+    evenement.refresh_from_db()
+    assert evenement.structures_acces == sorted([evenement.createur_id, other_structure.pk])
+    assert evenement.can_user_access(mocked_authentification_user) is False
+    assert not Evenement.objects.all().get_user_can_view(mocked_authentification_user).exists()
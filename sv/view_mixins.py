@@ -176,11 +176,10 @@ class WithFilteredListMixin(WithOrderingMixin):
         return "maj"
 
     def get_raw_queryset(self):
-        contact = self.request.user.agent.structure.contact_set.get()
+        contact = self.request.principal.structure_contact
         return (
             Evenement.objects.all()
             .get_user_can_view(self.request.user)
-            .with_list_of_lieux_with_commune()
             .with_fin_de_suivi(contact)
             .with_nb_fiches_detection()
             .optimized_for_list()
@@ -1,8 +1,3 @@
-from collections import OrderedDict
-import datetime
-import io
-import os
-
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
@@ -11,7 +6,7 @@ from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import transaction
 from django.forms import Media
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseRedirect
+from django.http import HttpResponseBadRequest, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.views import View
@@ -23,29 +18,25 @@ from django.views.generic import (
     UpdateView,
 )
 from django.views.generic.edit import FormMixin
-from docxtpl import DocxTemplate
 import reversion
 from reversion.models import Version
 
 from core.audit import audit_log
 from core.constants import Visibilite
 from core.diffs import force_update_on_version
+from core.documents import new_subdoc
 from core.mixins import (
     CanUpdateVisibiliteRequiredMixin,
     MediaDefiningMixin,
-    WithBlocCommunPermission,
+    WithBlocCommunTabsMixin,
     WithClotureContextMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
     WithDocumentExportContextMixin,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
     WithFinDeSuiviMixin,
     WithFormErrorsAsMessagesMixin,
     WithFreeLinksListInContextMixin,
-    WithMessageMixin,
 )
-from core.models import Contact
+from core.models import Contact, Document
+from core.pagination import get_cached_count
 from core.redirect import safe_redirect
 from sv.forms import (
     ElementInfesteFormSet,
@@ -83,6 +74,7 @@ from .view_mixins import (
 class EvenementListView(WithFilteredListMixin, MediaDefiningMixin, ListView):
     model = Evenement
     paginate_by = 100
+    keyset_pagination = True
 
     def get_media(self, **context_data) -> Media:
         return context_data["filter"].form.media if "filter" in context_data else Media()
@@ -90,7 +82,7 @@ class EvenementListView(WithFilteredListMixin, MediaDefiningMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["filter"] = self.filter
-        context["total_object_count"] = self.get_raw_queryset().count()
+        context["total_object_count"] = get_cached_count(self.get_raw_queryset())
         context["voluminous_extract_threshold"] = settings.VOLUMINOUS_EXTRACT_THRESHOLD
 
         for evenement in context["evenement_list"]:
@@ -98,26 +90,13 @@ class EvenementListView(WithFilteredListMixin, MediaDefiningMixin, ListView):
             evenement.etat = etat_data["etat"]
             evenement.readable_etat = etat_data["readable_etat"]
 
-            communes_dict = OrderedDict()
-            for detection in evenement.detections.all():
-                lieux = getattr(detection, "lieux_list_with_commune", [])
-                for lieu in lieux:
-                    if lieu.commune and lieu.commune not in communes_dict:
-                        communes_dict[lieu.commune] = lieu.id
-            evenement.communes_uniques = [commune for commune, _ in sorted(communes_dict.items(), key=lambda x: x[1])]
-
         return context
 
 
 @audit_log("page view")
 class EvenementDetailView(
     EvenementDetailMixin,
-    WithBlocCommunPermission,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
-    WithMessageMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
+    WithBlocCommunTabsMixin,
     WithFreeLinksListInContextMixin,
     WithClotureContextMixin,
     WithFinDeSuiviMixin,
@@ -153,13 +132,16 @@ class EvenementDetailView(
         context["latest_version"] = self.object.latest_version
         fiche_zone = self.get_object().fiche_zone_delimitee
         if fiche_zone:
+            context["cartographies"] = (
+                Document.objects.for_fiche(self.object)
+                .filter(document_type=Document.TypeDocument.CARTOGRAPHIE, is_infected=False, is_deleted=False)
+                .select_related("created_by_structure")
+            )
             context["detections_hors_zone_infestee"] = fiche_zone.fichedetection_set.all()
             context["zones_infestees"] = [
                 (zone_infestee, zone_infestee.fichedetection_set.all())
                 for zone_infestee in fiche_zone.zones_infestees.all()
             ]
-        contact = self.request.user.agent.structure.contact_set.get()
-        context["etat"] = self.get_object().get_etat_data_for_contact(contact)
         context["active_detection"] = (
             int(self.request.GET.get("detection"))
             if self.request.GET.get("detection")
@@ -190,7 +172,7 @@ class EvenementUpdateView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        contact = self.request.user.agent.structure.contact_set.get()
+        contact = self.request.principal.structure_contact
         context["etat"] = self.get_object().get_etat_data_for_contact(contact)
         return context
 
@@ -324,8 +306,8 @@ class FicheDetectionCreateView(
                     messages.error(self.request, message)
                 return self.form_invalid(form)
 
-            evenement.contacts.add(self.request.user.agent.contact_set.get())
-            evenement.contacts.add(self.request.user.agent.structure.contact_set.get())
+            evenement.contacts.add(self.request.principal.agent_contact)
+            evenement.contacts.add(self.request.principal.structure_contact)
 
         return HttpResponseRedirect(self.get_success_url())
 
@@ -435,13 +417,12 @@ class FicheDetectionExportView(WithFilteredListMixin, View):
 
     def get_queryset(self):
         # WithFilteredListMixin gives a list of Evenement and we need a list of detections for the export
-        detections = [d.id for e in super().get_queryset() for d in e.detections.all()]
-        contact = self.request.user.agent.structure.contact_set.get()
-        return FicheDetection.objects.filter(id__in=detections).optimized_for_export(contact=contact)
+        evenements = super().get_queryset().order_by().values("pk")
+        contact = self.request.principal.structure_contact
+        return FicheDetection.objects.filter(evenement__in=evenements).optimized_for_export(contact=contact)
 
     def post(self, request):
-        response = HttpResponse(content_type="text/csv")
-        FicheDetectionExport().export(stream=response, queryset=self.get_queryset())
+        response = StreamingHttpResponse(FicheDetectionExport().stream(self.get_queryset()), content_type="text/csv")
         response["Content-Disposition"] = "attachment; filename=export_fiche_detection.csv"
         return response
 
@@ -742,22 +723,16 @@ class FicheZoneDelimiteeDeleteView(UserPassesTestMixin, DeleteView):
 
 class EvenementExportView(WithDocumentExportContextMixin, EvenementDetailMixin, View):
     http_method_names = ["post"]
+    document_template_name = "sv/doc_templates/evenement.docx"
+    document_filename_prefix = "evenement"
+    # Au-delà, le document est généré par une tâche Celery pour ne pas bloquer la requête
+    async_min_detections = 30
 
-    def create_detections_sub_doc(self, detections):
-        sub_template = DocxTemplate("sv/doc_templates/detection.docx")
-        sub_template.render({"detections": detections})
-        sub_doc_file = "subdoc_detection.docx"
-        sub_template.save(sub_doc_file)
-        return sub_doc_file
-
-    def post(self, request, *args, **kwargs):
-        self.object = self.get_object()
-        doc = DocxTemplate("sv/doc_templates/evenement.docx")
-        sub_doc_file = self.create_document_bloc_commun()
-        sub_doc = doc.new_subdoc(sub_doc_file)
+    def should_render_async(self):
+        return self.object.detections.count() >= self.async_min_detections
 
-        sub_doc_detection = doc.new_subdoc(self.create_detections_sub_doc(self.object.detections.all()))
-        fiche_zone = self.get_object().fiche_zone_delimitee
+    def get_document_context(self, doc):
+        fiche_zone = self.object.fiche_zone_delimitee
         detections_hors_zone_infestee, zones_infestees = None, None
         if fiche_zone:
             detections_hors_zone_infestee = ", ".join([f.numero for f in fiche_zone.fichedetection_set.all()])
@@ -766,28 +741,18 @@ class EvenementExportView(WithDocumentExportContextMixin, EvenementDetailMixin,
                 for zone_infestee in fiche_zone.zones_infestees.all()
             ]
 
-        context = {
-            "object": self.object,
-            "free_links": self.get_free_links_numbers(),
-            "bloc_commun": sub_doc,
-            "now": datetime.datetime.now(),
-            "detections": sub_doc_detection,
+        return {
+            **super().get_document_context(doc),
+            "detections": new_subdoc(
+                doc, "sv/doc_templates/detection.docx", {"detections": self.object.detections.all()}
+            ),
             "detections_hors_zone_infestee": detections_hors_zone_infestee,
             "zones_infestees": zones_infestees,
         }
-        doc.render(context)
 
-        file_stream = io.BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-
-        response = HttpResponse(
-            file_stream.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-        response["Content-Disposition"] = f"attachment; filename=evenement_{self.object.numero}.docx"
-        os.remove(sub_doc_file)
-        return response
+    def post(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return super().post(request, *args, **kwargs)
 
     def test_func(self):
         return self.get_object().can_user_access(self.request.user)
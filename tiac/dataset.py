@@ -0,0 +1,88 @@
+"""Évènements simples et investigations TIAC du jeu de données de performance (voir `core.dataset`)."""
+
+from django.urls import reverse
+
+from core.benchmark import (
+    Scenario,
+    get_largest_object,
+    get_list_scenarios,
+    get_object_scenarios,
+    get_search_text,
+)
+from core.dataset import group_by
+
+from .factories import (
+    AlimentSuspectFactory,
+    EtablissementFactory,
+    EvenementSimpleFactory,
+    InvestigationTiacFactory,
+    RepasSuspectFactory,
+)
+from .filters import TiacFilter
+from .models import EvenementSimple, InvestigationTiac
+
+
+def generate_evenements_simples(generator, count):
+    """Évènements simples avec leurs établissements (0 à 2)."""
+    batches = generator.create_batches(
+        EvenementSimpleFactory,
+        count,
+        createur=generator.choice(generator.structures),
+        numero_evenement=generator.get_numero(EvenementSimple),
+        etat=generator.get_etat(),
+    )
+    for evenements in batches:
+        etablissements = generator.create_children(
+            EtablissementFactory,
+            evenements,
+            "evenement_simple",
+            nb_min=0,
+            nb_max=2,
+            investigation=None,
+            **generator.get_etablissement_kwargs(),
+        )
+        generator.finalize(evenements, group_by(etablissements, "evenement_simple_id"))
+        yield len(evenements)
+
+
+def generate_investigations(generator, count):
+    """Investigations avec leurs établissements (0 à 2), repas (1 à 3) et aliments suspects (0 à 3)."""
+    batches = generator.create_batches(
+        InvestigationTiacFactory,
+        count,
+        createur=generator.choice(generator.structures),
+        numero_evenement=generator.get_numero(InvestigationTiac),
+        etat=generator.get_etat(),
+    )
+    for investigations in batches:
+        etablissements = generator.create_children(
+            EtablissementFactory,
+            investigations,
+            "investigation",
+            nb_min=0,
+            nb_max=2,
+            evenement_simple=None,
+            **generator.get_etablissement_kwargs(),
+        )
+        repas = generator.create_children(
+            RepasSuspectFactory, investigations, "investigation", departement=generator.choice(generator.departements)
+        )
+        aliments = generator.create_children(AlimentSuspectFactory, investigations, "investigation", nb_min=0)
+
+        related = group_by([*etablissements, *repas, *aliments], "investigation_id")
+        generator.finalize(investigations, related)
+        yield len(investigations)
+
+
+def get_benchmark_scenarios(user):
+    evenement = get_largest_object(EvenementSimple.objects.all(), user, "etablissements")
+    investigation = get_largest_object(InvestigationTiac.objects.all(), user, "repas")
+    search_text = get_search_text(evenement and evenement.contenu)
+    yield from get_list_scenarios("TIAC", reverse("tiac:evenement-liste"), TiacFilter, search_text)
+    yield Scenario("TIAC - export CSV", reverse("tiac:export-tiac"), "post")
+    export_url = evenement and reverse("tiac:export-evenement-simple-document", kwargs={"numero": evenement.numero})
+    yield from get_object_scenarios("TIAC - évènement simple", evenement, export_url)
+    export_url = investigation and reverse(
+        "tiac:export-investigation-tiac-document", kwargs={"numero": investigation.numero}
+    )
+    yield from get_object_scenarios("TIAC - investigation", investigation, export_url)
@@ -1,19 +1,14 @@
-import csv
 from itertools import zip_longest
-import tempfile
-
-from django.apps import apps
-from django.core.files import File
-from queryset_sequence import QuerySetSequence
 
 from core.export import BaseExport
-from core.models import Export
-from core.notifications import notify_export_is_ready
 
 from .models import EvenementSimple, InvestigationTiac
 
 
 class TiacExport(BaseExport):
+    filename = "export_tiac.csv"
+    model = EvenementSimple
+
     evenement_fields = [
         ("numero", "Numéro de fiche"),
         ("get_readable_etat_for_csv", "État"),
@@ -119,36 +114,26 @@ class TiacExport(BaseExport):
             result = self.add_data(result, analyse, self.analyses_fields)
         return result
 
-    def get_queryset(self, task):
-        querysets = []
-        for entry in task.queryset_sequence:
-            entries = entry["ids"]
-            if not entries:
-                continue
-            model = apps.get_model(entry["model"])
-            queryset = model.objects.filter(id__in=entry["ids"])
-            contact = task.user.agent.structure.contact_set.get()
-            if model == InvestigationTiac:
-                queryset = (
-                    queryset.prefetch_related(
-                        "etablissements",
-                        "etablissements__departement",
-                        "repas",
-                        "repas__departement",
-                        "aliments",
-                        "analyses_alimentaires",
-                    )
-                    .select_related("createur")
-                    .with_fin_de_suivi(contact)
+    def get_queryset(self, model, ids, contact):
+        queryset = model.objects.filter(id__in=ids)
+        if model == InvestigationTiac:
+            return (
+                queryset.prefetch_related(
+                    "etablissements",
+                    "etablissements__departement",
+                    "repas",
+                    "repas__departement",
+                    "aliments",
+                    "analyses_alimentaires",
                 )
-            else:
-                queryset = (
-                    queryset.prefetch_related("etablissements", "etablissements__departement")
-                    .select_related("createur")
-                    .with_fin_de_suivi(contact)
-                )
-            querysets.append(queryset)
-        return QuerySetSequence(*querysets)
+                .select_related("createur")
+                .with_fin_de_suivi(contact)
+            )
+        return (
+            queryset.prefetch_related("etablissements", "etablissements__departement")
+            .select_related("createur")
+            .with_fin_de_suivi(contact)
+        )
 
     def get_lines_from_instance(self, instance):
         etablissements = instance.etablissements.all()
@@ -165,31 +150,3 @@ class TiacExport(BaseExport):
             for etablissement, repas, aliment, analyse in zip_longest(etablissements, repas, aliments, analyses):
                 yield self.get_evenement_data(instance, etablissement, repas, aliment, analyse)
                 continue
-
-    def export(self, task_id):
-        task = Export.objects.select_related("user__agent__structure").get(id=task_id)
-        if task.task_done is True:
-            return
-
-        queryset = self.get_queryset(task)
-        fieldnames = self.get_fieldnames()
-        with tempfile.NamedTemporaryFile(mode="w+", newline="", delete=False) as tmp:
-            writer = csv.DictWriter(
-                tmp,
-                fieldnames=fieldnames,
-                quoting=csv.QUOTE_ALL,
-                doublequote=True,
-            )
-            writer.writeheader()
-
-            for obj in queryset:
-                for line in self.get_lines_from_instance(obj):
-                    writer.writerow(line)
-
-            tmp.flush()
-            with open(tmp.name, "rb") as read_file:
-                task.file.save("export_tiac.csv", File(read_file))
-
-            task.task_done = True
-            task.save()
-            notify_export_is_ready(task, object=queryset[0])
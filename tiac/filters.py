@@ -7,6 +7,7 @@ from django.forms import CheckboxInput, Media, TextInput
 import django_filters
 from dsfr.forms import DsfrBaseForm
 
+from core.choice_trees import register_choice_tree
 from core.filters_mixins import (
     WithAgentContactFilterMixin,
     WithDatePublicationFilterMixin,
@@ -19,7 +20,7 @@ from core.form_mixins import js_module
 from core.models import LienLibre
 from core.widgets import TreeselectCheckbox, TreeselectGroup
 from ssa.constants import CategorieDanger, CategorieProduit
-from ssa.filters import WithEtablissementFilterMixin
+from ssa.filters import CATEGORIE_PRODUIT_TREE, WithEtablissementFilterMixin
 from tiac.constants import (
     DANGERS_COURANTS,
     SELECTED_HAZARD_CHOICES,
@@ -31,6 +32,24 @@ from tiac.constants import (
 )
 from tiac.models import EvenementSimple, InvestigationFollowUp, InvestigationTiac
 
+SELECTED_HAZARD_TREE = register_choice_tree(
+    "tiac.selected_hazard",
+    lambda: (
+        TreeselectGroup(
+            label="Dangers syndromiques",
+            choices=DangersSyndromiques.choices_short_names,
+            can_expand=False,
+            categorised_label=None,
+        ),
+        TreeselectGroup(
+            label="Liste complète des dangers alimentaires",
+            choices=CategorieDanger.treeselect_groups,
+            can_expand=False,
+            categorised_label=None,
+        ),
+    ),
+)
+
 
 class TiacFilterForm(DsfrBaseForm):
     fields = "__all__"
@@ -96,22 +115,7 @@ class TiacFilter(
         field_name="selected_hazard",
         choices=SELECTED_HAZARD_CHOICES,
         method="filter_selected_hazard",
-        widget=TreeselectCheckbox(
-            choices=(
-                TreeselectGroup(
-                    label="Dangers syndromiques",
-                    choices=DangersSyndromiques.choices_short_names,
-                    can_expand=False,
-                    categorised_label=None,
-                ),
-                TreeselectGroup(
-                    label="Liste complète des dangers alimentaires",
-                    choices=CategorieDanger.treeselect_groups,
-                    can_expand=False,
-                    categorised_label=None,
-                ),
-            )
-        ),
+        widget=TreeselectCheckbox(choice_tree=SELECTED_HAZARD_TREE),
     )
     full_text_search = django_filters.CharFilter(
         method="filter_full_text_search",
@@ -198,7 +202,7 @@ class TiacFilter(
         field_name="aliments__categorie_produit",
         choices=CategorieProduit,
         method="filter_aliment_categorie_produit",
-        widget=TreeselectCheckbox(choices=CategorieProduit.treeselect_groups),
+        widget=TreeselectCheckbox(choice_tree=CATEGORIE_PRODUIT_TREE),
     )
     nb_personnes_repas = django_filters.CharFilter(
         field_name="repas__nombre_participant",
@@ -317,7 +321,7 @@ class TiacFilter(
                 for i, qs in enumerate(queryset._querysets):
                     queryset._querysets[i] = qs.search(self.form.cleaned_data["full_text_search"])
             else:
-                queryset.search(self.form.cleaned_data["full_text_search"])
+                queryset = queryset.search(self.form.cleaned_data["full_text_search"])
 
         if self.form.cleaned_data["with_free_links"] is True:
             queryset = self._apply_free_links(queryset, queryset_type)
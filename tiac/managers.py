@@ -1,10 +1,10 @@
 from django.db import models
 from django.db.models import Q
 
-from core.managers import EvenementManagerMixin
+from core.managers import EvenementManagerMixin, SearchVectorQuerysetMixin
 
 
-class EvenementSimpleQueryset(EvenementManagerMixin, models.QuerySet):
+class EvenementSimpleQueryset(SearchVectorQuerysetMixin, EvenementManagerMixin, models.QuerySet):
     def order_by_numero(self):
         return self.order_by("-numero_annee", "-numero_evenement")
 
@@ -13,19 +13,8 @@ class EvenementSimpleQueryset(EvenementManagerMixin, models.QuerySet):
 
         return self.filter(Q(createur=user.agent.structure) | ~Q(etat=EvenementSimple.Etat.BROUILLON))
 
-    def search(self, query):
-        fields = [
-            "contenu",
-            "etablissements__raison_sociale",
-            "etablissements__enseigne_usuelle",
-        ]
-        query_object = Q()
-        for f in fields:
-            query_object |= Q(**{f"{f}__unaccent__icontains": query})
-        return self.filter(query_object).distinct()
 
-
-class InvestigationTiacQueryset(EvenementManagerMixin, models.QuerySet):
+class InvestigationTiacQueryset(SearchVectorQuerysetMixin, EvenementManagerMixin, models.QuerySet):
     def order_by_numero(self):
         return self.order_by("-numero_annee", "-numero_evenement")
 
@@ -34,27 +23,6 @@ class InvestigationTiacQueryset(EvenementManagerMixin, models.QuerySet):
 
         return self.filter(Q(createur=user.agent.structure) | ~Q(etat=InvestigationTiac.Etat.BROUILLON))
 
-    def search(self, query):
-        fields = [
-            "contenu",
-            "precisions",
-            "etablissements__raison_sociale",
-            "etablissements__enseigne_usuelle",
-            "repas__denomination",
-            "repas__menu",
-            "aliments__denomination",
-            "aliments__categorie_produit",
-            "aliments__description_produit",
-            "aliments__description_composition",
-            "analyses_alimentaires__reference_prelevement",
-            "analyses_alimentaires__comments",
-            "conclusion_comment",
-        ]
-        query_object = Q()
-        for f in fields:
-            query_object |= Q(**{f"{f}__unaccent__icontains": query})
-        return self.filter(query_object).distinct()
-
 
 class EvenementSimpleManager(models.Manager):
     def get_queryset(self):
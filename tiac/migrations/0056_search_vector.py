@@ -0,0 +1,72 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:44
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+from django.db.models import StringAgg, Value
+
+SEARCH_CONFIG = "french_unaccent"
+
+SEARCH_VECTOR_FIELDS = {
+    "EvenementSimple": [
+        "contenu",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+    ],
+    "InvestigationTiac": [
+        "contenu",
+        "precisions",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+        "repas__denomination",
+        "repas__menu",
+        "aliments__denomination",
+        "aliments__categorie_produit",
+        "aliments__description_produit",
+        "aliments__description_composition",
+        "analyses_alimentaires__reference_prelevement",
+        "analyses_alimentaires__comments",
+        "conclusion_comment",
+    ],
+}
+
+
+def update_search_vectors(apps, schema_editor):
+    for model_name, fields in SEARCH_VECTOR_FIELDS.items():
+        model = apps.get_model("tiac", model_name)
+        aggregates = {
+            f"field_{i}": StringAgg(field, delimiter=Value("\n"), distinct=True) for i, field in enumerate(fields)
+        }
+        for row in model.objects.values("pk").annotate(**aggregates).iterator():
+            text = "\n".join(row[f"field_{i}"] or "" for i in range(len(fields)))
+            model.objects.filter(pk=row["pk"]).update(
+                search_vector=django.contrib.postgres.search.SearchVector(Value(text), config=SEARCH_CONFIG)
+            )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("tiac", "0055_alter_investigationtiac_conclusion_aliment_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evenementsimple",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="investigationtiac",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="evenementsimple",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="tiac_simple_search_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="investigationtiac",
+            index=django.contrib.postgres.indexes.GinIndex(fields=["search_vector"], name="tiac_invest_search_idx"),
+        ),
+        migrations.RunPython(update_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.7 on 2026-10-18 15:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0067_message_search_text"),
+        ("tiac", "0056_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="evenementsimple",
+            index=models.Index(fields=["numero_annee", "numero_evenement", "id"], name="tiac_simple_numero_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="investigationtiac",
+            index=models.Index(fields=["numero_annee", "numero_evenement", "id"], name="tiac_invest_numero_idx"),
+        ),
+    ]
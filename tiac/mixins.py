@@ -1,5 +1,5 @@
-from queryset_sequence import QuerySetSequence
-
+from core.authorization import get_principal
+from core.managers import UnionQuerySetSequence
 from core.mixins import WithOrderingMixin
 from tiac.filters import TiacFilter
 from tiac.models import EvenementSimple, InvestigationTiac
@@ -21,7 +21,7 @@ class WithFilteredListMixin(WithOrderingMixin):
     @property
     def get_raw_queryset(self):
         user = self.request.user
-        contact = user.agent.structure.contact_set.get()
+        contact = get_principal(user).structure_contact
 
         evenement_simple_qs = (
             EvenementSimple.objects.select_related("createur")
@@ -36,12 +36,9 @@ class WithFilteredListMixin(WithOrderingMixin):
             .prefetch_related("etablissements")
         )
 
-        return QuerySetSequence(evenement_simple_qs, investigation_qs)
+        return UnionQuerySetSequence(evenement_simple_qs, investigation_qs)
 
     def get_queryset(self):
-        raw_queryset = self.get_raw_queryset
-        for idx, queryset in enumerate(raw_queryset._querysets):
-            raw_queryset._querysets[idx] = self.apply_ordering(queryset)
-
-        self.filter = TiacFilter(self.request.GET, queryset=raw_queryset)
+        queryset = self.apply_ordering(self.get_raw_queryset)
+        self.filter = TiacFilter(self.request.GET, queryset=queryset)
         return self.filter.qs
@@ -1,5 +1,6 @@
 from dirtyfields import DirtyFieldsMixin
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import RegexValidator
 from django.db import models, transaction
 from django.db.models import Q
@@ -21,6 +22,7 @@ from core.model_mixins import (
     WithContactPermissionMixin,
     WithFicheDocumentPermissionMixin,
     WithLastUpdatedDatetime,
+    WithSearchVectorMixin,
     update_last_updated_on_revision,
 )
 from core.models import BaseEtablissement, Departement, Document, Structure
@@ -104,8 +106,15 @@ class EvenementSimple(
     EmailNotificationMixin,
     BaseTiacModel,
     WithLastUpdatedDatetime,
+    WithSearchVectorMixin,
     models.Model,
 ):
+    search_vector_fields = (
+        "contenu",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+    )
+
     nb_sick_persons = models.IntegerField(verbose_name="Nombre de malades total", null=True)
 
     follow_up = models.CharField(
@@ -115,6 +124,12 @@ class EvenementSimple(
 
     objects = EvenementSimpleManager()
 
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="tiac_simple_search_idx"),
+            models.Index(fields=["numero_annee", "numero_evenement", "id"], name="tiac_simple_numero_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         with transaction.atomic():
             with reversion.create_revision():
@@ -302,8 +317,25 @@ class InvestigationTiac(
     BaseTiacModel,
     DirtyFieldsMixin,
     WithLastUpdatedDatetime,
+    WithSearchVectorMixin,
     models.Model,
 ):
+    search_vector_fields = (
+        "contenu",
+        "precisions",
+        "etablissements__raison_sociale",
+        "etablissements__enseigne_usuelle",
+        "repas__denomination",
+        "repas__menu",
+        "aliments__denomination",
+        "aliments__categorie_produit",
+        "aliments__description_produit",
+        "aliments__description_composition",
+        "analyses_alimentaires__reference_prelevement",
+        "analyses_alimentaires__comments",
+        "conclusion_comment",
+    )
+
     class Etat(models.TextChoices):
         BROUILLON = "brouillon", "Brouillon"
         EN_COURS = "en_cours", "En cours"
@@ -539,6 +571,10 @@ class InvestigationTiac(
         self.save()
 
     class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="tiac_invest_search_idx"),
+            models.Index(fields=["numero_annee", "numero_evenement", "id"], name="tiac_invest_numero_idx"),
+        ]
         constraints = (
             models.CheckConstraint(
                 condition=(
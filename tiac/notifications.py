@@ -1,3 +1,4 @@
+from core.authorization import get_principal
 from core.models import Contact
 from core.notifications import send_as_seves
 from tiac.models import EvenementSimple, InvestigationTiac
@@ -46,7 +47,7 @@ def notify_transformation(old: EvenementSimple, new: InvestigationTiac):
 
 def notify_investigation_coordonnee(object: InvestigationTiac, user):
     send_as_seves(
-        recipients=[user.agent.contact_set.get(), Contact.objects.get_mus()],
+        recipients=[get_principal(user).agent_contact, Contact.objects.get_mus()],
         object=object,
         subject=f"{object.get_short_email_display_name()} - Investigation coordonnée",
         message=f"""
@@ -66,7 +67,7 @@ def notify_investigation_coordonnee(object: InvestigationTiac, user):
 
 def notify_conclusion(object: InvestigationTiac, user):
     send_as_seves(
-        recipients=object.contacts.agents_only().exclude(id=user.agent.contact_set.get().id),
+        recipients=object.contacts.agents_only().exclude(id=get_principal(user).agent_contact.id),
         object=object,
         subject=f"{object.get_short_email_display_name()} - Conclusion suspicion TIAC",
         message=f"""
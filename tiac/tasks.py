@@ -3,6 +3,7 @@ from celery import shared_task
 from tiac.export import TiacExport
 
 
-@shared_task
+@shared_task(acks_late=True, reject_on_worker_lost=True)
 def export_tiac_task(task_id):
-    TiacExport().export(task_id)
+    if not TiacExport().export_next_chunk(task_id):
+        export_tiac_task.delay(task_id)
@@ -24,7 +24,7 @@ def test_export_tiac_performances_scales_on_number_of_evenement_simple(
     ContactStructureFactory(structure=contact.agent.structure)
     task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
 
-    with django_assert_num_queries(14):
+    with django_assert_num_queries(11):
         TiacExport().export(task.id)
 
     task.refresh_from_db()
@@ -35,7 +35,7 @@ def test_export_tiac_performances_scales_on_number_of_evenement_simple(
     data = [{"model": "tiac.evenementsimple", "ids": [evenement.id, evenement_2.id, evenement_3.id]}]
     task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
 
-    with django_assert_num_queries(14):
+    with django_assert_num_queries(11):
         TiacExport().export(task.id)
 
     task.refresh_from_db()
@@ -51,7 +51,7 @@ def test_export_tiac_performances_scales_on_number_of_related_objects(
     ContactStructureFactory(structure=contact.agent.structure)
     task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
 
-    with django_assert_num_queries(20):
+    with django_assert_num_queries(14):
         TiacExport().export(task.id)
 
     task.refresh_from_db()
@@ -63,7 +63,7 @@ def test_export_tiac_performances_scales_on_number_of_related_objects(
     EtablissementFactory(investigation=evenement)
     task = Export.objects.create(user=contact.agent.user, queryset_sequence=data)
 
-    with django_assert_num_queries(24):
+    with django_assert_num_queries(16):
         TiacExport().export(task.id)
 
     task.refresh_from_db()
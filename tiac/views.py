@@ -1,22 +1,18 @@
-import datetime
 from functools import cached_property
-import io
 import json
-import os
 
 from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.contenttypes.models import ContentType
 from django.forms import Media
-from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.http import Http404, HttpResponseRedirect
 from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views import View
 from django.views.decorators.http import require_POST
 from django.views.generic import CreateView, DetailView, ListView, UpdateView
 from django.views.generic.edit import ModelFormMixin, ProcessFormView
-from docxtpl import DocxTemplate
 from reversion.models import Version
 
 from core.audit import audit_log
@@ -24,21 +20,17 @@ from core.diffs import create_manual_version
 from core.mixins import (
     MediaDefiningMixin,
     WithAddUserContactsMixin,
-    WithBlocCommunPermission,
+    WithBlocCommunTabsMixin,
     WithClotureContextMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
     WithDocumentExportContextMixin,
-    WithDocumentListInContextMixin,
     WithExportHeterogeneousQuerysetMixin,
-    WithFicheObjectDocumentUploadFormMixin,
     WithFinDeSuiviMixin,
     WithFormErrorsAsMessagesMixin,
     WithFormsetInvalidMixin,
     WithFreeLinksListInContextMixin,
-    WithMessageMixin,
 )
 from core.models import Contact, CustomRevisionMetaData, LienLibre
+from core.pagination import get_cached_count
 from ssa.constants import CategorieDanger
 from tiac import forms
 from tiac.mixins import WithFilteredListMixin
@@ -47,7 +39,6 @@ from tiac.tasks import export_tiac_task
 
 from .constants import DangersSyndromiques, EvenementFollowUp
 from .display import DisplayItem
-from .filters import TiacFilter
 from .forms import ConclusionForm, EvenementSimpleTransferForm
 from .formsets import (
     AlimentFormSet,
@@ -177,12 +168,7 @@ class EvenementSimpleDetailView(
     UserPassesTestMixin,
     WithFreeLinksListInContextMixin,
     WithClotureContextMixin,
-    WithBlocCommunPermission,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
-    WithMessageMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
+    WithBlocCommunTabsMixin,
     WithFinDeSuiviMixin,
     DetailView,
 ):
@@ -215,8 +201,6 @@ class EvenementSimpleDetailView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        contact = self.request.user.agent.structure.contact_set.get()
-        context["etat"] = self.get_object().get_etat_data_for_contact(contact)
         context["can_be_deleted"] = self.get_object().can_be_deleted(self.request.user)
         context["can_publish"] = self.get_object().can_publish(self.request.user)
         context["can_be_modified"] = self.get_object().can_be_modified(self.request.user)
@@ -233,6 +217,7 @@ class EvenementSimpleDetailView(
 
 class TiacListView(WithFilteredListMixin, MediaDefiningMixin, ListView):
     paginate_by = 100
+    keyset_pagination = True
     context_object_name = "objects"
 
     def get_template_names(self):
@@ -241,11 +226,6 @@ class TiacListView(WithFilteredListMixin, MediaDefiningMixin, ListView):
     def get_media(self, **context_data) -> Media:
         return context_data["filter"].form.media if "filter" in context_data else Media()
 
-    def get_queryset(self):
-        queryset = self.apply_ordering(self.get_raw_queryset)
-        self.filter = TiacFilter(self.request.GET, queryset=queryset)
-        return self.filter.qs
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         object_list = []
@@ -255,7 +235,7 @@ class TiacListView(WithFilteredListMixin, MediaDefiningMixin, ListView):
             evenement.readable_etat = etat_data["readable_etat"]
             object_list.append(DisplayItem.from_object(evenement))
 
-        context["total_object_count"] = self.get_raw_queryset.count()
+        context["total_object_count"] = get_cached_count(self.get_raw_queryset)
         context["voluminous_extract_threshold"] = settings.VOLUMINOUS_EXTRACT_THRESHOLD
         context["object_list"] = object_list
         context["filter"] = self.filter
@@ -534,12 +514,7 @@ class InvestigationTiacDetailView(
     UserPassesTestMixin,
     WithFreeLinksListInContextMixin,
     WithClotureContextMixin,
-    WithBlocCommunPermission,
-    WithDocumentListInContextMixin,
-    WithFicheObjectDocumentUploadFormMixin,
-    WithMessageMixin,
-    WithContactFormsInContextMixin,
-    WithContactListInContextMixin,
+    WithBlocCommunTabsMixin,
     WithFinDeSuiviMixin,
     DetailView,
 ):
@@ -571,8 +546,6 @@ class InvestigationTiacDetailView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        contact = self.request.user.agent.structure.contact_set.get()
-        context["etat"] = self.get_object().get_etat_data_for_contact(contact)
         context["can_publish"] = self.get_object().can_publish(self.request.user)
         context["content_type"] = ContentType.objects.get_for_model(self.get_object())
         context["can_be_modified"] = self.get_object().can_be_modified(self.request.user)
@@ -595,74 +568,28 @@ class InvestigationTiacDetailView(
 
 class EvenementSimpleDocumentExportView(WithDocumentExportContextMixin, UserPassesTestMixin, View):
     http_method_names = ["post"]
+    document_template_name = "tiac/doc_templates/evenement_simple.docx"
+    document_filename_prefix = "enregistrement_simple"
 
     def dispatch(self, request, numero=None, *args, **kwargs):
         annee, numero_evenement = numero.replace("T-", "").split(".")
         self.object = EvenementSimple.objects.get(numero_annee=annee, numero_evenement=numero_evenement)
         return super().dispatch(request, *args, **kwargs)
 
-    def post(self, request):
-        doc = DocxTemplate("tiac/doc_templates/evenement_simple.docx")
-        sub_doc_file = self.create_document_bloc_commun()
-        sub_doc = doc.new_subdoc(sub_doc_file)
-
-        context = {
-            "object": self.object,
-            "free_links": self.get_free_links_numbers(),
-            "bloc_commun": sub_doc,
-            "now": datetime.datetime.now(),
-        }
-        doc.render(context)
-
-        file_stream = io.BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-
-        response = HttpResponse(
-            file_stream.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-        response["Content-Disposition"] = f"attachment; filename=enregistrement_simple_{self.object.numero}.docx"
-        os.remove(sub_doc_file)
-        return response
-
     def test_func(self):
         return self.object.can_user_access(self.request.user)
 
 
 class InvestigationTiacExportView(WithDocumentExportContextMixin, UserPassesTestMixin, View):
     http_method_names = ["post"]
+    document_template_name = "tiac/doc_templates/investigation_tiac.docx"
+    document_filename_prefix = "investigation_tiac"
 
     def dispatch(self, request, numero=None, *args, **kwargs):
         annee, numero_evenement = numero.replace("T-", "").split(".")
         self.object = InvestigationTiac.objects.get(numero_annee=annee, numero_evenement=numero_evenement)
         return super().dispatch(request, *args, **kwargs)
 
-    def post(self, request):
-        doc = DocxTemplate("tiac/doc_templates/investigation_tiac.docx")
-        sub_doc_file = self.create_document_bloc_commun()
-        sub_doc = doc.new_subdoc(sub_doc_file)
-
-        context = {
-            "object": self.object,
-            "free_links": self.get_free_links_numbers(),
-            "bloc_commun": sub_doc,
-            "now": datetime.datetime.now(),
-        }
-        doc.render(context)
-
-        file_stream = io.BytesIO()
-        doc.save(file_stream)
-        file_stream.seek(0)
-
-        response = HttpResponse(
-            file_stream.getvalue(),
-            content_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        )
-        response["Content-Disposition"] = f"attachment; filename=investigation_tiac_{self.object.numero}.docx"
-        os.remove(sub_doc_file)
-        return response
-
     def test_func(self):
         return self.object.can_user_access(self.request.user)
 